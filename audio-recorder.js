@@ -22,6 +22,13 @@ export class AudioRecorder {
         this.currentCharacterName = null;
         this.recordingStartTime = null;
         
+        // Live transcription: stream chunks to the backend while recording
+        // so Whisper is mostly done by the time the session ends
+        this.liveTranscription = true;
+        this.liveSocket = null;
+        this.livePending = [];
+        this.liveFailed = false;
+        
         console.log('[AudioRecorder] Initialized');
     }
     
@@ -52,8 +59,9 @@ export class AudioRecorder {
      * Start recording audio for a character conversation
      * @param {string} characterId - Character identifier
      * @param {string} characterName - Character display name
+     * @param {string} [sessionId] - User session ID (enables live transcription)
      */
-    async start(characterId, characterName) {
+    async start(characterId, characterName, sessionId = null) {
         if (this.isRecording) {
             console.warn('[AudioRecorder] Already recording, stopping previous first');
             await this.stop();
@@ -89,10 +97,15 @@ export class AudioRecorder {
             this.currentCharacterName = characterName;
             this.recordingStartTime = Date.now();
             
+            if (this.liveTranscription && sessionId) {
+                this.openLiveSocket(sessionId, mimeType);
+            }
+            
             // Collect audio chunks
             this.mediaRecorder.ondataavailable = (event) => {
                 if (event.data.size > 0) {
                     this.audioChunks.push(event.data);
+                    this.sendLiveChunk(event.data);
                 }
             };
             
@@ -161,7 +174,10 @@ export class AudioRecorder {
                     mimeType: mimeType,
                     duration: duration,
                     timestamp: this.recordingStartTime,
-                    size: blob.size
+                    size: blob.size,
+                    // Resolves to the server's "complete" message, or null if the
+                    // server never took the recording (then uploadAll sends the blob)
+                    live: this.finishLiveSocket(duration)
                 };
                 
                 // Store in recordings array
@@ -194,6 +210,127 @@ export class AudioRecorder {
         });
     }
     
+    /**
+     * Open the live transcription socket for the current recording
+     */
+    openLiveSocket(sessionId, mimeType) {
+        const ext = mimeType.includes('webm') ? '.webm' 
+                  : mimeType.includes('ogg') ? '.ogg'
+                  : mimeType.includes('mp4') ? '.m4a'
+                  : '.wav';
+        const params = new URLSearchParams({
+            sessionId: sessionId,
+            characterId: this.currentCharacterId,
+            characterName: this.currentCharacterName,
+            timestamp: this.recordingStartTime.toString(),
+            ext: ext
+        });
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        
+        this.livePending = [];
+        this.liveFailed = false;
+        
+        try {
+            this.liveSocket = new WebSocket(`${protocol}//${window.location.host}/api/live-transcribe?${params}`);
+        } catch (error) {
+            console.warn('[AudioRecorder] Live transcription unavailable:', error.message);
+            this.liveFailed = true;
+            return;
+        }
+        
+        const socket = this.liveSocket;
+        socket.onopen = () => {
+            // Flush chunks recorded while connecting (the first one holds the container header)
+            this.livePending.forEach(chunk => socket.send(chunk));
+            this.livePending = [];
+            console.log('[AudioRecorder] 📡 Live transcription connected');
+        };
+        socket.onmessage = (event) => this.handleLiveMessage(event);
+        socket.onerror = () => {
+            console.warn('[AudioRecorder] Live transcription socket error, will upload instead');
+            this.liveFailed = true;
+        };
+    }
+    
+    /**
+     * Forward a recorded chunk to the live socket (buffer while connecting)
+     */
+    sendLiveChunk(chunk) {
+        const socket = this.liveSocket;
+        if (!socket || this.liveFailed) return;
+        
+        if (socket.readyState === WebSocket.CONNECTING) {
+            this.livePending.push(chunk);
+        } else if (socket.readyState === WebSocket.OPEN) {
+            socket.send(chunk);
+        } else {
+            this.liveFailed = true;
+        }
+    }
+    
+    /**
+     * Surface partial/final segments to the rest of the app
+     */
+    handleLiveMessage(event) {
+        const message = JSON.parse(event.data);
+        if (message.type === 'partial' || message.type === 'final') {
+            window.dispatchEvent(new CustomEvent('hearsay-live-transcript', {
+                detail: { characterId: this.currentCharacterId, ...message }
+            }));
+        }
+    }
+    
+    /**
+     * Tell the server the recording is over and wait for the final transcript
+     * @param {number} duration - Recording duration in ms
+     * @returns {Promise<Object|null>} "complete" message, or null when the
+     *     server never took the recording (then uploadAll sends the blob)
+     */
+    finishLiveSocket(duration) {
+        const socket = this.liveSocket;
+        this.liveSocket = null;
+        
+        if (!socket) return Promise.resolve(null);
+        if (this.liveFailed || socket.readyState !== WebSocket.OPEN) {
+            socket.close();
+            return Promise.resolve(null);
+        }
+        
+        return new Promise((resolve) => {
+            // Set once the server acknowledges "stop" - the clip is then its to
+            // finish, and uploading the blob as well would duplicate it
+            let stopped = null;
+            const settle = () => resolve(stopped ? { type: 'complete', status: 'pending_transcription', ...stopped } : null);
+            
+            const timeout = setTimeout(() => {
+                console.warn(stopped
+                    ? '[AudioRecorder] Live transcription still finishing on the server'
+                    : '[AudioRecorder] Live transcription timed out, will upload instead');
+                socket.onclose = null;
+                socket.close();
+                settle();
+            }, 120000);
+            
+            socket.onmessage = (event) => {
+                const message = JSON.parse(event.data);
+                if (message.type === 'complete') {
+                    clearTimeout(timeout);
+                    resolve(message);
+                } else if (message.type === 'stopped') {
+                    stopped = { audioId: message.audioId, clipId: message.clipId };
+                } else {
+                    this.handleLiveMessage(event);
+                }
+            };
+            socket.onclose = () => {
+                clearTimeout(timeout);
+                settle();
+            };
+            
+            socket.send(JSON.stringify({ type: 'stop', duration: duration }));
+        });
+    }
+    
     /**
      * Get all recordings from this session
      */
@@ -232,31 +369,19 @@ export class AudioRecorder {
         
         for (const recording of this.recordings) {
             try {
-                const formData = new FormData();
-                formData.append('sessionId', sessionId);
-                formData.append('characterId', recording.characterId);
-                formData.append('characterName', recording.characterName);
-                formData.append('duration', recording.duration.toString());
-                formData.append('timestamp', recording.timestamp.toString());
-                
-                // Determine file extension from MIME type
-                const ext = recording.mimeType.includes('webm') ? 'webm' 
-                          : recording.mimeType.includes('ogg') ? 'ogg'
-                          : recording.mimeType.includes('mp4') ? 'm4a'
-                          : 'wav';
-                
-                formData.append('audio', recording.blob, `${recording.characterId}_${recording.timestamp}.${ext}`);
-                
-                const response = await fetch('/api/upload-audio', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                if (!response.ok) {
-                    throw new Error(`Upload failed: ${response.status}`);
+                // Already on the server via live transcription - nothing to send
+                const live = recording.live ? await recording.live : null;
+                if (live) {
+                    results.push({ 
+                        characterId: recording.characterId, 
+                        success: true, 
+                        ...live 
+                    });
+                    console.log(`[AudioRecorder] ✅ Transcribed live: ${recording.characterName}`);
+                    continue;
                 }
                 
-                const result = await response.json();
+                const result = await this.uploadRecording(sessionId, recording);
                 results.push({ 
                     characterId: recording.characterId, 
                     success: true, 
@@ -278,6 +403,108 @@ export class AudioRecorder {
         return results;
     }
     
+    /**
+     * Upload one recording in chunks so a dropped connection resumes
+     * from the last byte the server has instead of resending the file.
+     * The upload id is kept on the recording, so calling uploadAll again
+     * after a failure picks up where it left off.
+     * @param {string} sessionId - User session ID
+     * @param {Object} recording - Recording from this.recordings
+     * @returns {Promise<Object>} Final server response (status: 'queued')
+     */
+    async uploadRecording(sessionId, recording) {
+        const maxRetries = 5;
+        
+        // Determine file extension from MIME type
+        const ext = recording.mimeType.includes('webm') ? 'webm' 
+                  : recording.mimeType.includes('ogg') ? 'ogg'
+                  : recording.mimeType.includes('mp4') ? 'm4a'
+                  : 'wav';
+        
+        let offset = 0;
+        let chunkSize = 256 * 1024;
+        let retries = 0;
+        
+        if (recording.uploadId) {
+            // Resuming - ask the server how much it already has
+            const response = await fetch(`/api/uploads/${recording.uploadId}`);
+            if (response.ok) {
+                offset = (await response.json()).offset;
+            } else {
+                recording.uploadId = null;
+            }
+        }
+        
+        if (!recording.uploadId) {
+            const formData = new FormData();
+            formData.append('sessionId', sessionId);
+            formData.append('characterId', recording.characterId);
+            formData.append('characterName', recording.characterName);
+            formData.append('duration', recording.duration.toString());
+            formData.append('timestamp', recording.timestamp.toString());
+            formData.append('filename', `${recording.characterId}_${recording.timestamp}.${ext}`);
+            formData.append('totalSize', recording.blob.size.toString());
+            
+            const response = await fetch('/api/uploads', { method: 'POST', body: formData });
+            if (!response.ok) {
+                throw new Error(`Upload failed: ${response.status}`);
+            }
+            const created = await response.json();
+            recording.uploadId = created.uploadId;
+            chunkSize = created.chunkSize || chunkSize;
+        }
+        
+        while (true) {
+            const chunk = recording.blob.slice(offset, offset + chunkSize);
+            let response;
+            
+            try {
+                response = await fetch(`/api/uploads/${recording.uploadId}?offset=${offset}`, {
+                    method: 'PUT',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: chunk
+                });
+            } catch (error) {
+                response = null;  // Network drop - ask the server where to resume
+            }
+            
+            if (response && response.ok) {
+                const result = await response.json();
+                if (result.status !== 'uploading') {
+                    recording.uploadId = null;
+                    return result;
+                }
+                offset = result.offset;
+                retries = 0;
+                continue;
+            }
+            
+            if (response && response.status === 409) {
+                // Out of step with the server - jump to its offset
+                offset = (await response.json()).offset;
+                continue;
+            }
+            
+            if (response && response.status !== 503 && response.status < 500) {
+                throw new Error(`Upload failed: ${response.status}`);
+            }
+            
+            retries++;
+            if (retries > maxRetries) {
+                throw new Error(`Upload failed after ${maxRetries} retries`);
+            }
+            
+            const retryAfter = Number(response?.headers.get('Retry-After')) || 2 ** retries;
+            console.warn(`[AudioRecorder] Upload interrupted at ${offset} bytes, retrying in ${retryAfter}s`);
+            await new Promise(r => setTimeout(r, retryAfter * 1000));
+            
+            const status = await fetch(`/api/uploads/${recording.uploadId}`).catch(() => null);
+            if (status && status.ok) {
+                offset = (await status.json()).offset;
+            }
+        }
+    }
+    
     /**
      * Clear all recordings (after successful upload)
      */
@@ -0,0 +1,320 @@
+"""
+HEARSAY Anthropic Scheduler - one queue for every Claude call
+─────────────────────────────────────────────────────────────────────────────
+Chapters, scene notes and continuity summaries all call the Messages API.
+Fired directly, a burst of end-of-night chapters ran into 429/529s that
+reached the guest as an error page. Every call now goes through this
+scheduler, which:
+
+  - caps how many calls are in flight (ANTHROPIC_MAX_CONCURRENCY)
+  - models our rate limits as token buckets - requests per minute and
+    input tokens per minute - and holds calls that would exceed them.
+    The buckets are corrected from the anthropic-ratelimit-* response
+    headers.
+  - starts calls by priority: interactive chapters (someone is watching
+    the page) before background jobs, and continuity summaries last
+  - retries 429/5xx/529 and dropped connections with jittered exponential
+    backoff, honouring Retry-After (which also pauses the whole queue,
+    since the limit is account-wide)
+
+A caller holds a Ticket (priority + job id); a job's place in the queue is
+reported as queuePosition in its status.
+
+The limits are per process. Under serve.py, with HEARSAY_WORKERS web
+workers, each worker takes an equal share so together they stay inside
+the account's limits.
+
+Environment Variables:
+    ANTHROPIC_MAX_CONCURRENCY - Claude calls in flight at once (default: 4)
+    ANTHROPIC_RPM             - requests per minute, 0 = unlimited (default: 50)
+    ANTHROPIC_INPUT_TPM       - input tokens per minute, 0 = unlimited (default: 40000)
+    ANTHROPIC_MAX_RETRIES     - retries per call after a retryable error (default: 4)
+    HEARSAY_WORKERS           - web workers sharing the limits (set by serve.py, default: 1)
+"""
+
+import os
+import time
+import random
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Mapping, Optional, TypeVar
+
+import httpx
+
+HEARSAY_WORKERS = max(1, int(os.getenv("HEARSAY_WORKERS", 1)))
+
+
+def worker_share(limit: int) -> int:
+    """This web worker's share of an account-wide limit (0 stays unlimited)"""
+    return max(1, limit // HEARSAY_WORKERS) if limit > 0 else limit
+
+
+ANTHROPIC_MAX_CONCURRENCY = worker_share(max(1, int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", 4))))
+ANTHROPIC_RPM = worker_share(int(os.getenv("ANTHROPIC_RPM", 50)))
+ANTHROPIC_INPUT_TPM = worker_share(int(os.getenv("ANTHROPIC_INPUT_TPM", 40000)))
+ANTHROPIC_MAX_RETRIES = max(0, int(os.getenv("ANTHROPIC_MAX_RETRIES", 4)))
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0   # /generate and the streamed chapters
+PRIORITY_BACKGROUND = 1    # generate-from-audio jobs, recovered jobs
+PRIORITY_MAINTENANCE = 2   # continuity summaries
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_MAINTENANCE: "maintenance",
+}
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+BACKOFF_INITIAL = 2.0
+BACKOFF_MAX = 60.0
+
+T = TypeVar("T")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds (Anthropic sends delta-seconds)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """`per_minute` units, refilled continuously; 0 means unlimited"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` (capped at capacity) is available"""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def observe(self, remaining: Optional[str]):
+        """Never believe we have more than the API says is left"""
+        if self.unlimited or remaining is None:
+            return
+        try:
+            self._refill()
+            self.level = min(self.level, float(remaining))
+        except ValueError:
+            pass
+
+    def snapshot(self) -> Optional[dict]:
+        if self.unlimited:
+            return None
+        self._refill()
+        return {"perMinute": int(self.capacity), "available": int(self.level)}
+
+
+class Ticket:
+    """A caller's claim on the scheduler: its priority and (optional) job id"""
+
+    def __init__(self, scheduler: "AnthropicScheduler", priority: int, job_id: Optional[str] = None):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.job_id = job_id
+
+    def slot(self, tokens: int):
+        return self.scheduler.slot(self.priority, tokens, self.job_id)
+
+    async def call(self, fn: Callable[[], Awaitable[T]], tokens: int) -> T:
+        return await self.scheduler.call(fn, self.priority, tokens, self.job_id)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        return self.scheduler.retry_delay(error, attempt)
+
+
+class AnthropicScheduler:
+    """Priority queue + concurrency cap + rate-limit buckets + retries"""
+
+    def __init__(
+        self,
+        max_concurrency: int = ANTHROPIC_MAX_CONCURRENCY,
+        rpm: int = ANTHROPIC_RPM,
+        input_tpm: int = ANTHROPIC_INPUT_TPM,
+        max_retries: int = ANTHROPIC_MAX_RETRIES
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.requests = TokenBucket(rpm)
+        self.input_tokens = TokenBucket(input_tpm)
+        self.active = 0
+        # [priority, seq, job_id] - the head is the lowest (priority, seq)
+        self._waiting: List[list] = []
+        self._seq = itertools.count()
+        self._changed: Optional[asyncio.Event] = None
+        self._paused_until = 0.0
+        self.started = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    def ticket(self, priority: int, job_id: Optional[str] = None) -> Ticket:
+        return Ticket(self, priority, job_id)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Queue
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _notify(self):
+        if self._changed is not None:
+            self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait_for_change(self, timeout: Optional[float]):
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _ready_in(self, tokens: int) -> float:
+        """Seconds until a call of `tokens` input tokens may start"""
+        return max(
+            self._paused_until - time.monotonic(),
+            self.requests.wait_time(1),
+            self.input_tokens.wait_time(tokens)
+        )
+
+    async def acquire(self, priority: int, tokens: int, job_id: Optional[str] = None):
+        entry = [priority, next(self._seq), job_id]
+        self._waiting.append(entry)
+        try:
+            while True:
+                if self.active < self.max_concurrency and min(self._waiting) is entry:
+                    wait = self._ready_in(tokens)
+                    if wait <= 0:
+                        break
+                    await self._wait_for_change(wait)
+                else:
+                    await self._wait_for_change(None)
+        finally:
+            self._waiting.remove(entry)
+            # The next head may be able to go (or was waiting behind us)
+            self._notify()
+
+        self.active += 1
+        self.started += 1
+        self.requests.take(1)
+        self.input_tokens.take(tokens)
+
+    def release(self):
+        self.active -= 1
+        self._notify()
+
+    @asynccontextmanager
+    async def slot(self, priority: int, tokens: int, job_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one concurrency slot for a call (or a whole stream)"""
+        await self.acquire(priority, tokens, job_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place of a job's next call in the queue, or None if not waiting"""
+        for index, entry in enumerate(sorted(self._waiting)):
+            if entry[2] == job_id:
+                return index + 1
+        return None
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Rate limits and retries
+    # ─────────────────────────────────────────────────────────────────────
+
+    def observe(self, headers: Mapping[str, str]):
+        """Correct the buckets from anthropic-ratelimit-* response headers"""
+        self.requests.observe(headers.get("anthropic-ratelimit-requests-remaining"))
+        self.input_tokens.observe(headers.get("anthropic-ratelimit-input-tokens-remaining"))
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying after `error` on the given (0-based)
+        attempt, or None when it should not be retried.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        status = getattr(error, "status_code", None)
+        if isinstance(error, httpx.TimeoutException):
+            return None  # Opus already had its full timeout
+        if not (isinstance(error, httpx.TransportError) or status in RETRY_STATUSES):
+            return None
+
+        retry_after = parse_retry_after(getattr(error, "retry_after", None))
+        backoff = min(BACKOFF_MAX, BACKOFF_INITIAL * 2 ** attempt)
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, 1)
+        else:
+            delay = random.uniform(backoff / 2, backoff)
+
+        if status == 429:
+            # Account-wide: hold every queued call, not just this one
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._notify()
+        self.retries += 1
+        return delay
+
+    async def call(self, fn: Callable[[], Awaitable[T]], priority: int, tokens: int,
+                   job_id: Optional[str] = None) -> T:
+        """Run `fn` (one API request) in a slot, retrying retryable failures"""
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(priority, tokens, job_id):
+                    return await fn()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    self.failures += 1
+                    raise
+                print(f"[HEARSAY] Anthropic call failed ({getattr(e, 'status_code', type(e).__name__)}), "
+                      f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _ in self._waiting:
+            waiting[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "active": self.active,
+            "waiting": waiting,
+            "started": self.started,
+            "retries": self.retries,
+            "rateLimited": self.rate_limited,
+            "failures": self.failures,
+            "pausedFor": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            "requests": self.requests.snapshot(),
+            "inputTokens": self.input_tokens.snapshot()
+        }
@@ -0,0 +1,87 @@
+"""
+HEARSAY Audio Normalization - decode each clip once
+─────────────────────────────────────────────────────────────────────────────
+Browsers upload webm/ogg/m4a in whatever codec they picked. Whisper wants
+16 kHz mono float32, so every transcription used to start by demuxing and
+resampling the container with FFmpeg (PyAV) - and a retry or a model
+upgrade paid for that again.
+
+Each clip is now decoded exactly once, to 16 kHz mono signed 16-bit PCM,
+and stored next to it as `<clip>.16k.pcm` (raw little-endian, no header -
+the format is fixed). That is half the size of float32 and is opened with
+numpy.memmap, so later passes go straight to inference.
+
+A cached file is reused while it is newer than its source clip, or when
+the source clip is gone.
+"""
+
+import os
+from pathlib import Path
+
+SAMPLE_RATE = 16000
+NORMALIZED_SUFFIX = ".16k.pcm"
+
+
+def normalized_path(audio_path) -> Path:
+    """Where the normalized PCM for a clip lives"""
+    audio_path = Path(audio_path)
+    return audio_path.with_name(audio_path.name + NORMALIZED_SUFFIX)
+
+
+def is_normalized(audio_path) -> bool:
+    """
+    True when the PCM cache is current: newer than the clip, or the clip
+    itself is gone (retention compacted or archived it) - then the cache
+    is all there is, and still what Whisper needs.
+    """
+    try:
+        pcm_mtime = normalized_path(audio_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    try:
+        return pcm_mtime >= Path(audio_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def store_normalized(audio_path, audio) -> Path:
+    """Write already-decoded 16 kHz mono float32 audio as the clip's PCM cache"""
+    import numpy as np
+
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    pcm_path = normalized_path(audio_path)
+    temp_path = pcm_path.with_name(pcm_path.name + ".tmp")
+    pcm.tofile(temp_path)
+    os.replace(temp_path, pcm_path)
+    return pcm_path
+
+
+def normalize_clip(audio_path) -> Path:
+    """Decode the clip's container once (blocking); returns the PCM path"""
+    if is_normalized(audio_path):
+        return normalized_path(audio_path)
+
+    from faster_whisper import decode_audio
+
+    audio = decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE)
+    pcm_path = store_normalized(audio_path, audio)
+    print(f"[HEARSAY] Normalized {Path(audio_path).name}: {len(audio) / SAMPLE_RATE:.1f}s of 16 kHz mono")
+    return pcm_path
+
+
+def load_normalized(audio_path):
+    """
+    The clip as 16 kHz mono float32, ready for Whisper. Decodes the
+    container only if there is no current PCM cache.
+    """
+    import numpy as np
+
+    pcm_path = normalize_clip(audio_path)
+    if pcm_path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.float32)
+    pcm = np.memmap(pcm_path, dtype="<i2", mode="r")
+    return pcm.astype(np.float32) / 32768.0
+
+
+def remove_normalized(audio_path):
+    normalized_path(audio_path).unlink(missing_ok=True)
@@ -0,0 +1,9 @@
+"""
+HEARSAY Bench - offline benchmark and load test
+─────────────────────────────────────────────────────────────────────────────
+stubs.py     local Simli and Anthropic stand-ins (latency, errors)
+fixtures.py  synthetic conversation audio for Whisper
+loadtest.py  scenarios, p50/p95/p99 report, saved baselines
+
+Run from backend/:  python -m bench --scenario night
+"""
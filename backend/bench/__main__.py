@@ -0,0 +1,5 @@
+import sys
+
+from bench.loadtest import main
+
+sys.exit(main())
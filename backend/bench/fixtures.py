@@ -0,0 +1,85 @@
+"""
+HEARSAY Bench Fixtures - synthetic conversation audio
+─────────────────────────────────────────────────────────────────────────────
+Recorded guests can't go in the repo, so the benchmark synthesises clips:
+16 kHz mono WAV with "utterances" (a voiced harmonic stack with a drifting
+pitch, amplitude-modulated at a syllable rate) separated by pauses, over a
+low noise floor. Whisper won't find words in it, but decoding, resampling,
+VAD and inference cost scale with duration and speech ratio the way real
+recordings do, which is what the benchmark measures.
+
+Clips are deterministic for a given seed and cached by their parameters.
+
+Run on its own:
+    python -m bench.fixtures --seconds 30 --out /tmp/clip.wav
+"""
+
+import math
+import wave
+import random
+import argparse
+from array import array
+from pathlib import Path
+
+SAMPLE_RATE = 16000
+
+
+def synth_samples(seconds: float, speech_ratio: float = 0.6, seed: int = 0) -> array:
+    """16-bit samples for one clip"""
+    rng = random.Random(seed)
+    total = int(seconds * SAMPLE_RATE)
+    samples = array("h", [0]) * total
+
+    position = int(rng.uniform(0.3, 0.8) * SAMPLE_RATE)
+    while position < total:
+        # Utterance of 0.8-4 s, then a pause sized to hit the speech ratio
+        length = int(rng.uniform(0.8, 4.0) * SAMPLE_RATE)
+        pause = int(length * (1 - speech_ratio) / max(speech_ratio, 0.05) * rng.uniform(0.5, 1.5))
+        pitch = rng.uniform(100, 220)
+        syllables = rng.uniform(3.5, 5.5)
+        phase = 0.0
+        for i in range(min(length, total - position)):
+            t = i / SAMPLE_RATE
+            f0 = pitch * (1 + 0.08 * math.sin(2 * math.pi * 0.7 * t))
+            phase += 2 * math.pi * f0 / SAMPLE_RATE
+            envelope = 0.5 * (1 - math.cos(2 * math.pi * syllables * t)) * min(1.0, t * 20, (length / SAMPLE_RATE - t) * 20)
+            voiced = sum(math.sin(k * phase) / k for k in range(1, 6))
+            samples[position + i] = int(9000 * envelope * voiced)
+        position += length + pause
+
+    for i in range(total):
+        samples[i] = max(-32768, min(32767, samples[i] + int(rng.gauss(0, 120))))
+    return samples
+
+
+def write_wav(path: Path, samples: array):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+
+def clip(directory: Path, seconds: float, speech_ratio: float = 0.6, seed: int = 0) -> Path:
+    """Path to a synthetic clip with these parameters, generated on first use"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"synthetic_{seconds:g}s_{speech_ratio:g}_{seed}.wav"
+    if not path.exists():
+        write_wav(path, synth_samples(seconds, speech_ratio, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic conversation clip")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--speech-ratio", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args()
+
+    write_wav(args.out, synth_samples(args.seconds, args.speech_ratio, args.seed))
+    print(f"[HEARSAY] Wrote {args.out} ({args.seconds:g}s)")
+
+
+if __name__ == "__main__":
+    main()
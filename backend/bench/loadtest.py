@@ -0,0 +1,481 @@
+"""
+HEARSAY Bench Load Test - latency and throughput under a night's load
+─────────────────────────────────────────────────────────────────────────────
+Starts the upstream stubs (stubs.py) and a Hearsay server pointed at them
+(SIMLI_API_URL / ANTHROPIC_API_URL, a throwaway catalog and upload dir),
+then runs a scenario of concurrent operations spread over a ramp:
+
+  walkups   POST /api/simli-token, then poll /api/simli-transcript until the
+            Simli transcript arrives
+  uploads   POST /api/upload-audio with a synthetic clip (fixtures.py), then
+            poll the transcription job until Whisper is done
+  chapters  POST /api/writing-engine/stream with unique transcripts, timing
+            the first delta and the finished chapter
+
+Each operation's latency is reported as p50/p95/p99/mean/max with its error
+count and throughput. Results can be saved as a named baseline
+(bench/baselines/<name>.json) and later runs compared against it; the
+comparison exits non-zero when a percentile regresses past the tolerance.
+
+Uploads run real Whisper: the model must already be in the local cache
+(HF_HUB_OFFLINE is set), or use --uploads 0.
+
+Usage (from backend/):
+    python -m bench --scenario night
+    python -m bench --scenario night --save main
+    python -m bench --scenario night --compare main
+    python -m bench --walkups 100 --uploads 0 --chapters 10 --anthropic-error-rate 0.05
+    python -m bench --target http://127.0.0.1:8000 --no-stubs   (an already running server)
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+import tempfile
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench import fixtures, stubs
+from token_pool import load_character_faces
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+PERCENTILES = (50, 95, 99)
+POLL_INTERVAL = 0.25
+OPERATION_TIMEOUT = 600.0
+
+
+@dataclass
+class Scenario:
+    walkups: int
+    uploads: int
+    chapters: int
+    clip_seconds: float = 30.0
+    speech_ratio: float = 0.6
+    # Operations start at random points within the first `ramp` seconds
+    ramp: float = 5.0
+    conversations_per_chapter: int = 4
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "smoke": Scenario(walkups=5, uploads=2, chapters=1, clip_seconds=10, ramp=1),
+    "night": Scenario(walkups=40, uploads=16, chapters=6),
+    "rush": Scenario(walkups=150, uploads=48, chapters=20, ramp=10),
+}
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile of sorted `values`"""
+    if not values:
+        return None
+    rank = (len(values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class Recorder:
+    """Latencies and errors per operation name"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.notes: Dict[str, int] = {}
+
+    def ok(self, operation: str, seconds: float):
+        self.latencies.setdefault(operation, []).append(seconds)
+        self.errors.setdefault(operation, {})
+
+    def error(self, operation: str, reason: str):
+        self.latencies.setdefault(operation, [])
+        errors = self.errors.setdefault(operation, {})
+        errors[reason] = errors.get(reason, 0) + 1
+
+    def note(self, name: str):
+        self.notes[name] = self.notes.get(name, 0) + 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        operations = {}
+        for operation in sorted(self.latencies):
+            values = sorted(self.latencies[operation])
+            errors = self.errors.get(operation, {})
+            operations[operation] = {
+                "count": len(values),
+                "errors": sum(errors.values()),
+                "errorReasons": errors,
+                **{f"p{p}": _ms(percentile(values, p)) for p in PERCENTILES},
+                "mean": _ms(sum(values) / len(values) if values else None),
+                "max": _ms(values[-1] if values else None),
+                "throughput": round(len(values) / wall_seconds, 3) if wall_seconds else None
+            }
+        return operations
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Operations
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def walkup(client: httpx.AsyncClient, recorder: Recorder, agent_id: str, face_id: str, session_id: str):
+    started = time.perf_counter()
+    response = await client.post("/api/simli-token", params={"agentId": agent_id, "faceId": face_id})
+    if response.status_code != 200:
+        recorder.error("walkup.token", str(response.status_code))
+        return
+    recorder.ok("walkup.token", time.perf_counter() - started)
+    data = response.json()
+    recorder.note("token.pooled" if data.get("pooled") else "token.minted")
+
+    # The conversation ends; the frontend then asks for the transcript
+    simli_session_id = data.get("sessionId")
+    started = time.perf_counter()
+    while time.perf_counter() - started < OPERATION_TIMEOUT:
+        response = await client.get(f"/api/simli-transcript/{simli_session_id}", params={"sessionId": session_id})
+        if response.status_code == 200:
+            recorder.ok("walkup.transcript", time.perf_counter() - started)
+            return
+        if response.status_code != 202:
+            recorder.error("walkup.transcript", str(response.status_code))
+            return
+        await asyncio.sleep(POLL_INTERVAL * 4)
+    recorder.error("walkup.transcript", "timeout")
+
+
+async def upload(client: httpx.AsyncClient, recorder: Recorder, clip: Path, session_id: str, index: int):
+    started = time.perf_counter()
+    with open(clip, "rb") as f:
+        response = await client.post(
+            "/api/upload-audio",
+            data={
+                "sessionId": session_id,
+                "characterId": f"bench-{index % 4}",
+                "characterName": f"Bench {index % 4}",
+                "duration": "0",
+                "timestamp": str(int(time.time() * 1000))
+            },
+            files={"audio": (clip.name, f, "audio/wav")}
+        )
+    if response.status_code != 200:
+        recorder.error("upload", str(response.status_code))
+        return
+    recorder.ok("upload", time.perf_counter() - started)
+
+    # Upload to transcript: what the guest waits for before the chapter
+    job_id = response.json()["jobId"]
+    while time.perf_counter() - started < OPERATION_TIMEOUT:
+        await asyncio.sleep(POLL_INTERVAL)
+        response = await client.get(f"/api/transcription/{job_id}")
+        if response.status_code == 404:
+            break  # Finished and pruned from the pool
+        status = response.json().get("status")
+        if status in ("queued", "running"):
+            continue
+        if status == "error":
+            recorder.error("transcription", response.json().get("error") or "error")
+            return
+        break
+    else:
+        recorder.error("transcription", "timeout")
+        return
+    recorder.ok("transcription", time.perf_counter() - started)
+
+
+async def chapter(client: httpx.AsyncClient, recorder: Recorder, session_id: str, conversations: int):
+    # Unique transcripts, so the chapter cache can't answer for Claude
+    nonce = uuid.uuid4().hex[:8]
+    body = {
+        "sessionId": session_id,
+        "chapterLength": "medium",
+        "transcripts": [
+            {
+                "character": f"Bench {i}",
+                "timestamp": datetime.utcnow().isoformat(),
+                "transcript": [
+                    {"speaker": "user", "text": f"Have we met before? ({nonce})"},
+                    {"speaker": f"Bench {i}", "text": "Every night, in this corridor, at this hour."}
+                ]
+            }
+            for i in range(conversations)
+        ]
+    }
+
+    started = time.perf_counter()
+    first_delta = False
+    event = None
+    async with client.stream("POST", "/api/writing-engine/stream", json=body) as response:
+        if response.status_code != 200:
+            recorder.error("chapter", str(response.status_code))
+            return
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                if event == "delta" and not first_delta:
+                    first_delta = True
+                    recorder.ok("chapter.first_delta", time.perf_counter() - started)
+                elif event == "complete":
+                    recorder.ok("chapter", time.perf_counter() - started)
+                    return
+                elif event == "error":
+                    recorder.error("chapter", json.loads(line[5:]).get("error", "error")[:60])
+                    return
+    recorder.error("chapter", "stream ended")
+
+
+async def run_scenario(target: str, scenario: Scenario, clip: Optional[Path], seed: int) -> dict:
+    recorder = Recorder()
+    rng = random.Random(seed)
+    faces = load_character_faces(BACKEND_DIR.parent / "config.js") or [("bench-agent", "bench-face")]
+
+    async def delayed(operation, *args):
+        await asyncio.sleep(rng.uniform(0, scenario.ramp))
+        try:
+            await operation(*args)
+        except httpx.HTTPError as e:
+            recorder.error(operation.__name__, type(e).__name__)
+
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=target, timeout=OPERATION_TIMEOUT, limits=limits) as client:
+        tasks = []
+        for i in range(scenario.walkups):
+            agent_id, face_id = faces[i % len(faces)]
+            tasks.append(delayed(walkup, client, recorder, agent_id, face_id, f"bench-walkup-{i}"))
+        for i in range(scenario.uploads):
+            tasks.append(delayed(upload, client, recorder, clip, f"bench-upload-{i // 4}", i))
+        for i in range(scenario.chapters):
+            tasks.append(delayed(chapter, client, recorder, f"bench-chapter-{i}", scenario.conversations_per_chapter))
+
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+
+        health = (await client.get("/api/health")).json()
+
+    return {
+        "wallSeconds": round(wall, 2),
+        "operations": recorder.summary(wall),
+        "notes": recorder.notes,
+        "server": {
+            key: health.get(key)
+            for key in ("transcription", "anthropic_scheduler", "token_pool", "chapter_cache")
+        }
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Processes
+# ─────────────────────────────────────────────────────────────────────────────
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_up(url: str, process: Optional[subprocess.Popen], timeout: float = 180.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_server(port: int, simli_url: str, anthropic_url: str, workdir: Path, log) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "SIMLI_API_KEY": "bench",
+        "ELEVENLABS_API_KEY": "bench",
+        "ANTHROPIC_API_KEY": "bench",
+        "SIMLI_API_URL": simli_url,
+        "ANTHROPIC_API_URL": anthropic_url,
+        "CATALOG_PATH": str(workdir / "hearsay.db"),
+        "AUDIO_UPLOAD_DIR": str(workdir / "audio_uploads"),
+        # Never download a Whisper model mid-benchmark
+        "HF_HUB_OFFLINE": "1",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Report and baselines
+# ─────────────────────────────────────────────────────────────────────────────
+
+def print_report(result: dict):
+    print(f"\n[HEARSAY] Wall time {result['wallSeconds']}s")
+    print(f"{'operation':<22}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}{'ops/s':>8}")
+    for name, op in result["operations"].items():
+        cells = [op[key] if op[key] is not None else "-" for key in ("p50", "p95", "p99", "max")]
+        print(f"{name:<22}{op['count']:>7}{op['errors']:>8}"
+              + "".join(f"{cell:>10}" for cell in cells)
+              + f"{op['throughput'] or 0:>8}")
+        if op["errorReasons"]:
+            print(f"{'':<22}errors: {op['errorReasons']}")
+    if result["notes"]:
+        print(f"[HEARSAY] Notes: {result['notes']}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, result: dict, tolerance: float) -> List[str]:
+    """Print the percentile changes; return the regressions past `tolerance`"""
+    regressions = []
+    print(f"\n[HEARSAY] Against baseline {baseline.get('name')} ({baseline.get('commit') or 'unknown commit'})")
+    for name, op in result["operations"].items():
+        before = baseline["operations"].get(name)
+        if before is None:
+            continue
+        changes = []
+        for key in ("p50", "p95", "p99"):
+            old, new = before.get(key), op.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            changes.append(f"{key} {old:.0f}→{new:.0f} ({change:+.0%})")
+            if change > tolerance:
+                regressions.append(f"{name} {key} {change:+.0%}")
+        if op["errors"] > before.get("errors", 0):
+            regressions.append(f"{name} errors {before.get('errors', 0)}→{op['errors']}")
+        print(f"  {name:<22}" + "  ".join(changes))
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hearsay offline benchmark")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="smoke")
+    parser.add_argument("--walkups", type=int, help="override the scenario's walkups")
+    parser.add_argument("--uploads", type=int, help="override the scenario's uploads")
+    parser.add_argument("--chapters", type=int, help="override the scenario's chapters")
+    parser.add_argument("--clip-seconds", type=float, help="synthetic clip length")
+    parser.add_argument("--ramp", type=float, help="seconds over which operations start")
+    parser.add_argument("--target", help="benchmark a running server instead of starting one")
+    parser.add_argument("--no-stubs", action="store_true", help="don't start the upstream stubs (with --target)")
+    parser.add_argument("--save", metavar="NAME", help="save the result as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baselines/NAME.json")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed percentile regression (default 0.15)")
+    parser.add_argument("--json", type=Path, help="also write the result here")
+    stubs.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenario = replace(SCENARIOS[args.scenario], **{
+        key: value for key, value in {
+            "walkups": args.walkups, "uploads": args.uploads, "chapters": args.chapters,
+            "clip_seconds": args.clip_seconds, "ramp": args.ramp
+        }.items() if value is not None
+    })
+    stub_config = stubs.config_from_args(args)
+    workdir = Path(tempfile.mkdtemp(prefix="hearsay-bench-"))
+    print(f"[HEARSAY] Bench {args.scenario}: {asdict(scenario)}")
+    print(f"[HEARSAY] Work dir (server log, catalog, fixtures): {workdir}")
+
+    clip = fixtures.clip(workdir / "fixtures", scenario.clip_seconds, scenario.speech_ratio, args.seed) \
+        if scenario.uploads else None
+
+    stub_task = None
+    if not args.no_stubs:
+        simli_port, anthropic_port = free_port(), free_port()
+        stub_task = asyncio.create_task(stubs.serve(stubs.Stubs(stub_config), simli_port, anthropic_port))
+        await wait_until_up(f"http://127.0.0.1:{simli_port}/healthz", None)
+        await wait_until_up(f"http://127.0.0.1:{anthropic_port}/healthz", None)
+
+    server = None
+    log = open(workdir / "server.log", "w")
+    try:
+        target = args.target
+        if target is None:
+            port = free_port()
+            server = start_server(
+                port, f"http://127.0.0.1:{simli_port}", f"http://127.0.0.1:{anthropic_port}", workdir, log
+            )
+            target = f"http://127.0.0.1:{port}"
+            # Measure a warm server; without uploads the model isn't needed
+            await wait_until_up(f"{target}/api/ready" if scenario.uploads else f"{target}/api/health", server)
+
+        result = await run_scenario(target, scenario, clip, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        log.close()
+        if stub_task is not None:
+            stub_task.cancel()
+            await asyncio.gather(stub_task, return_exceptions=True)
+
+    return {
+        "scenario": {"name": args.scenario, **asdict(scenario)},
+        "stubs": asdict(stub_config),
+        "commit": git_commit(),
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        **result
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.no_stubs and not args.target:
+        print("[HEARSAY] --no-stubs needs --target (a server already pointed at its upstreams)")
+        return 2
+    baseline = None
+    if args.compare:
+        path = BASELINES_DIR / f"{args.compare}.json"
+        if not path.exists():
+            print(f"[HEARSAY] No baseline at {path}")
+            return 2
+        baseline = json.loads(path.read_text())
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+    if args.save:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        path = BASELINES_DIR / f"{args.save}.json"
+        path.write_text(json.dumps({"name": args.save, **result}, indent=2))
+        print(f"[HEARSAY] Baseline saved: {path}")
+    if baseline is not None:
+        if baseline.get("scenario") != result["scenario"] or baseline.get("stubs") != result["stubs"]:
+            print("[HEARSAY] Warning: baseline was recorded with a different scenario or stub settings")
+        regressions = compare(baseline, result, args.tolerance)
+        if regressions:
+            print(f"[HEARSAY] Regressions past {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+        print("[HEARSAY] No regressions")
+    return 0
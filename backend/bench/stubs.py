@@ -0,0 +1,254 @@
+"""
+HEARSAY Bench Stubs - local stand-ins for Simli and Anthropic
+─────────────────────────────────────────────────────────────────────────────
+Two small FastAPI apps that answer the calls server.py makes upstream, with
+configurable latency and error rates, so the benchmark runs with no network
+and no API spend:
+
+  Simli      POST /auto/token             → session token + sessionId
+             GET  /auto/transcript/{id}   → 404 until the transcript is "ready"
+  Anthropic  POST /v1/messages            → a chapter of filler prose, in one
+                                            response or streamed as SSE, with
+                                            usage and anthropic-ratelimit-* headers
+
+Errors are injected at the configured rate: Simli answers 503, Anthropic
+answers 529 (overloaded) or 429 with Retry-After, the same as the real APIs
+under load.
+
+Run on their own:
+    python -m bench.stubs --simli-port 9101 --anthropic-port 9102
+"""
+
+import time
+import json
+import uuid
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FILLER = (
+    "The corridor light hummed above the carpet and the night porter pretended "
+    "not to listen while the guest in the green coat explained, again, why the "
+    "key would not turn in the lock of Room 412"
+).split()
+
+
+@dataclass
+class StubConfig:
+    # Simli
+    simli_latency: float = 0.15          # seconds per call (mean)
+    simli_error_rate: float = 0.0
+    transcript_delay: float = 2.0        # seconds after minting before the transcript exists
+    # Anthropic
+    anthropic_ttft: float = 1.0          # seconds to headers / first delta
+    anthropic_tokens_per_second: float = 400.0
+    anthropic_words: int = 600           # words per response
+    anthropic_error_rate: float = 0.0
+    # Spread around each mean: latency * uniform(1 - jitter, 1 + jitter)
+    jitter: float = 0.3
+    seed: int = 0
+
+
+class Stubs:
+    """Both stub apps plus the shared state and counters behind them"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.minted: dict = {}  # sessionId -> minted at (monotonic)
+        self.calls = {"token": 0, "transcript": 0, "messages": 0, "errors": 0}
+        self.simli = self._simli_app()
+        self.anthropic = self._anthropic_app()
+
+    def _delay(self, mean: float) -> float:
+        jitter = self.config.jitter
+        return max(0.0, mean * self.random.uniform(1 - jitter, 1 + jitter))
+
+    def _fail(self, rate: float) -> bool:
+        if rate > 0 and self.random.random() < rate:
+            self.calls["errors"] += 1
+            return True
+        return False
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Simli
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _simli_app(self) -> FastAPI:
+        app = FastAPI(title="Simli stub")
+        config = self.config
+
+        @app.get("/healthz")
+        async def healthz():
+            return {"status": "ok", "calls": self.calls}
+
+        @app.post("/auto/token")
+        async def token(request: Request):
+            self.calls["token"] += 1
+            body = await request.json()
+            await asyncio.sleep(self._delay(config.simli_latency))
+            if self._fail(config.simli_error_rate):
+                return JSONResponse(status_code=503, content={"detail": "stub: unavailable"})
+            session_id = str(uuid.uuid4())
+            self.minted[session_id] = time.monotonic()
+            return {
+                "session_token": f"stub-{uuid.uuid4().hex}",
+                "sessionId": session_id,
+                "agentId": body.get("agentId")
+            }
+
+        @app.get("/auto/transcript/{session_id}")
+        async def transcript(session_id: str):
+            self.calls["transcript"] += 1
+            await asyncio.sleep(self._delay(config.simli_latency))
+            if self._fail(config.simli_error_rate):
+                return JSONResponse(status_code=503, content={"detail": "stub: unavailable"})
+            minted = self.minted.get(session_id)
+            if minted is None or time.monotonic() - minted < config.transcript_delay:
+                return JSONResponse(status_code=404, content={"detail": "Transcript not found"})
+            return {
+                "sessionId": session_id,
+                "transcript": [
+                    {"role": "user", "message": "Is this the way to the ballroom?"},
+                    {"role": "agent", "message": " ".join(self._words(40))}
+                ]
+            }
+
+        return app
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Anthropic
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _words(self, count: int) -> list:
+        start = self.random.randrange(len(FILLER))
+        return [FILLER[(start + i) % len(FILLER)] for i in range(count)]
+
+    @staticmethod
+    def _input_tokens(body: dict) -> int:
+        return len(json.dumps(body.get("system", "")) + json.dumps(body.get("messages", []))) // 4
+
+    def _anthropic_error(self) -> JSONResponse:
+        if self.random.random() < 0.5:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "1"},
+                content={"type": "error", "error": {"type": "rate_limit_error", "message": "stub: rate limited"}}
+            )
+        return JSONResponse(
+            status_code=529,
+            content={"type": "error", "error": {"type": "overloaded_error", "message": "stub: overloaded"}}
+        )
+
+    def _anthropic_app(self) -> FastAPI:
+        app = FastAPI(title="Anthropic stub")
+        config = self.config
+        headers = {
+            "anthropic-ratelimit-requests-remaining": "1000",
+            "anthropic-ratelimit-input-tokens-remaining": "1000000"
+        }
+
+        @app.get("/healthz")
+        async def healthz():
+            return {"status": "ok", "calls": self.calls}
+
+        @app.post("/v1/messages")
+        async def messages(request: Request):
+            self.calls["messages"] += 1
+            body = await request.json()
+            await asyncio.sleep(self._delay(config.anthropic_ttft))
+            if self._fail(config.anthropic_error_rate):
+                return self._anthropic_error()
+
+            # Scene notes and summaries are shorter than chapters
+            words = self._words(min(config.anthropic_words, int(body.get("max_tokens", 8192) * 0.7)))
+            usage = {"input_tokens": self._input_tokens(body), "output_tokens": int(len(words) * 1.3)}
+
+            if not body.get("stream"):
+                await asyncio.sleep(usage["output_tokens"] / config.anthropic_tokens_per_second)
+                return JSONResponse(headers=headers, content={
+                    "id": f"msg_stub_{uuid.uuid4().hex[:12]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "text", "text": " ".join(words)}],
+                    "stop_reason": "end_turn",
+                    "usage": usage
+                })
+
+            async def events():
+                def event(kind: str, data: dict) -> str:
+                    return f"event: {kind}\ndata: {json.dumps({'type': kind, **data})}\n\n"
+
+                yield event("message_start", {"message": {"usage": {"input_tokens": usage["input_tokens"]}}})
+                # ~10 words per delta, paced at the configured token rate
+                pause = 13 / config.anthropic_tokens_per_second
+                for i in range(0, len(words), 10):
+                    yield event("content_block_delta", {
+                        "index": 0, "delta": {"type": "text_delta", "text": " ".join(words[i:i + 10]) + " "}
+                    })
+                    await asyncio.sleep(pause)
+                yield event("message_delta", {"usage": {"output_tokens": usage["output_tokens"]}})
+                yield event("message_stop", {})
+
+            return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+        return app
+
+
+async def serve(stubs: Stubs, simli_port: int, anthropic_port: int, host: str = "127.0.0.1"):
+    """Run both stub apps until cancelled"""
+    import uvicorn
+
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+        for app, port in ((stubs.simli, simli_port), (stubs.anthropic, anthropic_port))
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Stub settings shared by this module's CLI and the load test's"""
+    defaults = StubConfig()
+    group = parser.add_argument_group("upstream stubs")
+    group.add_argument("--simli-latency", type=float, default=defaults.simli_latency)
+    group.add_argument("--simli-error-rate", type=float, default=defaults.simli_error_rate)
+    group.add_argument("--transcript-delay", type=float, default=defaults.transcript_delay)
+    group.add_argument("--anthropic-ttft", type=float, default=defaults.anthropic_ttft)
+    group.add_argument("--anthropic-tokens-per-second", type=float, default=defaults.anthropic_tokens_per_second)
+    group.add_argument("--anthropic-words", type=int, default=defaults.anthropic_words)
+    group.add_argument("--anthropic-error-rate", type=float, default=defaults.anthropic_error_rate)
+    group.add_argument("--jitter", type=float, default=defaults.jitter)
+    group.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        simli_latency=args.simli_latency,
+        simli_error_rate=args.simli_error_rate,
+        transcript_delay=args.transcript_delay,
+        anthropic_ttft=args.anthropic_ttft,
+        anthropic_tokens_per_second=args.anthropic_tokens_per_second,
+        anthropic_words=args.anthropic_words,
+        anthropic_error_rate=args.anthropic_error_rate,
+        jitter=args.jitter,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Simli and Anthropic stand-ins")
+    parser.add_argument("--simli-port", type=int, default=9101)
+    parser.add_argument("--anthropic-port", type=int, default=9102)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"[HEARSAY] Stubs: Simli on :{args.simli_port}, Anthropic on :{args.anthropic_port}")
+    asyncio.run(serve(Stubs(config_from_args(args)), args.simli_port, args.anthropic_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+HEARSAY Catalog - SQLite index of recordings and transcripts
+─────────────────────────────────────────────────────────────────────────────
+One row per recorded clip (session, character, timestamp, status,
+transcript). Replaces the per-clip JSON sidecars, so listing a session or
+counting its pending clips is one indexed query instead of a directory glob
+plus a json.load per file - and sessions can be queried together.
+
+Timed segments live beside the clips table in a packed, per-clip form
+(segment_store.py), so a time window is read without the whole transcript.
+
+The database runs in WAL mode so polling readers never block the
+transcription workers writing results. Connections are per thread (and per
+process, for the process-pool executor).
+
+Environment Variables:
+    CATALOG_PATH - SQLite file (default: backend/audio_uploads/hearsay.db)
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from segment_store import SegmentStore
+
+CATALOG_PATH = Path(os.getenv(
+    "CATALOG_PATH",
+    str(Path(__file__).parent / "audio_uploads" / "hearsay.db")
+))
+
+# Column name → API field name (matches the old sidecar JSON keys)
+FIELDS = {
+    "id": "clipId",
+    "session_id": "sessionId",
+    "character_id": "characterId",
+    "character_name": "characterName",
+    "duration": "duration",
+    "timestamp": "timestamp",
+    "filename": "filename",
+    "audio_path": "audioPath",
+    "status": "status",
+    "transcript": "transcript",
+    "partial": "partial",
+    "language": "language",
+    "language_prob": "languageProb",
+    "error": "error",
+    "audio_seconds": "audioSeconds",
+    "speech_seconds": "speechSeconds",
+    "transcribe_seconds": "transcribeSeconds",
+    "created_at": "createdAt",
+    "updated_at": "updatedAt",
+}
+COLUMNS = {api: column for column, api in FIELDS.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id     TEXT NOT NULL,
+    character_id   TEXT NOT NULL,
+    character_name TEXT,
+    duration       INTEGER DEFAULT 0,
+    timestamp      INTEGER DEFAULT 0,
+    filename       TEXT NOT NULL,
+    audio_path     TEXT NOT NULL,
+    status         TEXT NOT NULL,
+    transcript     TEXT,
+    partial        TEXT,
+    language       TEXT,
+    language_prob  REAL,
+    error          TEXT,
+    audio_seconds      REAL,
+    speech_seconds     REAL,
+    transcribe_seconds REAL,
+    created_at     TEXT NOT NULL,
+    updated_at     TEXT NOT NULL,
+    UNIQUE (session_id, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_clips_session ON clips (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_clips_status ON clips (status, session_id);
+CREATE INDEX IF NOT EXISTS idx_clips_character ON clips (character_id, timestamp);
+"""
+
+
+class Catalog:
+    """Thread-safe access to the clips table"""
+
+    def __init__(self, path: Path = CATALOG_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+        self.segments = SegmentStore(self.connection)
+
+    def connection(self) -> sqlite3.Connection:
+        # A connection must not cross threads or a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        return {FIELDS[column]: row[column] for column in row.keys() if column in FIELDS}
+
+    def add_clip(
+        self,
+        session_id: str,
+        character_id: str,
+        character_name: str,
+        duration: int,
+        timestamp: int,
+        audio_path: Path,
+        status: str = "pending_transcription"
+    ) -> int:
+        """Register a clip and return its id"""
+        now = datetime.utcnow().isoformat()
+        cursor = self.connection().execute(
+            """
+            INSERT INTO clips (session_id, character_id, character_name, duration,
+                               timestamp, filename, audio_path, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (session_id, character_id, character_name, duration, timestamp,
+             audio_path.name, str(audio_path), status, now, now)
+        )
+        return cursor.lastrowid
+
+    def update_clip(self, clip_id: int, **fields) -> None:
+        """
+        Update clip fields, given by their API names (status=..., transcript=...).
+        segments=[...] replaces the clip's timed segments; segments=None drops them.
+        """
+        if "segments" in fields:
+            segments = fields.pop("segments")
+            if segments is None:
+                self.segments.delete(clip_id)
+            else:
+                self.segments.put(clip_id, segments)
+
+        assignments = []
+        values = []
+        for name, value in fields.items():
+            assignments.append(f"{COLUMNS[name]} = ?")
+            values.append(value)
+        assignments.append("updated_at = ?")
+        values.append(datetime.utcnow().isoformat())
+        values.append(clip_id)
+        self.connection().execute(
+            f"UPDATE clips SET {', '.join(assignments)} WHERE id = ?", values
+        )
+
+    def delete_clip(self, clip_id: int) -> None:
+        self.segments.delete(clip_id)
+        self.connection().execute("DELETE FROM clips WHERE id = ?", (clip_id,))
+
+    def get_clip(self, clip_id: int) -> Optional[dict]:
+        row = self.connection().execute("SELECT * FROM clips WHERE id = ?", (clip_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def session_clips(self, session_id: str) -> List[dict]:
+        """All clips for a session, oldest first"""
+        rows = self.connection().execute(
+            "SELECT * FROM clips WHERE session_id = ? ORDER BY timestamp", (session_id,)
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def clip_segments(self, clip_id: int, start: Optional[float] = None,
+                      end: Optional[float] = None, words: bool = True) -> List[dict]:
+        """A clip's segments overlapping [start, end) seconds into the clip"""
+        segments = self.segments.get(clip_id)
+        return segments.slice(start, end, words) if segments else []
+
+    def session_segments(
+        self,
+        session_id: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        character_id: Optional[str] = None,
+        words: bool = False
+    ) -> List[dict]:
+        """
+        A session's segments between two wall-clock times (ms since the
+        epoch, like clip timestamps), oldest first. Each segment carries its
+        clip and `at`, its absolute start in ms. Only clips that overlap the
+        window are read.
+        """
+        query = "SELECT * FROM clips WHERE session_id = ?"
+        params: list = [session_id]
+        if until is not None:
+            query += " AND timestamp < ?"
+            params.append(until)
+        if character_id is not None:
+            query += " AND character_id = ?"
+            params.append(character_id)
+        rows = self.connection().execute(query + " ORDER BY timestamp", params).fetchall()
+
+        results = []
+        for row in rows:
+            clip = self._to_dict(row)
+            origin = clip["timestamp"] or 0
+            length_ms = (clip["audioSeconds"] or 0) * 1000 or clip["duration"] or 0
+            if since is not None and length_ms and origin + length_ms <= since:
+                continue
+            start = (since - origin) / 1000 if since is not None and since > origin else None
+            end = (until - origin) / 1000 if until is not None else None
+            for segment in self.clip_segments(clip["clipId"], start, end, words):
+                results.append({
+                    "clipId": clip["clipId"],
+                    "characterId": clip["characterId"],
+                    "characterName": clip["characterName"],
+                    "at": origin + int(segment["start"] * 1000),
+                    **segment
+                })
+        return results
+
+    def count_clips(self, session_id: str, statuses: tuple) -> int:
+        """Number of a session's clips in any of `statuses`"""
+        placeholders = ", ".join("?" for _ in statuses)
+        return self.connection().execute(
+            f"SELECT COUNT(*) FROM clips WHERE session_id = ? AND status IN ({placeholders})",
+            (session_id, *statuses)
+        ).fetchone()[0]
+
+    def clips_with_status(self, statuses: tuple) -> List[dict]:
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self.connection().execute(
+            f"SELECT * FROM clips WHERE status IN ({placeholders}) ORDER BY created_at",
+            statuses
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def list_sessions(self, limit: int = 50, pending_statuses: tuple = ()) -> List[dict]:
+        """Most recent sessions with clip and pending counts"""
+        placeholders = ", ".join("?" for _ in pending_statuses) or "NULL"
+        rows = self.connection().execute(
+            f"""
+            SELECT session_id,
+                   COUNT(*) AS clips,
+                   SUM(status IN ({placeholders})) AS pending,
+                   SUM(duration) AS duration,
+                   MIN(timestamp) AS first_timestamp,
+                   MAX(timestamp) AS last_timestamp
+            FROM clips
+            GROUP BY session_id
+            ORDER BY last_timestamp DESC
+            LIMIT ?
+            """,
+            (*pending_statuses, limit)
+        ).fetchall()
+        return [
+            {
+                "sessionId": row["session_id"],
+                "clips": row["clips"],
+                "pendingCount": row["pending"] or 0,
+                "duration": row["duration"] or 0,
+                "firstTimestamp": row["first_timestamp"],
+                "lastTimestamp": row["last_timestamp"]
+            }
+            for row in rows
+        ]
+
+    def speech_stats(self) -> dict:
+        """
+        Audio vs. speech vs. Whisper compute over all transcribed clips -
+        how much listening time VAD keeps away from the model.
+        """
+        row = self.connection().execute(
+            """
+            SELECT COUNT(*) AS clips,
+                   COALESCE(SUM(audio_seconds), 0) AS audio,
+                   COALESCE(SUM(speech_seconds), 0) AS speech,
+                   COALESCE(SUM(transcribe_seconds), 0) AS compute
+            FROM clips
+            WHERE status = 'transcribed' AND audio_seconds IS NOT NULL
+            """
+        ).fetchone()
+        audio = row["audio"]
+        return {
+            "clips": row["clips"],
+            "audioSeconds": round(audio, 1),
+            "speechSeconds": round(row["speech"], 1),
+            "speechRatio": round(row["speech"] / audio, 3) if audio else None,
+            "transcribeSeconds": round(row["compute"], 1),
+            "rtf": round(row["compute"] / audio, 3) if audio else None
+        }
+
+    def import_sidecars(self, audio_dir: Path) -> int:
+        """
+        One-time migration: load any legacy `<clip>.json` sidecars into the
+        catalog and remove them. Returns the number of clips imported.
+        """
+        imported = 0
+        for metadata_file in audio_dir.glob("*/*.json"):
+            if metadata_file.parent.name.startswith("."):
+                continue
+            try:
+                with open(metadata_file, "r") as f:
+                    metadata = json.load(f)
+
+                audio_path = metadata_file.parent / metadata["filename"]
+                try:
+                    clip_id = self.add_clip(
+                        metadata["sessionId"],
+                        metadata.get("characterId", "unknown"),
+                        metadata.get("characterName"),
+                        int(metadata.get("duration") or 0),
+                        int(metadata.get("timestamp") or 0),
+                        audio_path,
+                        metadata.get("status", "pending_transcription")
+                    )
+                except sqlite3.IntegrityError:
+                    clip_id = None  # Already imported
+
+                if clip_id is not None:
+                    extra = {
+                        name: metadata[name]
+                        for name in ("transcript", "partial", "language", "languageProb", "error", "segments")
+                        if metadata.get(name) is not None
+                    }
+                    if extra:
+                        self.update_clip(clip_id, **extra)
+                    imported += 1
+
+                metadata_file.unlink()
+            except Exception as e:
+                print(f"[HEARSAY] Error importing {metadata_file}: {e}")
+
+        if imported:
+            print(f"[HEARSAY] Imported {imported} clip(s) from sidecar JSON into the catalog")
+        return imported
+
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Process-wide catalog (opened lazily, also inside pool worker processes)"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = Catalog()
+    return _catalog
@@ -0,0 +1,115 @@
+"""
+HEARSAY Chapter Cache - content-addressed Writing Engine results
+─────────────────────────────────────────────────────────────────────────────
+A finished chapter is stored under a hash of everything that shaped it:
+the system prompt (its version), the model, and the full user message
+(formatted transcripts, requested length, continuity). A retry, a double
+click or a re-render with the same inputs gets the stored chapter back
+instantly instead of paying for another Opus generation.
+
+Entries live in the catalog database. When their total size passes
+CHAPTER_CACHE_MAX_MB the least recently used entries are evicted.
+
+Environment Variables:
+    CHAPTER_CACHE_MAX_MB - size cap for cached chapters (default: 50)
+"""
+
+import os
+import json
+import time
+import hashlib
+from typing import Optional
+
+from catalog import Catalog
+
+CHAPTER_CACHE_MAX_MB = float(os.getenv("CHAPTER_CACHE_MAX_MB", 50))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapter_cache (
+    key        TEXT PRIMARY KEY,
+    chapter    TEXT NOT NULL,
+    usage      TEXT,
+    bytes      INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chapter_cache_lru ON chapter_cache (last_used);
+"""
+
+
+def cache_key(system: str, model: str, user_content) -> str:
+    """Hash of prompt version, model and the exact user message"""
+    prompt_version = hashlib.sha256(system.encode()).hexdigest()
+    if not isinstance(user_content, str):
+        # Content blocks - cache_control markers don't change the chapter
+        user_content = "".join(block["text"] for block in user_content)
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, user_content):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ChapterCache:
+    """Size-bounded LRU of generated chapters keyed by cache_key()"""
+
+    def __init__(self, catalog: Catalog, max_mb: float = CHAPTER_CACHE_MAX_MB):
+        self.catalog = catalog
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.catalog.connection().executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[dict]:
+        conn = self.catalog.connection()
+        row = conn.execute(
+            "SELECT chapter, usage FROM chapter_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        conn.execute("UPDATE chapter_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return {"text": row["chapter"], "usage": json.loads(row["usage"] or "{}")}
+
+    def put(self, key: str, chapter: str, usage: dict):
+        now = time.time()
+        size = len(chapter.encode())
+        conn = self.catalog.connection()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO chapter_cache (key, chapter, usage, bytes, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (key, chapter, json.dumps(usage), size, now, now)
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used chapters until under the size cap"""
+        conn = self.catalog.connection()
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM chapter_cache").fetchone()[0]
+        removed = 0
+        while total > self.max_bytes:
+            row = conn.execute(
+                "SELECT key, bytes FROM chapter_cache ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            conn.execute("DELETE FROM chapter_cache WHERE key = ?", (row["key"],))
+            total -= row["bytes"]
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        row = self.catalog.connection().execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(bytes), 0) AS bytes FROM chapter_cache"
+        ).fetchone()
+        return {
+            "entries": row["n"],
+            "bytes": row["bytes"],
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,291 @@
+"""
+HEARSAY Continuity - a rolling "story so far" per reader
+─────────────────────────────────────────────────────────────────────────────
+One session is one chapter, and a reader's chapters pile up night after
+night. Chapters used to carry the last two previous chapters verbatim (up
+to ~7,000 words of input on every call), and anything older was lost.
+
+Instead, each finished chapter is folded into a compressed summary -
+characters met, open threads, the state of Room 412 - kept per story (the
+browser's storyId). The next chapter's prompt carries the summary plus the
+closing words of the last chapter: a fraction of the tokens, and the whole
+history stays in context.
+
+Summaries are made in the background after a chapter completes. A chapter
+started while its story's summary is still being updated waits for it.
+
+The context a session's chapter was written from is kept as a snapshot,
+so a retry or double-click for the same session gets the same prompt (and
+hits the chapter cache) instead of being written as a sequel to itself.
+A chapter already folded into the story is never folded in again, and a
+session's rewritten chapter replaces its earlier one in the summary.
+
+Environment Variables:
+    CONTINUITY_TAIL_WORDS - closing words of the last chapter sent with the summary (default: 250)
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+import writing_engine
+from catalog import Catalog
+from chapter_cache import ChapterCache
+from anthropic_scheduler import AnthropicScheduler, PRIORITY_MAINTENANCE
+
+CONTINUITY_TAIL_WORDS = int(os.getenv("CONTINUITY_TAIL_WORDS", 250))
+
+# The summary is a working document, not prose
+SUMMARY_MAX_TOKENS = 1536
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS continuity (
+    story_id     TEXT PRIMARY KEY,
+    summary      TEXT NOT NULL,
+    tail         TEXT NOT NULL,
+    chapters     INTEGER NOT NULL,
+    last_chapter TEXT NOT NULL,
+    last_session TEXT,
+    updated_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS continuity_snapshots (
+    story_id     TEXT NOT NULL,
+    session_id   TEXT NOT NULL,
+    summary      TEXT,
+    tail         TEXT,
+    chapters     INTEGER,
+    last_chapter TEXT,
+    created_at   REAL NOT NULL,
+    PRIMARY KEY (story_id, session_id)
+);
+CREATE TABLE IF NOT EXISTS continuity_chapters (
+    story_id     TEXT NOT NULL,
+    chapter_hash TEXT NOT NULL,
+    session_id   TEXT,
+    PRIMARY KEY (story_id, chapter_hash)
+);
+"""
+
+# Pre-chapter snapshots kept per story (a retry comes soon after)
+SNAPSHOTS_PER_STORY = 20
+
+
+def chapter_hash(chapter: str) -> str:
+    return hashlib.sha256(chapter.encode("utf-8")).hexdigest()
+
+
+def tail_excerpt(chapter: str, words: int = CONTINUITY_TAIL_WORDS) -> str:
+    """The last `words` words of a chapter, starting at a paragraph if one is close"""
+    paragraphs = chapter.strip().split("\n\n")
+    kept: List[str] = []
+    count = 0
+    for paragraph in reversed(paragraphs):
+        length = len(paragraph.split())
+        if kept and count + length > words:
+            break
+        kept.insert(0, paragraph)
+        count += length
+    text = "\n\n".join(kept)
+    if count > words:
+        text = "..." + " ".join(text.split(" ")[-words:])
+    return text
+
+
+class ContinuityStore:
+    """Story summaries in the catalog database, updated one chapter at a time"""
+
+    def __init__(self, catalog: Catalog, cache: Optional[ChapterCache] = None,
+                 scheduler: Optional[AnthropicScheduler] = None):
+        self.catalog = catalog
+        self.cache = cache
+        self.scheduler = scheduler
+        self._updating: Dict[str, asyncio.Task] = {}
+        self.updates = 0
+        self.errors = 0
+        self.catalog.connection().executescript(SCHEMA)
+
+    def stored(self, story_id: str) -> Optional[dict]:
+        row = self.catalog.connection().execute(
+            "SELECT summary, tail, chapters, last_chapter, last_session FROM continuity WHERE story_id = ?",
+            (story_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "summary": row["summary"],
+            "tail": row["tail"],
+            "chapters": row["chapters"],
+            "lastChapter": row["last_chapter"],
+            "lastSession": row["last_session"]
+        }
+
+    def snapshot(self, story_id: str, session_id: str) -> Tuple[bool, Optional[dict]]:
+        """(found, context) - the story as it was when `session_id`'s chapter started"""
+        row = self.catalog.connection().execute(
+            "SELECT summary, tail, chapters, last_chapter FROM continuity_snapshots WHERE story_id = ? AND session_id = ?",
+            (story_id, session_id)
+        ).fetchone()
+        if row is None:
+            return False, None
+        if row["summary"] is None:
+            return True, None
+        return True, {
+            "summary": row["summary"],
+            "tail": row["tail"],
+            "chapters": row["chapters"],
+            "lastChapter": row["last_chapter"],
+            "lastSession": None
+        }
+
+    def _save_snapshot(self, story_id: str, session_id: str, story: Optional[dict]):
+        conn = self.catalog.connection()
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO continuity_snapshots
+                (story_id, session_id, summary, tail, chapters, last_chapter, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (story_id, session_id, story and story["summary"], story and story["tail"],
+             story and story["chapters"], story and story["lastChapter"], time.time())
+        )
+        conn.execute(
+            """
+            DELETE FROM continuity_snapshots WHERE story_id = ? AND session_id NOT IN (
+                SELECT session_id FROM continuity_snapshots WHERE story_id = ?
+                ORDER BY created_at DESC LIMIT ?
+            )
+            """,
+            (story_id, story_id, SNAPSHOTS_PER_STORY)
+        )
+
+    async def context(self, story_id: Optional[str], session_id: str = "") -> Optional[dict]:
+        """
+        The story's summary and tail for the next chapter's prompt, or None.
+        Waits for an update that is still running (so the chapter just
+        written is included). A session generated again gets the context
+        its first attempt used.
+        """
+        if not story_id:
+            return None
+        pending = self._updating.get(story_id)
+        if pending is not None:
+            await asyncio.gather(asyncio.shield(pending), return_exceptions=True)
+        if not session_id:
+            return self.stored(story_id)
+
+        found, story = self.snapshot(story_id, session_id)
+        if found:
+            return story
+        story = self.stored(story_id)
+        self._save_snapshot(story_id, session_id, story)
+        return story
+
+    def record(
+        self,
+        client: httpx.AsyncClient,
+        system: str,
+        story_id: Optional[str],
+        chapter: str,
+        previous_chapters: List[str] = (),
+        session_id: str = ""
+    ) -> Optional[asyncio.Task]:
+        """
+        Fold a finished chapter into the story summary in the background.
+        `previous_chapters` (client-supplied) seed a story that has no
+        summary yet, so nothing written before this store existed is lost.
+        A chapter the story already contains is skipped.
+        """
+        if not story_id or not chapter or self.contains(story_id, chapter_hash(chapter)):
+            return None
+        previous = self._updating.get(story_id)
+        task = asyncio.create_task(
+            self._record(previous, client, system, story_id, chapter, list(previous_chapters), session_id)
+        )
+        self._updating[story_id] = task
+
+        def done(_):
+            if self._updating.get(story_id) is task:
+                self._updating.pop(story_id, None)
+        task.add_done_callback(done)
+        return task
+
+    async def _record(
+        self,
+        previous: Optional[asyncio.Task],
+        client: httpx.AsyncClient,
+        system: str,
+        story_id: str,
+        chapter: str,
+        previous_chapters: List[str],
+        session_id: str
+    ):
+        # Updates to one story run in order - each builds on the last summary
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        current = self.stored(story_id)
+        digest = chapter_hash(chapter)
+        if self.contains(story_id, digest):
+            return current
+
+        # A rewrite of the story's latest session replaces that chapter: fold
+        # it into the summary as it was before the session's first chapter
+        if current is not None and session_id and current["lastSession"] == session_id:
+            found, before = self.snapshot(story_id, session_id)
+            if found:
+                current = before
+
+        new_chapters = [chapter] if current is not None else [*previous_chapters[-3:], chapter]
+        try:
+            result = await writing_engine.generate(
+                client,
+                system,
+                writing_engine.build_summary_message(current and current["summary"], new_chapters),
+                cache=self.cache,
+                max_tokens=SUMMARY_MAX_TOKENS,
+                # Behind every chapter someone is waiting for
+                ticket=self.scheduler.ticket(PRIORITY_MAINTENANCE) if self.scheduler else None
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            print(f"[HEARSAY] Continuity summary failed for story {story_id}: {getattr(e, 'detail', e)}")
+            return current
+
+        chapters = (current["chapters"] if current else len(previous_chapters[-3:])) + 1
+        conn = self.catalog.connection()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO continuity (story_id, summary, tail, chapters, last_chapter, last_session, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (story_id, result["text"].strip(), tail_excerpt(chapter), chapters, digest, session_id or None, time.time())
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO continuity_chapters (story_id, chapter_hash, session_id) VALUES (?, ?, ?)",
+            (story_id, digest, session_id or None)
+        )
+        self.updates += 1
+        print(f"[HEARSAY] Story {story_id[:8]} summary updated: {chapters} chapter(s), "
+              f"{len(result['text'].split())} words")
+        return self.stored(story_id)
+
+    def contains(self, story_id: str, digest: str) -> bool:
+        """Whether the chapter with this hash is already in the story's summary"""
+        return self.catalog.connection().execute(
+            "SELECT 1 FROM continuity_chapters WHERE story_id = ? AND chapter_hash = ?", (story_id, digest)
+        ).fetchone() is not None
+
+    def stats(self) -> dict:
+        stories = self.catalog.connection().execute("SELECT COUNT(*) FROM continuity").fetchone()[0]
+        return {
+            "stories": stories,
+            "updates": self.updates,
+            "errors": self.errors,
+            "updating": len(self._updating)
+        }
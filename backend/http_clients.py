@@ -0,0 +1,177 @@
+"""
+HEARSAY HTTP Clients - pooled upstream connections
+─────────────────────────────────────────────────────────────────────────────
+One long-lived httpx.AsyncClient per upstream (Simli, Anthropic), created on
+startup and closed on shutdown. Connections are kept alive between calls, so
+a walkup reuses an open TLS connection to api.simli.ai instead of paying a
+fresh TCP+TLS handshake before the avatar can appear.
+
+HTTP/2 is used when the `h2` package is installed (httpx[http2]); otherwise
+the pools fall back to HTTP/1.1 keep-alive.
+
+Each pool counts requests and new connections (via httpcore trace events),
+which gives the connection reuse rate reported by /api/upstream/stats, and
+times each request to its response headers for /api/metrics. `warm` opens
+the first connection to each upstream during startup warmup.
+
+Environment Variables:
+    SIMLI_MAX_CONNECTIONS     - connection cap for api.simli.ai (default: 20)
+    ANTHROPIC_MAX_CONNECTIONS - connection cap for api.anthropic.com (default: 10)
+    UPSTREAM_KEEPALIVE_EXPIRY - seconds an idle connection is kept (default: 120)
+"""
+
+import os
+import time
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+from metrics import UPSTREAM_REQUEST_DURATION
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+SIMLI_MAX_CONNECTIONS = int(os.getenv("SIMLI_MAX_CONNECTIONS", 20))
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", 10))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", 120))
+
+# Simli calls are short; Opus can take minutes to write a chapter
+SIMLI_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+ANTHROPIC_TIMEOUT = httpx.Timeout(180.0, connect=10.0)
+
+
+class PoolStats:
+    """Request and connection counters for one upstream pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.connections_opened = 0
+        self.errors = 0
+
+    async def on_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+        request.extensions["hearsay_started"] = time.perf_counter()
+
+    async def _trace(self, event_name: str, info: dict):
+        # Fired by httpcore only when a new connection is established
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    async def on_response(self, response: httpx.Response):
+        if response.status_code >= 500:
+            self.errors += 1
+        started = response.request.extensions.get("hearsay_started")
+        if started is not None:
+            UPSTREAM_REQUEST_DURATION.observe(
+                time.perf_counter() - started, upstream=self.name, status=response.status_code
+            )
+
+    def snapshot(self) -> dict:
+        reused = max(0, self.requests - self.connections_opened)
+        return {
+            "requests": self.requests,
+            "connectionsOpened": self.connections_opened,
+            "reusedRequests": reused,
+            "reuseRate": round(reused / self.requests, 3) if self.requests else None,
+            "serverErrors": self.errors
+        }
+
+
+class UpstreamClients:
+    """App-lifetime connection pools for Simli and Anthropic"""
+
+    def __init__(self, simli_url: str, anthropic_url: str, anthropic_key: str = ""):
+        self.simli_url = simli_url
+        self.anthropic_url = anthropic_url
+        self.anthropic_key = anthropic_key
+        self.stats: Dict[str, PoolStats] = {
+            "simli": PoolStats("simli"),
+            "anthropic": PoolStats("anthropic")
+        }
+        self._simli: Optional[httpx.AsyncClient] = None
+        self._anthropic: Optional[httpx.AsyncClient] = None
+
+    def _client(self, name: str, base_url: str, max_connections: int,
+                timeout: httpx.Timeout, headers: dict) -> httpx.AsyncClient:
+        stats = self.stats[name]
+        return httpx.AsyncClient(
+            base_url=base_url,
+            http2=HTTP2_AVAILABLE,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+            ),
+            event_hooks={"request": [stats.on_request], "response": [stats.on_response]}
+        )
+
+    async def start(self):
+        """Open the pools (call on app startup)"""
+        self._simli = self._client(
+            "simli", self.simli_url, SIMLI_MAX_CONNECTIONS, SIMLI_TIMEOUT,
+            {"Content-Type": "application/json"}
+        )
+        self._anthropic = self._client(
+            "anthropic", self.anthropic_url, ANTHROPIC_MAX_CONNECTIONS, ANTHROPIC_TIMEOUT,
+            {
+                "x-api-key": self.anthropic_key.strip(),
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            }
+        )
+        print(f"[HEARSAY] Upstream pools ready (http2: {HTTP2_AVAILABLE})")
+
+    async def stop(self):
+        """Close the pools (call on app shutdown)"""
+        for client in (self._simli, self._anthropic):
+            if client is not None:
+                await client.aclose()
+        self._simli = None
+        self._anthropic = None
+
+    async def warm(self) -> dict:
+        """
+        Open one connection to each upstream, so the first walkup after a
+        deploy skips the TCP+TLS handshake. Any response will do - it's the
+        kept-alive connection we want - so only connection errors are reported.
+        """
+        async def connect(client: httpx.AsyncClient) -> dict:
+            started = time.perf_counter()
+            try:
+                await client.head("/")
+            except httpx.HTTPError as e:
+                return {"error": f"{type(e).__name__}: {e}"}
+            return {"connectMs": round((time.perf_counter() - started) * 1000, 1)}
+
+        simli, anthropic = await asyncio.gather(connect(self.simli), connect(self.anthropic))
+        return {"simli": simli, "anthropic": anthropic}
+
+    @property
+    def simli(self) -> httpx.AsyncClient:
+        if self._simli is None:
+            raise RuntimeError("Upstream pools not started")
+        return self._simli
+
+    @property
+    def anthropic(self) -> httpx.AsyncClient:
+        if self._anthropic is None:
+            raise RuntimeError("Upstream pools not started")
+        return self._anthropic
+
+    @property
+    def ready(self) -> bool:
+        return self._simli is not None and self._anthropic is not None
+
+    def snapshot(self) -> dict:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            **{name: stats.snapshot() for name, stats in self.stats.items()}
+        }
@@ -0,0 +1,155 @@
+"""
+HEARSAY Job Store - durable Writing Engine jobs
+─────────────────────────────────────────────────────────────────────────────
+Chapter jobs live in the catalog's SQLite database instead of a module-level
+dict, so they survive a redeploy and don't hold every chapter in memory.
+
+Finished jobs (complete or error) are evicted once they are older than
+JOB_TTL_HOURS, and the oldest finished jobs are dropped whenever the table
+grows past JOB_STORE_MAX. Jobs still processing are never evicted; on
+startup they are handed back to the Writing Engine, which is why each job
+keeps the conversations it was started with.
+
+Environment Variables:
+    JOB_TTL_HOURS - keep finished jobs this long (default: 24)
+    JOB_STORE_MAX - maximum jobs kept (default: 1000)
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from catalog import Catalog
+
+JOB_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", 24))
+JOB_STORE_MAX = int(os.getenv("JOB_STORE_MAX", 1000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapter_jobs (
+    job_id        TEXT PRIMARY KEY,
+    session_id    TEXT NOT NULL,
+    source        TEXT NOT NULL DEFAULT 'audio',
+    status        TEXT NOT NULL,
+    conversations TEXT NOT NULL,
+    chapter       TEXT,
+    word_count    INTEGER,
+    characters    TEXT,
+    error         TEXT,
+    started_at    TEXT NOT NULL,
+    completed_at  TEXT,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON chapter_jobs (status, updated_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_session ON chapter_jobs (session_id);
+"""
+
+
+class JobStore:
+    """Chapter jobs keyed by jobId, stored alongside the clip catalog"""
+
+    def __init__(self, catalog: Catalog, ttl_hours: float = JOB_TTL_HOURS, max_jobs: int = JOB_STORE_MAX):
+        self.catalog = catalog
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_jobs = max_jobs
+        self.catalog.connection().executescript(SCHEMA)
+
+    def create(self, job_id: str, session_id: str, conversations: list, source: str = "audio") -> dict:
+        """
+        Record a new processing job. `source` is "audio" (Whisper transcripts,
+        restartable) or "request" (client-supplied transcripts).
+        """
+        self.catalog.connection().execute(
+            """
+            INSERT INTO chapter_jobs (job_id, session_id, source, status, conversations, started_at, updated_at)
+            VALUES (?, ?, ?, 'processing', ?, ?, ?)
+            """,
+            (job_id, session_id, source, json.dumps(conversations), datetime.utcnow().isoformat(), time.time())
+        )
+        self.evict()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job in the shape /api/writing-engine/status returns"""
+        row = self.catalog.connection().execute(
+            "SELECT * FROM chapter_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            "status": row["status"],
+            "sessionId": row["session_id"],
+            "startedAt": row["started_at"],
+            "conversations": len(json.loads(row["conversations"])),
+            "chapter": row["chapter"],
+            "error": row["error"]
+        }
+        if row["status"] == "complete":
+            job["completedAt"] = row["completed_at"]
+            job["wordCount"] = row["word_count"]
+            job["characters"] = json.loads(row["characters"] or "[]")
+        return job
+
+    def complete(self, job_id: str, chapter: str, characters: List[str]):
+        self.catalog.connection().execute(
+            """
+            UPDATE chapter_jobs
+            SET status = 'complete', chapter = ?, word_count = ?, characters = ?,
+                completed_at = ?, updated_at = ?
+            WHERE job_id = ?
+            """,
+            (chapter, len(chapter.split()), json.dumps(characters),
+             datetime.utcnow().isoformat(), time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str):
+        self.catalog.connection().execute(
+            "UPDATE chapter_jobs SET status = 'error', error = ?, updated_at = ? WHERE job_id = ?",
+            (error, time.time(), job_id)
+        )
+
+    def unfinished(self) -> List[dict]:
+        """Jobs that were processing when the server stopped"""
+        rows = self.catalog.connection().execute(
+            "SELECT job_id, session_id, source, conversations FROM chapter_jobs WHERE status = 'processing'"
+        ).fetchall()
+        return [
+            {
+                "jobId": row["job_id"],
+                "sessionId": row["session_id"],
+                "source": row["source"],
+                "conversations": json.loads(row["conversations"])
+            }
+            for row in rows
+        ]
+
+    def evict(self) -> int:
+        """Drop expired finished jobs, then the oldest ones over the size cap"""
+        conn = self.catalog.connection()
+        removed = conn.execute(
+            "DELETE FROM chapter_jobs WHERE status != 'processing' AND updated_at < ?",
+            (time.time() - self.ttl_seconds,)
+        ).rowcount
+
+        total = conn.execute("SELECT COUNT(*) FROM chapter_jobs").fetchone()[0]
+        if total > self.max_jobs:
+            removed += conn.execute(
+                """
+                DELETE FROM chapter_jobs WHERE job_id IN (
+                    SELECT job_id FROM chapter_jobs
+                    WHERE status != 'processing'
+                    ORDER BY updated_at
+                    LIMIT ?
+                )
+                """,
+                (total - self.max_jobs,)
+            ).rowcount
+        return removed
+
+    def stats(self) -> dict:
+        rows = self.catalog.connection().execute(
+            "SELECT status, COUNT(*) AS n FROM chapter_jobs GROUP BY status"
+        ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
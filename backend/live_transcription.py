@@ -0,0 +1,283 @@
+"""
+HEARSAY Live Transcription - Whisper while the guest is still talking
+─────────────────────────────────────────────────────────────────────────────
+The browser streams MediaRecorder timeslice chunks over a WebSocket. Chunks
+are appended to the clip file as they arrive; every few seconds the part of
+the file after the last closed speech region is decoded to 16 kHz mono
+(seeking past what is already transcribed, so a pass costs the same at
+minute one and minute thirty) and run through Silero VAD (bundled with
+faster-whisper).
+
+Speech regions followed by enough silence are closed: they are transcribed
+once, as final segments, and written to the clip's catalog row - the same
+row /api/session-transcripts reads. The still-open region at the end is
+transcribed cheaply as a partial and replaced on every pass. When the
+recorder stops only the last open region is left to transcribe.
+
+Environment Variables:
+    LIVE_DECODE_INTERVAL - seconds between VAD/transcription passes (default: 4)
+"""
+
+import os
+import asyncio
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+from catalog import get_catalog
+from transcription import (
+    TRANSCRIBE_WORDS, TranscriptionPool, get_whisper_model, speech_only, segment_record, remap_record
+)
+from audio_normalize import SAMPLE_RATE, remove_normalized, store_normalized
+
+LIVE_DECODE_INTERVAL = float(os.getenv("LIVE_DECODE_INTERVAL", 4))
+
+# A speech region counts as finished once this much silence follows it
+MIN_CLOSING_SILENCE = 0.8
+
+# Open regions shorter than this are not worth a partial pass
+MIN_PARTIAL_SPEECH = 1.0
+
+# Seconds decoded (and thrown away) before the tail, after seeking
+TAIL_PREROLL = 0.5
+
+
+def decode_clip(audio_path: str):
+    """Decode a (possibly still growing) clip to 16 kHz mono float32"""
+    from faster_whisper import decode_audio
+    return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+
+
+def decode_tail(audio_path: str, start_sample: int):
+    """
+    Decode a (possibly still growing) clip from `start_sample` on, to
+    16 kHz mono float32. Seeks instead of decoding everything before it.
+    The position comes from container timestamps (milliseconds in webm), so
+    it can be a millisecond or so off from a full decode - well below
+    anything VAD or Whisper notices.
+    """
+    if start_sample <= 0:
+        return decode_clip(audio_path)
+
+    import av
+    import numpy as np
+
+    start = start_sample / SAMPLE_RATE
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    chunks = []
+    first_sample = None
+    with av.open(audio_path, metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        origin = container.start_time / av.time_base if container.start_time is not None else 0.0
+        # Land a little early: a codec needs a few frames to settle after a seek
+        target = max(0.0, start - TAIL_PREROLL) + origin
+        container.seek(int(target / stream.time_base), stream=stream, backward=True)
+        try:
+            for frame in container.decode(stream):
+                if first_sample is None:
+                    if frame.time is None:
+                        continue
+                    first_sample = round((frame.time - origin) * SAMPLE_RATE)
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+        except av.error.InvalidDataError:
+            # The last cluster of a growing file is often cut off mid-frame
+            pass
+
+    if first_sample is None or first_sample > start_sample:
+        # Seek overshot (or nothing to decode) - fall back to the whole file
+        return decode_clip(audio_path)[start_sample:]
+
+    audio = np.concatenate(chunks).astype(np.float32) / 32768.0
+    return audio[start_sample - first_sample:]
+
+
+def find_speech(audio) -> List[dict]:
+    """Silero VAD speech regions as {start, end} sample offsets"""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    return get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+
+
+def transcribe_region(audio, offset: float, beam_size: int, words: bool = False) -> List[dict]:
+    """
+    Transcribe a slice of decoded audio. Segment times are shifted by
+    `offset` seconds so they line up with the start of the clip.
+    """
+    model = get_whisper_model()
+    if model is None:
+        return []
+
+    segments, _ = model.transcribe(
+        audio,
+        beam_size=beam_size,
+        condition_on_previous_text=False,
+        word_timestamps=words
+    )
+    return [
+        segment_record(segment, lambda t: offset + t)
+        for segment in segments
+        if segment.text.strip()
+    ]
+
+
+class LiveTranscriber:
+    """
+    Incremental transcription for one WebSocket recording.
+    `send` pushes {"type": "partial"|"final", ...} messages back to the client.
+    """
+
+    def __init__(
+        self,
+        pool: TranscriptionPool,
+        audio_path: Path,
+        clip_id: int,
+        send: Callable[[dict], Awaitable[None]]
+    ):
+        self.pool = pool
+        self.audio_path = audio_path
+        self.clip_id = clip_id
+        self.send = send
+
+        self.segments: List[dict] = []
+        self.bytes_received = 0
+        # Silence accounting (same fields as queued transcription)
+        self.audio_samples = 0
+        self.speech_samples = 0
+        self.compute_seconds = 0.0
+        # Samples already covered by final segments
+        self._committed = 0
+        self._bytes_at_last_pass = 0
+        self._last_pass = time.monotonic()
+        self._pass_task: Optional[asyncio.Task] = None
+        self._file = open(audio_path, "wb")
+
+    async def feed(self, chunk: bytes):
+        """Append a MediaRecorder chunk; kick off a pass if one is due"""
+        await asyncio.to_thread(self._write, chunk)
+        self.bytes_received += len(chunk)
+
+        due = time.monotonic() - self._last_pass >= LIVE_DECODE_INTERVAL
+        idle = self._pass_task is None or self._pass_task.done()
+        if due and idle:
+            self._last_pass = time.monotonic()
+            self._pass_task = asyncio.create_task(self._run_pass(final=False))
+
+    async def finish(self) -> dict:
+        """Transcribe whatever is left and mark the clip transcribed"""
+        await asyncio.to_thread(self._file.close)
+        if self._pass_task is not None:
+            await asyncio.gather(self._pass_task, return_exceptions=True)
+
+        await self._run_pass(final=True)
+
+        transcript = " ".join(s["text"] for s in self.segments)
+        await asyncio.to_thread(
+            get_catalog().update_clip,
+            self.clip_id,
+            status="transcribed",
+            transcript=transcript,
+            segments=self.segments,
+            partial=None,
+            audioSeconds=round(self.audio_samples / SAMPLE_RATE, 2),
+            speechSeconds=round(self.speech_samples / SAMPLE_RATE, 2),
+            transcribeSeconds=round(self.compute_seconds, 2)
+        )
+        return {"status": "transcribed", "transcript": transcript}
+
+    async def abort(self):
+        """Drop an unfinished recording (the client will upload it instead)"""
+        # Stop a running pass first, or it writes segments for a deleted clip
+        if self._pass_task is not None:
+            self._pass_task.cancel()
+            await asyncio.gather(self._pass_task, return_exceptions=True)
+        await asyncio.to_thread(self._file.close)
+        self.audio_path.unlink(missing_ok=True)
+        remove_normalized(self.audio_path)
+        await asyncio.to_thread(get_catalog().delete_clip, self.clip_id)
+
+    def _write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._file.flush()
+
+    async def _run_pass(self, final: bool):
+        if not final and self.bytes_received == self._bytes_at_last_pass:
+            return
+        self._bytes_at_last_pass = self.bytes_received
+
+        base = self._committed
+        try:
+            if final:
+                audio = await self.pool.run_blocking(decode_clip, str(self.audio_path))
+            else:
+                # Only what comes after the last closed region
+                pending = await self.pool.run_blocking(decode_tail, str(self.audio_path), base)
+        except Exception as e:
+            # The tail of a growing webm can be mid-frame; try again next pass
+            if final:
+                raise
+            print(f"[HEARSAY] Live decode skipped: {e}")
+            return
+
+        if final:
+            # The complete clip is decoded now - keep it for any re-transcription
+            await asyncio.to_thread(store_normalized, self.audio_path, audio)
+            self.audio_samples = len(audio)
+            pending = audio[base:]
+
+        regions = await self.pool.run_blocking(find_speech, pending)
+
+        # Close every region that is followed by enough silence (or all of them at the end)
+        closing_limit = len(pending) - int(MIN_CLOSING_SILENCE * SAMPLE_RATE)
+        closed = [r for r in regions if final or r["end"] <= closing_limit]
+        still_open = regions[len(closed):]
+
+        if not regions and not final and closing_limit > 0:
+            # Nothing but silence so far - don't decode it again next pass
+            self._committed = base + closing_limit
+            return
+
+        if closed:
+            # Speech only - the silence between closed regions is cut out
+            speech, offsets, speech_samples = speech_only(
+                pending, [(r["start"], r["end"]) for r in closed]
+            )
+            started = time.perf_counter()
+            new_segments = await self.pool.run_model(
+                transcribe_region, speech, 0.0, 5, TRANSCRIBE_WORDS
+            )
+            self.compute_seconds += time.perf_counter() - started
+            self.speech_samples += speech_samples
+            for segment in new_segments:
+                remap_record(segment, lambda t: base / SAMPLE_RATE + offsets.original(t))
+            self._committed = base + closed[-1]["end"]
+            self.segments.extend(new_segments)
+            for segment in new_segments:
+                await self._send({"type": "final", "segment": segment})
+
+        partial = None
+        if still_open and not final:
+            start, end = still_open[0]["start"], still_open[-1]["end"]
+            if (end - start) / SAMPLE_RATE >= MIN_PARTIAL_SPEECH:
+                offset = (base + start) / SAMPLE_RATE
+                partial_segments = await self.pool.run_model(
+                    transcribe_region, pending[start:end], offset, 1
+                )
+                partial = " ".join(s["text"] for s in partial_segments) or None
+                if partial:
+                    await self._send({"type": "partial", "text": partial})
+
+        if not final:
+            await asyncio.to_thread(
+                get_catalog().update_clip,
+                self.clip_id,
+                segments=self.segments,
+                transcript=" ".join(s["text"] for s in self.segments),
+                partial=partial
+            )
+
+    async def _send(self, message: dict):
+        try:
+            await self.send(message)
+        except Exception:
+            # Client went away; keep transcribing, the catalog still gets it
+            pass
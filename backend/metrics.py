@@ -0,0 +1,298 @@
+"""
+HEARSAY Metrics - Prometheus counters, gauges and histograms
+─────────────────────────────────────────────────────────────────────────────
+Everything /api/health reports is a point-in-time snapshot. These metrics
+accumulate instead, so latency percentiles, Whisper throughput and token
+spend can be graphed over a night: /api/metrics renders them in the
+Prometheus text format (0.0.4).
+
+No client library - a handful of metric types in a few dozen lines. Values
+that already live elsewhere (queue depth, scheduler slots) are not copied
+here; collectors registered by the server read them at scrape time.
+
+Metrics are per process. Run one worker, or scrape each one.
+"""
+
+import math
+import time
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds - requests from a few ms (token pool hit) to minutes (Opus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+CHAPTER_BUCKETS = (5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+# Whisper compute seconds per second of audio
+RTF_BUCKETS = (0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+INF = 'le="+Inf"'
+
+# (name, labels, value) samples from a collector
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (not cumulative), sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, INF)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    """The process's metrics plus collectors evaluated at scrape time"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        # (name, help, kind, fn returning samples)
+        self.collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, name: str, help: str, fn: Callable[[], Iterable[Sample]], kind: str = "gauge"):
+        """Register `fn`, which yields (name, labels, value) samples when scraped"""
+        self.collectors.append((name, help, kind, fn))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        for name, help, kind, fn in self.collectors:
+            try:
+                samples = list(fn())
+            except Exception as e:
+                print(f"[HEARSAY] Metrics collector {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class RequestMetrics:
+    """
+    ASGI middleware timing each HTTP request to its response headers,
+    labelled by route template (/api/clips/{clip_id}/segments, not the id).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        observed = False
+
+        def observe(status: int):
+            nonlocal observed
+            if observed:
+                return
+            observed = True
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            )
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception:
+            observe(500)
+            raise
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Metrics
+# ─────────────────────────────────────────────────────────────────────────────
+
+HTTP_REQUEST_DURATION = REGISTRY.add(Histogram(
+    "hearsay_http_request_duration_seconds",
+    "Time to response headers per endpoint (streams: until the stream starts)",
+    ["method", "route", "status"]
+))
+
+UPSTREAM_REQUEST_DURATION = REGISTRY.add(Histogram(
+    "hearsay_upstream_request_duration_seconds",
+    "Simli/Anthropic request latency to response headers",
+    ["upstream", "status"]
+))
+
+TRANSCRIPTION_CLIPS = REGISTRY.add(Counter(
+    "hearsay_transcription_clips_total",
+    "Clips finished by Whisper",
+    ["path", "status"]
+))
+
+TRANSCRIPTION_AUDIO_SECONDS = REGISTRY.add(Counter(
+    "hearsay_transcription_audio_seconds_total",
+    "Seconds of recorded audio transcribed",
+    ["path"]
+))
+
+TRANSCRIPTION_SPEECH_SECONDS = REGISTRY.add(Counter(
+    "hearsay_transcription_speech_seconds_total",
+    "Seconds of detected speech passed to Whisper",
+    ["path"]
+))
+
+TRANSCRIPTION_COMPUTE_SECONDS = REGISTRY.add(Counter(
+    "hearsay_transcription_compute_seconds_total",
+    "Seconds Whisper spent transcribing",
+    ["path"]
+))
+
+TRANSCRIPTION_RTF = REGISTRY.add(Histogram(
+    "hearsay_transcription_real_time_factor",
+    "Whisper compute seconds per second of recorded audio, per clip",
+    ["path"],
+    buckets=RTF_BUCKETS
+))
+
+TRANSCRIPTION_QUEUE_WAIT = REGISTRY.add(Histogram(
+    "hearsay_transcription_queue_wait_seconds",
+    "Time a clip waited in the transcription queue before a worker took it"
+))
+
+CHAPTER_DURATION = REGISTRY.add(Histogram(
+    "hearsay_chapter_duration_seconds",
+    "Chapter generation time, request to finished text",
+    ["path", "outcome"],
+    buckets=CHAPTER_BUCKETS
+))
+
+CHAPTER_TOKENS = REGISTRY.add(Counter(
+    "hearsay_chapter_tokens_total",
+    "Tokens in and out of the final chapter call",
+    ["direction"]
+))
+
+ANTHROPIC_TOKENS = REGISTRY.add(Counter(
+    "hearsay_anthropic_tokens_total",
+    "Tokens billed across every Claude call (chapters, scene notes, summaries)",
+    ["type"]
+))
+
+UPLOAD_BYTES = REGISTRY.add(Counter(
+    "hearsay_upload_bytes_total",
+    "Audio bytes received from the browser",
+    ["path"]
+))
+
+
+def record_usage(usage: dict):
+    """Count one Messages API response's usage block"""
+    for kind, field in (
+        ("input", "input_tokens"),
+        ("output", "output_tokens"),
+        ("cache_read", "cache_read_input_tokens"),
+        ("cache_creation", "cache_creation_input_tokens"),
+    ):
+        count = (usage or {}).get(field) or 0
+        if count:
+            ANTHROPIC_TOKENS.inc(count, type=kind)
+
+
+def record_chapter(path: str, outcome: str, seconds: float, usage: dict = None):
+    """A finished (or failed) chapter: its duration and the final call's tokens"""
+    CHAPTER_DURATION.observe(seconds, path=path, outcome=outcome)
+    if usage:
+        CHAPTER_TOKENS.inc(
+            (usage.get("input_tokens") or 0) + (usage.get("cache_read_input_tokens") or 0)
+            + (usage.get("cache_creation_input_tokens") or 0),
+            direction="in"
+        )
+        CHAPTER_TOKENS.inc(usage.get("output_tokens") or 0, direction="out")
@@ -0,0 +1,505 @@
+"""
+HEARSAY Retention - audio that doesn't fill the volume
+─────────────────────────────────────────────────────────────────────────────
+Every upload used to stay in AUDIO_DIR/<sessionId>/ forever, raw, next to
+its 16 kHz PCM cache (which is often bigger than the upload). Once a clip
+is transcribed the text is what Hearsay uses; the audio is only kept in
+case a clip has to be transcribed again. A periodic sweep moves each clip
+down the tiers:
+
+  raw       the upload and its .16k.pcm cache, as recorded
+  compact   AUDIO_COMPACT_AFTER_HOURS after transcription: re-encoded to
+            mono Opus at AUDIO_OPUS_BITRATE (still decodable by Whisper)
+            and the original and PCM cache deleted - ~2 KB/s of speech.
+            Without PyAV only the PCM cache is dropped.
+  archived  AUDIO_ARCHIVE_AFTER_HOURS after a session's last clip, once
+            nothing in it is pending: all its clips packed into one
+            AUDIO_DIR/.archive/<sessionId>.tar and the directory removed.
+            A clip that has to be transcribed again is extracted back to
+            its audio_path on demand (restore_archived)
+  deleted   after AUDIO_TTL_DAYS, or evicted by the quota: the audio is
+            gone, the catalog row, transcript and segments stay
+
+With AUDIO_QUOTA_MB set, the sessions whose last clip is oldest are
+deleted until the audio fits. Sessions with clips still pending are never
+touched. Each clip's tier and size are kept in the catalog database, so
+the storage report is a query, not a directory walk.
+
+Storage usage is reported by GET /api/storage and under "storage" in
+/api/health.
+
+Environment Variables:
+    AUDIO_COMPACT_AFTER_HOURS  - re-encode transcribed clips to Opus after this, 0 = never (default: 24)
+    AUDIO_OPUS_BITRATE         - Opus bitrate in bits/s (default: 16000)
+    AUDIO_ARCHIVE_AFTER_HOURS  - pack finished sessions into one file after this, 0 = never (default: 48)
+    AUDIO_TTL_DAYS             - delete a session's audio this long after its last clip, 0 = keep (default: 0)
+    AUDIO_QUOTA_MB             - delete the oldest sessions' audio above this, 0 = no quota (default: 0)
+    AUDIO_RETENTION_INTERVAL_MINUTES - minutes between sweeps (default: 30)
+"""
+
+import os
+import time
+import shutil
+import asyncio
+import sqlite3
+import tarfile
+from fractions import Fraction
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+from catalog import Catalog
+from audio_normalize import SAMPLE_RATE, load_normalized, normalized_path, remove_normalized
+
+AUDIO_COMPACT_AFTER_HOURS = float(os.getenv("AUDIO_COMPACT_AFTER_HOURS", 24))
+AUDIO_OPUS_BITRATE = int(os.getenv("AUDIO_OPUS_BITRATE", 16000))
+AUDIO_ARCHIVE_AFTER_HOURS = float(os.getenv("AUDIO_ARCHIVE_AFTER_HOURS", 48))
+AUDIO_TTL_DAYS = float(os.getenv("AUDIO_TTL_DAYS", 0))
+AUDIO_QUOTA_MB = float(os.getenv("AUDIO_QUOTA_MB", 0))
+AUDIO_RETENTION_INTERVAL_MINUTES = float(os.getenv("AUDIO_RETENTION_INTERVAL_MINUTES", 30))
+
+# Re-encoding takes CPU from Whisper; spread a backlog over several sweeps
+COMPACT_PER_SWEEP = 50
+
+# Clips in these states may still need their audio
+ACTIVE_STATUSES = ("pending_transcription", "live")
+
+OPUS_SUFFIX = ".opus"
+ARCHIVE_DIR_NAME = ".archive"
+
+TIERS = ("raw", "compact", "archived", "deleted")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio_retention (
+    clip_id        INTEGER PRIMARY KEY,
+    session_id     TEXT NOT NULL,
+    tier           TEXT NOT NULL,
+    bytes          INTEGER NOT NULL,
+    original_bytes INTEGER NOT NULL,
+    archive        TEXT,
+    updated_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_retention_tier ON audio_retention (tier);
+CREATE INDEX IF NOT EXISTS idx_retention_session ON audio_retention (session_id);
+"""
+
+
+def file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+
+
+def clip_bytes(audio_path: Path) -> int:
+    """A clip's audio plus its PCM cache"""
+    return file_size(audio_path) + file_size(normalized_path(audio_path))
+
+
+def restore_archived(catalog: Catalog, audio_path) -> bool:
+    """
+    Extract an archived clip from its session's tar back to its audio_path
+    (blocking), so it can be decoded again. The clip returns to the compact
+    tier and the next archive pass packs it up again. False if the clip
+    isn't archived.
+    """
+    audio_path = Path(audio_path)
+    conn = catalog.connection()
+    try:
+        row = conn.execute(
+            """
+            SELECT c.id, r.archive FROM clips c JOIN audio_retention r ON r.clip_id = c.id
+            WHERE c.audio_path = ? AND r.tier = 'archived'
+            """,
+            (str(audio_path),)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # No retention table - nothing was ever archived
+        return False
+    if row is None or not row["archive"]:
+        return False
+
+    audio_path.parent.mkdir(parents=True, exist_ok=True)
+    temp = audio_path.with_name(audio_path.name + ".tmp")
+    try:
+        with tarfile.open(row["archive"]) as tar, open(temp, "wb") as f:
+            shutil.copyfileobj(tar.extractfile(tar.getmember(audio_path.name)), f)
+        os.replace(temp, audio_path)
+    finally:
+        temp.unlink(missing_ok=True)
+
+    conn.execute(
+        "UPDATE audio_retention SET tier = 'compact', bytes = ?, archive = NULL, updated_at = ? WHERE clip_id = ?",
+        (file_size(audio_path), time.time(), row["id"])
+    )
+    print(f"[HEARSAY] Retention: restored {audio_path.name} from {Path(row['archive']).name}")
+    return True
+
+
+def encode_opus(audio_path: Path, target: Path, bitrate: int = AUDIO_OPUS_BITRATE):
+    """
+    Write the clip as mono Opus in Ogg, from the 16 kHz audio Whisper used
+    (blocking). Raises ImportError when PyAV isn't installed.
+    """
+    import av
+    import numpy as np
+
+    pcm = (np.clip(load_normalized(audio_path), -1.0, 1.0) * 32767).astype(np.int16)
+    temp = target.with_name(target.name + ".tmp")
+    try:
+        with av.open(str(temp), "w", format="ogg") as container:
+            stream = container.add_stream("libopus", rate=SAMPLE_RATE)
+            stream.bit_rate = bitrate
+            stream.layout = "mono"
+            for start in range(0, len(pcm), SAMPLE_RATE):
+                frame = av.AudioFrame.from_ndarray(
+                    pcm[start:start + SAMPLE_RATE].reshape(1, -1), format="s16", layout="mono"
+                )
+                frame.sample_rate = SAMPLE_RATE
+                frame.pts = start
+                frame.time_base = Fraction(1, SAMPLE_RATE)
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            for packet in stream.encode(None):
+                container.mux(packet)
+        os.replace(temp, target)
+    finally:
+        temp.unlink(missing_ok=True)
+
+
+class Retention:
+    """Moves clip audio down the tiers and keeps the volume under quota"""
+
+    def __init__(
+        self,
+        catalog: Catalog,
+        audio_dir: Path,
+        compact_after_hours: float = AUDIO_COMPACT_AFTER_HOURS,
+        archive_after_hours: float = AUDIO_ARCHIVE_AFTER_HOURS,
+        ttl_days: float = AUDIO_TTL_DAYS,
+        quota_mb: float = AUDIO_QUOTA_MB
+    ):
+        self.catalog = catalog
+        self.audio_dir = audio_dir
+        self.archive_dir = audio_dir / ARCHIVE_DIR_NAME
+        self.compact_after = timedelta(hours=compact_after_hours)
+        self.archive_after = timedelta(hours=archive_after_hours)
+        self.ttl = timedelta(days=ttl_days)
+        self.quota_bytes = int(quota_mb * 1024 * 1024)
+        self.opus_available: Optional[bool] = None
+        self.sweeps = 0
+        self.errors = 0
+        self.last_sweep: Optional[dict] = None
+        self.catalog.connection().executescript(SCHEMA)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Sweep
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def run_forever(
+        self,
+        interval_minutes: float = AUDIO_RETENTION_INTERVAL_MINUTES,
+        claim: Optional[Callable[[], Awaitable[bool]]] = None
+    ):
+        """
+        Sweep now and then every `interval_minutes` (run in the background).
+        With `claim`, a pass only sweeps when it returns True - with several
+        workers only the one holding the lease does the work.
+        """
+        while True:
+            try:
+                if claim is None or await claim():
+                    await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                self.errors += 1
+                print(f"[HEARSAY] Retention sweep failed: {e}")
+            await asyncio.sleep(interval_minutes * 60)
+
+    def sweep(self) -> dict:
+        """One pass over every tier (blocking)"""
+        started = time.perf_counter()
+        tracked = self._track()
+        before = self.total_bytes()
+        result = {
+            "tracked": tracked,
+            "compacted": self._compact() if self.compact_after else 0,
+            "archived": self._archive() if self.archive_after else 0,
+            "expired": self._expire() if self.ttl else 0,
+            "evicted": self._enforce_quota() if self.quota_bytes else 0
+        }
+        after = self.total_bytes()
+        self.sweeps += 1
+        self.last_sweep = {
+            **result,
+            "freedBytes": max(0, before - after),
+            "seconds": round(time.perf_counter() - started, 2),
+            "at": datetime.utcnow().isoformat()
+        }
+        if any(result[name] for name in ("compacted", "archived", "expired", "evicted")):
+            print(f"[HEARSAY] Retention: {result['compacted']} clip(s) compacted, {result['archived']} session(s) "
+                  f"archived, {result['expired'] + result['evicted']} deleted, "
+                  f"{self.last_sweep['freedBytes'] / 1024 / 1024:.1f} MB freed")
+        return self.last_sweep
+
+    def _track(self) -> int:
+        """Add clips the table hasn't seen, refresh raw sizes, forget deleted clips"""
+        conn = self.catalog.connection()
+        conn.execute("DELETE FROM audio_retention WHERE clip_id NOT IN (SELECT id FROM clips)")
+
+        added = 0
+        rows = conn.execute(
+            """
+            SELECT c.id, c.session_id, c.audio_path, r.tier
+            FROM clips c LEFT JOIN audio_retention r ON r.clip_id = c.id
+            WHERE (r.clip_id IS NULL OR r.tier = 'raw') AND c.status != 'live'
+            """
+        ).fetchall()
+        now = time.time()
+        for row in rows:
+            size = clip_bytes(Path(row["audio_path"]))
+            if row["tier"] is None:
+                conn.execute(
+                    """
+                    INSERT INTO audio_retention (clip_id, session_id, tier, bytes, original_bytes, updated_at)
+                    VALUES (?, ?, 'raw', ?, ?, ?)
+                    """,
+                    (row["id"], row["session_id"], size, size, now)
+                )
+                added += 1
+            else:
+                conn.execute(
+                    "UPDATE audio_retention SET bytes = ?, original_bytes = MAX(original_bytes, ?) WHERE clip_id = ?",
+                    (size, size, row["id"])
+                )
+        return added
+
+    def _set_tier(self, clip_id: int, tier: str, size: int, archive: Optional[str] = None):
+        self.catalog.connection().execute(
+            "UPDATE audio_retention SET tier = ?, bytes = ?, archive = ?, updated_at = ? WHERE clip_id = ?",
+            (tier, size, archive, time.time(), clip_id)
+        )
+
+    def _compact(self) -> int:
+        """Transcribed raw clips past AUDIO_COMPACT_AFTER_HOURS → Opus, PCM cache dropped"""
+        cutoff = (datetime.utcnow() - self.compact_after).isoformat()
+        rows = self.catalog.connection().execute(
+            """
+            SELECT c.id, c.audio_path FROM clips c JOIN audio_retention r ON r.clip_id = c.id
+            WHERE r.tier = 'raw' AND c.status = 'transcribed' AND c.updated_at < ?
+            ORDER BY c.created_at LIMIT ?
+            """,
+            (cutoff, COMPACT_PER_SWEEP)
+        ).fetchall()
+
+        compacted = 0
+        for row in rows:
+            audio_path = Path(row["audio_path"])
+            target = audio_path.with_suffix(OPUS_SUFFIX)
+            try:
+                if self.opus_available is not False and audio_path.suffix != OPUS_SUFFIX:
+                    encode_opus(audio_path, target)
+                    self.opus_available = True
+                    audio_path.unlink(missing_ok=True)
+                    self.catalog.update_clip(row["id"], audioPath=str(target))
+                else:
+                    target = audio_path
+            except ImportError:
+                # No PyAV: keep the upload, still drop the PCM cache below
+                print("[HEARSAY] Retention: PyAV not installed, clips are not re-encoded to Opus")
+                self.opus_available = False
+                target = audio_path
+            except Exception as e:
+                self.errors += 1
+                print(f"[HEARSAY] Retention: could not re-encode {audio_path.name}: {e}")
+                continue
+            remove_normalized(audio_path)
+            self._set_tier(row["id"], "compact", file_size(target))
+            compacted += 1
+        return compacted
+
+    def _finished_sessions(self, older_than: timedelta, tiers: tuple) -> List[dict]:
+        """
+        Sessions with nothing pending whose last clip is older than `older_than`
+        and which still have clips in one of `tiers`, oldest first
+        """
+        cutoff = (datetime.utcnow() - older_than).isoformat()
+        return self._sessions("HAVING MAX(c.created_at) < ?", (cutoff,), tiers)
+
+    def _sessions(self, having: str, params: tuple, tiers: tuple) -> List[dict]:
+        active = ", ".join("?" for _ in ACTIVE_STATUSES)
+        wanted = ", ".join("?" for _ in tiers)
+        rows = self.catalog.connection().execute(
+            f"""
+            SELECT c.session_id, MAX(c.created_at) AS last_clip, SUM(COALESCE(r.bytes, 0)) AS bytes
+            FROM clips c LEFT JOIN audio_retention r ON r.clip_id = c.id
+            GROUP BY c.session_id
+            {having}
+               AND SUM(c.status IN ({active})) = 0
+               AND SUM(r.tier IN ({wanted})) > 0
+            ORDER BY last_clip
+            """,
+            (*params, *ACTIVE_STATUSES, *tiers)
+        ).fetchall()
+        return [{"sessionId": row["session_id"], "lastClip": row["last_clip"], "bytes": row["bytes"]} for row in rows]
+
+    def _archive(self) -> int:
+        """Finished sessions past AUDIO_ARCHIVE_AFTER_HOURS → one tar each"""
+        archived = 0
+        for session in self._finished_sessions(self.archive_after, ("raw", "compact")):
+            try:
+                self._archive_session(session["sessionId"])
+                archived += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[HEARSAY] Retention: could not archive session {session['sessionId']}: {e}")
+        return archived
+
+    def _archive_session(self, session_id: str):
+        rows = self.catalog.connection().execute(
+            """
+            SELECT c.id, c.audio_path FROM clips c JOIN audio_retention r ON r.clip_id = c.id
+            WHERE c.session_id = ? AND r.tier IN ('raw', 'compact')
+            """,
+            (session_id,)
+        ).fetchall()
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        archive = self.archive_dir / f"{session_id}.tar"
+        temp = archive.with_name(archive.name + ".tmp")
+
+        # Append to an earlier archive of this session (a clip added later)
+        if archive.exists():
+            shutil.copyfile(archive, temp)
+        with tarfile.open(temp, "a" if temp.exists() else "w") as tar:
+            # A restored clip is still in the archive
+            packed = set(tar.getnames())
+            members = []
+            for row in rows:
+                audio_path = Path(row["audio_path"])
+                if audio_path.exists():
+                    # Opus and webm are already compressed - store, don't gzip
+                    if audio_path.name not in packed:
+                        tar.add(audio_path, arcname=audio_path.name)
+                    members.append((row["id"], audio_path, file_size(audio_path)))
+                else:
+                    members.append((row["id"], audio_path, 0))
+        os.replace(temp, archive)
+
+        for clip_id, audio_path, size in members:
+            audio_path.unlink(missing_ok=True)
+            remove_normalized(audio_path)
+            self._set_tier(clip_id, "archived" if size else "deleted", size, str(archive) if size else None)
+        session_dir = self.audio_dir / session_id
+        if session_dir.is_dir() and not any(session_dir.iterdir()):
+            session_dir.rmdir()
+
+    def _delete_session(self, session_id: str) -> int:
+        """Remove all of a session's audio; returns bytes freed"""
+        conn = self.catalog.connection()
+        rows = conn.execute(
+            """
+            SELECT c.id, c.audio_path, r.archive, r.bytes FROM clips c JOIN audio_retention r ON r.clip_id = c.id
+            WHERE c.session_id = ? AND r.tier != 'deleted'
+            """,
+            (session_id,)
+        ).fetchall()
+        freed = 0
+        for row in rows:
+            audio_path = Path(row["audio_path"])
+            audio_path.unlink(missing_ok=True)
+            remove_normalized(audio_path)
+            if row["archive"]:
+                Path(row["archive"]).unlink(missing_ok=True)
+            freed += row["bytes"]
+            self._set_tier(row["id"], "deleted", 0)
+        session_dir = self.audio_dir / session_id
+        if session_dir.is_dir():
+            shutil.rmtree(session_dir, ignore_errors=True)
+        return freed
+
+    def _expire(self) -> int:
+        """Sessions past AUDIO_TTL_DAYS lose their audio"""
+        sessions = self._finished_sessions(self.ttl, ("raw", "compact", "archived"))
+        for session in sessions:
+            self._delete_session(session["sessionId"])
+        return len(sessions)
+
+    def _enforce_quota(self) -> int:
+        """Delete the sessions with the oldest last clip until under AUDIO_QUOTA_MB"""
+        excess = self.total_bytes() - self.quota_bytes
+        if excess <= 0:
+            return 0
+        evicted = 0
+        for session in self._sessions("HAVING 1", (), ("raw", "compact", "archived")):
+            excess -= self._delete_session(session["sessionId"])
+            evicted += 1
+            if excess <= 0:
+                break
+        if excess > 0:
+            print(f"[HEARSAY] Retention: still {excess / 1024 / 1024:.1f} MB over quota (pending sessions are kept)")
+        return evicted
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Reporting
+    # ─────────────────────────────────────────────────────────────────────
+
+    def total_bytes(self) -> int:
+        return self.catalog.connection().execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM audio_retention"
+        ).fetchone()[0]
+
+    def tiers(self) -> dict:
+        rows = self.catalog.connection().execute(
+            "SELECT tier, COUNT(*) AS clips, SUM(bytes) AS bytes, SUM(original_bytes) AS original FROM audio_retention GROUP BY tier"
+        ).fetchall()
+        tiers = {tier: {"clips": 0, "bytes": 0, "originalBytes": 0} for tier in TIERS}
+        for row in rows:
+            tiers[row["tier"]] = {"clips": row["clips"], "bytes": row["bytes"] or 0, "originalBytes": row["original"] or 0}
+        return tiers
+
+    def stats(self) -> dict:
+        tiers = self.tiers()
+        total = sum(tier["bytes"] for tier in tiers.values())
+        original = sum(tier["originalBytes"] for tier in tiers.values())
+        return {
+            "audioBytes": total,
+            "savedBytes": max(0, original - total),
+            "quotaBytes": self.quota_bytes or None,
+            "tiers": {name: {"clips": tier["clips"], "bytes": tier["bytes"]} for name, tier in tiers.items()},
+            "opusAvailable": self.opus_available,
+            "sweeps": self.sweeps,
+            "errors": self.errors,
+            "lastSweep": self.last_sweep
+        }
+
+    def report(self, top: int = 10) -> dict:
+        """Everything on the volume: audio by tier, largest sessions, database, partial uploads, free space"""
+        largest = self.catalog.connection().execute(
+            """
+            SELECT session_id, COUNT(*) AS clips, SUM(bytes) AS bytes, MAX(tier = 'archived') AS archived
+            FROM audio_retention WHERE tier != 'deleted'
+            GROUP BY session_id ORDER BY bytes DESC LIMIT ?
+            """,
+            (top,)
+        ).fetchall()
+        database = sum(
+            file_size(self.catalog.path.with_name(self.catalog.path.name + suffix)) for suffix in ("", "-wal", "-shm")
+        )
+        uploads_dir = self.audio_dir / ".uploads"
+        partial = sum(file_size(path) for path in uploads_dir.iterdir()) if uploads_dir.is_dir() else 0
+        disk = shutil.disk_usage(self.audio_dir)
+        return {
+            **self.stats(),
+            "largestSessions": [
+                {"sessionId": row["session_id"], "clips": row["clips"], "bytes": row["bytes"], "archived": bool(row["archived"])}
+                for row in largest
+            ],
+            "databaseBytes": database,
+            "partialUploadBytes": partial,
+            "disk": {"totalBytes": disk.total, "usedBytes": disk.used, "freeBytes": disk.free},
+            "policy": {
+                "compactAfterHours": self.compact_after.total_seconds() / 3600 or None,
+                "archiveAfterHours": self.archive_after.total_seconds() / 3600 or None,
+                "ttlDays": self.ttl.total_seconds() / 86400 or None,
+                "opusBitrate": AUDIO_OPUS_BITRATE
+            }
+        }
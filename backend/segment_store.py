@@ -0,0 +1,230 @@
+"""
+HEARSAY Segment Store - timed transcript segments, one packed row per clip
+─────────────────────────────────────────────────────────────────────────────
+Whisper produces segments (start, end, text, avg_logprob, optionally words)
+and the clip's transcript is those texts joined - the timing is what lets a
+guest's words be lined up against the Simli side of the conversation, or a
+window of a session be read without the rest.
+
+Segments are stored column-wise: one row per clip whose starts, ends and
+avg_logprobs are packed float32 arrays, with the texts concatenated as
+UTF-8 plus an array of end offsets. Words (when word timestamps are on) get
+the same treatment. A clip's segments are sorted by start, so a time-range
+slice is two binary searches and decodes only the text it returns.
+
+Arrays are stored little-endian regardless of the host.
+"""
+
+import sys
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clip_segments (
+    clip_id      INTEGER PRIMARY KEY,
+    count        INTEGER NOT NULL,
+    starts       BLOB NOT NULL,
+    ends         BLOB NOT NULL,
+    logprobs     BLOB NOT NULL,
+    text         BLOB NOT NULL,
+    text_ends    BLOB NOT NULL,
+    word_counts  BLOB,
+    word_starts  BLOB,
+    word_ends    BLOB,
+    word_probs   BLOB,
+    word_text    BLOB,
+    word_text_ends BLOB
+);
+"""
+
+# Segments without an avg_logprob (e.g. imported legacy JSON) store NaN
+MISSING = float("nan")
+
+
+def _pack(kind: str, values) -> bytes:
+    packed = array(kind, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(kind: str, data: Optional[bytes]) -> array:
+    unpacked = array(kind)
+    if data:
+        unpacked.frombytes(data)
+        if sys.byteorder == "big":
+            unpacked.byteswap()
+    return unpacked
+
+
+def _pack_texts(texts: List[str]) -> tuple:
+    """Concatenated UTF-8 plus the end offset of each text"""
+    encoded = [text.encode("utf-8") for text in texts]
+    ends, total = [], 0
+    for data in encoded:
+        total += len(data)
+        ends.append(total)
+    return b"".join(encoded), _pack("I", ends)
+
+
+def pack_segments(segments: List[dict]) -> dict:
+    """
+    Column values for a clip's segments, sorted by start.
+    Each segment is {start, end, text, avgLogprob?, words?: [{start, end, word, probability}]}.
+    """
+    segments = sorted(segments, key=lambda s: (s["start"], s["end"]))
+    text, text_ends = _pack_texts([s["text"] for s in segments])
+    columns = {
+        "count": len(segments),
+        "starts": _pack("f", [s["start"] for s in segments]),
+        "ends": _pack("f", [s["end"] for s in segments]),
+        "logprobs": _pack("f", [
+            MISSING if s.get("avgLogprob") is None else s["avgLogprob"] for s in segments
+        ]),
+        "text": text,
+        "text_ends": text_ends,
+        "word_counts": None,
+        "word_starts": None,
+        "word_ends": None,
+        "word_probs": None,
+        "word_text": None,
+        "word_text_ends": None,
+    }
+
+    if any(s.get("words") for s in segments):
+        words = [word for s in segments for word in s.get("words") or []]
+        word_text, word_text_ends = _pack_texts([w["word"] for w in words])
+        columns.update(
+            word_counts=_pack("I", [len(s.get("words") or []) for s in segments]),
+            word_starts=_pack("f", [w["start"] for w in words]),
+            word_ends=_pack("f", [w["end"] for w in words]),
+            word_probs=_pack("f", [w.get("probability", MISSING) for w in words]),
+            word_text=word_text,
+            word_text_ends=word_text_ends,
+        )
+    return columns
+
+
+class ClipSegments:
+    """One clip's segments, decoded lazily from their columns"""
+
+    def __init__(self, row: sqlite3.Row):
+        self.count = row["count"]
+        self.starts = _unpack("f", row["starts"])
+        self.ends = _unpack("f", row["ends"])
+        self.logprobs = _unpack("f", row["logprobs"])
+        self._text = row["text"]
+        self._text_ends = _unpack("I", row["text_ends"])
+
+        self.has_words = row["word_counts"] is not None
+        if self.has_words:
+            counts = _unpack("I", row["word_counts"])
+            # First word index of each segment
+            self._word_offsets = array("I", [0])
+            for count in counts:
+                self._word_offsets.append(self._word_offsets[-1] + count)
+            self._word_starts = _unpack("f", row["word_starts"])
+            self._word_ends = _unpack("f", row["word_ends"])
+            self._word_probs = _unpack("f", row["word_probs"])
+            self._word_text = row["word_text"]
+            self._word_text_ends = _unpack("I", row["word_text_ends"])
+
+        # Latest end so far, so overlapping segments can't hide from bisect
+        self._reach = array("f")
+        for end in self.ends:
+            self._reach.append(max(end, self._reach[-1]) if self._reach else end)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @staticmethod
+    def _slice_text(blob: bytes, ends: array, index: int) -> str:
+        start = ends[index - 1] if index else 0
+        return blob[start:ends[index]].decode("utf-8")
+
+    def segment(self, index: int, words: bool = True) -> dict:
+        segment = {
+            "start": round(self.starts[index], 2),
+            "end": round(self.ends[index], 2),
+            "text": self._slice_text(self._text, self._text_ends, index),
+        }
+        logprob = self.logprobs[index]
+        if logprob == logprob:  # not NaN
+            segment["avgLogprob"] = round(logprob, 3)
+        if words and self.has_words:
+            segment["words"] = [
+                {
+                    "start": round(self._word_starts[w], 2),
+                    "end": round(self._word_ends[w], 2),
+                    "word": self._slice_text(self._word_text, self._word_text_ends, w),
+                    "probability": round(self._word_probs[w], 3)
+                }
+                for w in range(self._word_offsets[index], self._word_offsets[index + 1])
+            ]
+        return segment
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> range:
+        """Indexes of segments overlapping [start, end) seconds into the clip"""
+        first = 0 if start is None else bisect_right(self._reach, start)
+        last = self.count if end is None else bisect_left(self.starts, end)
+        return range(first, max(first, last))
+
+    def slice(self, start: Optional[float] = None, end: Optional[float] = None,
+              words: bool = True) -> List[dict]:
+        return [
+            self.segment(index, words)
+            for index in self.window(start, end)
+            if start is None or self.ends[index] > start
+        ]
+
+    def text(self, start: Optional[float] = None, end: Optional[float] = None) -> str:
+        """The transcript of a time range (the segments' texts joined)"""
+        return " ".join(segment["text"] for segment in self.slice(start, end, words=False))
+
+
+class SegmentStore:
+    """Packed per-clip segments in the catalog database"""
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection]):
+        self.connection = connection
+        self.connection().executescript(SCHEMA)
+
+    def put(self, clip_id: int, segments: List[dict]) -> None:
+        columns = pack_segments(segments)
+        names = ["clip_id", *columns]
+        self.connection().execute(
+            f"INSERT OR REPLACE INTO clip_segments ({', '.join(names)}) "
+            f"VALUES ({', '.join('?' for _ in names)})",
+            (clip_id, *columns.values())
+        )
+
+    def get(self, clip_id: int) -> Optional[ClipSegments]:
+        row = self.connection().execute(
+            "SELECT * FROM clip_segments WHERE clip_id = ?", (clip_id,)
+        ).fetchone()
+        return ClipSegments(row) if row else None
+
+    def delete(self, clip_id: int) -> None:
+        self.connection().execute("DELETE FROM clip_segments WHERE clip_id = ?", (clip_id,))
+
+    def stats(self) -> dict:
+        row = self.connection().execute(
+            """
+            SELECT COUNT(*) AS clips,
+                   COALESCE(SUM(count), 0) AS segments,
+                   COALESCE(SUM(word_counts IS NOT NULL), 0) AS with_words,
+                   COALESCE(SUM(LENGTH(starts) + LENGTH(ends) + LENGTH(logprobs) + LENGTH(text)
+                       + LENGTH(text_ends) + COALESCE(LENGTH(word_counts) + LENGTH(word_starts)
+                       + LENGTH(word_ends) + LENGTH(word_probs) + LENGTH(word_text)
+                       + LENGTH(word_text_ends), 0)), 0) AS bytes
+            FROM clip_segments
+            """
+        ).fetchone()
+        return {
+            "clips": row["clips"],
+            "segments": row["segments"],
+            "clipsWithWords": row["with_words"],
+            "bytes": row["bytes"]
+        }
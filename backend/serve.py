@@ -0,0 +1,106 @@
+"""
+HEARSAY Serve - multi-worker launcher
+─────────────────────────────────────────────────────────────────────────────
+`uvicorn server:app` runs one process: one event loop for every guest's
+uploads, event streams and chapter calls, on one core. This launcher runs
+WEB_WORKERS uvicorn workers behind the same port, plus the Whisper sidecar
+(sidecar.py) they share:
+
+  1. start the sidecar and wait for its socket (restart it if it dies)
+  2. start uvicorn with WEB_WORKERS workers, each told SIDECAR_SOCKET and
+     HEARSAY_WORKERS so it submits clips to the sidecar and takes its
+     share of the Anthropic rate limits
+  3. stop the sidecar when uvicorn exits
+
+With WEB_WORKERS=1 it still uses the sidecar, which keeps Whisper out of
+the web process.
+
+Usage (from backend/):
+    python serve.py
+
+Environment Variables:
+    WEB_WORKERS    - uvicorn worker processes (default: CPU count, max 4)
+    SIDECAR_SOCKET - socket between the workers and the sidecar (default: /tmp/hearsay-sidecar.sock)
+    PORT           - port to listen on (default: 8000)
+"""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+from pathlib import Path
+
+WEB_WORKERS = max(1, int(os.getenv("WEB_WORKERS", min(4, os.cpu_count() or 1))))
+SIDECAR_SOCKET = os.getenv("SIDECAR_SOCKET", "/tmp/hearsay-sidecar.sock")
+PORT = int(os.getenv("PORT", 8000))
+
+SIDECAR_START_TIMEOUT = 30.0
+SIDECAR_RESTART_DELAY = 2.0
+
+BACKEND_DIR = Path(__file__).parent
+
+
+class Sidecar:
+    """The sidecar subprocess, restarted if it exits while we're running"""
+
+    def __init__(self):
+        self.process = None
+        self.stopping = threading.Event()
+        self.restarts = 0
+
+    def _spawn(self):
+        self.process = subprocess.Popen(
+            [sys.executable, str(BACKEND_DIR / "sidecar.py")],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "SIDECAR_SOCKET": SIDECAR_SOCKET}
+        )
+
+    def start(self):
+        if os.path.exists(SIDECAR_SOCKET):
+            os.unlink(SIDECAR_SOCKET)
+        self._spawn()
+        deadline = time.monotonic() + SIDECAR_START_TIMEOUT
+        while not os.path.exists(SIDECAR_SOCKET):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"Sidecar did not start (exit code {self.process.poll()})")
+            time.sleep(0.1)
+        threading.Thread(target=self._watch, name="sidecar-watch", daemon=True).start()
+
+    def _watch(self):
+        while not self.stopping.is_set():
+            code = self.process.wait()
+            if self.stopping.is_set():
+                return
+            self.restarts += 1
+            print(f"[HEARSAY] Sidecar exited ({code}), restarting")
+            time.sleep(SIDECAR_RESTART_DELAY)
+            self._spawn()
+
+    def stop(self):
+        self.stopping.set()
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def main():
+    import uvicorn
+
+    sidecar = Sidecar()
+    sidecar.start()
+    # Inherited by the uvicorn workers
+    os.environ["SIDECAR_SOCKET"] = SIDECAR_SOCKET
+    os.environ["HEARSAY_WORKERS"] = str(WEB_WORKERS)
+    print(f"[HEARSAY] Starting {WEB_WORKERS} web worker(s) on :{PORT}, sidecar at {SIDECAR_SOCKET}")
+    try:
+        uvicorn.run("server:app", host="0.0.0.0", port=PORT, workers=WEB_WORKERS, app_dir=str(BACKEND_DIR))
+    finally:
+        sidecar.stop()
+
+
+if __name__ == "__main__":
+    main()
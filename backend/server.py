@@ -7,7 +7,28 @@ and chapter generation via Claude Opus.
 Endpoints:
     POST /api/simli-token?agentId=xxx&faceId=xxx  → Get session token + sessionId
     GET  /api/simli-transcript/{session_id}       → Retrieve transcript after session
+    POST /api/simli-transcript/{session_id}/watch → Push the transcript to a session's events
+    GET  /api/events/{session_id}                 → Session event channel (Server-Sent Events)
+    POST /api/upload-audio                        → Upload a clip, queue it for Whisper
+    POST /api/uploads                             → Start a resumable upload
+    GET  /api/uploads/{upload_id}                 → Resume offset for an upload
+    PUT  /api/uploads/{upload_id}?offset=N        → Append a chunk
+    WS   /api/live-transcribe?sessionId=...         → Stream a clip, transcribe while recording
+    GET  /api/transcription/{job_id}              → Transcription job status
+    GET  /api/session-transcripts/{session_id}    → All clips + transcripts for a session
+    GET  /api/session-transcripts/{session_id}/segments?since=&until= → Timed segments in a window
+    GET  /api/clips/{clip_id}/segments?start=&end= → One clip's timed segments
+    GET  /api/sessions                            → Recent sessions across the catalog
     POST /api/writing-engine/generate             → Generate chapter from transcripts
+    POST /api/writing-engine/stream               → Same, streamed as Server-Sent Events
+    POST /api/writing-engine/generate-from-audio  → Start a chapter job from Whisper transcripts
+    POST /api/writing-engine/stream-from-audio    → Same, streamed as Server-Sent Events
+    GET  /api/writing-engine/status/{job_id}      → Chapter job status
+    GET  /api/upstream/stats                      → Upstream connection pool stats
+    GET  /api/metrics                             → Prometheus metrics (text format)
+    GET  /api/debug/timeline/{session_id}         → Where a session's time went (span waterfall)
+    GET  /api/storage                              → Audio storage by retention tier, disk usage
+    GET  /api/ready                                → Readiness: 200 once warm, 503 while warming up
     GET  /api/health                               → Health check
     GET  / (serves frontend)
 
@@ -16,25 +37,65 @@ Environment Variables (set in Railway):
     ELEVENLABS_API_KEY - ElevenLabs API key for TTS
     ANTHROPIC_API_KEY - Anthropic API key for Writing Engine
     PORT - Railway sets this automatically
+    SIDECAR_SOCKET - Whisper sidecar socket, set by serve.py for multi-worker mode
 """
 
 import os
+import time
 import uuid
 import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
-from datetime import datetime
-from fastapi import FastAPI, HTTPException, Query, UploadFile, File, Form, BackgroundTasks
+from datetime import datetime, timezone
+from fastapi import (
+    FastAPI, HTTPException, Query, Request, UploadFile, File, Form,
+    WebSocket, WebSocketDisconnect
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional
 import httpx
 
+import writing_engine
+import metrics
+from http_clients import UpstreamClients
+from writing_engine import (
+    WritingEngineError, ChapterPlan, build_chapter_message, build_audio_chapter_message,
+    transcript_scenes, audio_scenes
+)
+from catalog import get_catalog
+from job_store import JobStore
+from chapter_cache import ChapterCache
+from continuity import ContinuityStore
+from tracing import Tracer
+from anthropic_scheduler import AnthropicScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from session_events import SessionEvents
+from simli_transcripts import SimliTranscripts, SimliTranscriptError
+from token_pool import TokenPool, load_character_faces
+from static_delivery import StaticDelivery, RangeNotSatisfiable, IMMUTABLE, REVALIDATE
+from transcription import TranscriptionPool, QueueFullError
+from sidecar import SidecarClient, RemoteTranscriptionPool, SIDECAR_SOCKET
+from live_transcription import LiveTranscriber
+from audio_normalize import remove_normalized
+from warmup import Warmup, WarmupUnavailable
+from retention import Retention
+from uploads import ResumableUploadStore, UploadOffsetError, UPLOAD_CHUNK_SIZE, save_upload_file
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """startup() and shutdown() are defined below, next to what they start"""
+    await startup()
+    yield
+    await shutdown()
+
+
 app = FastAPI(
     title="HEARSAY Backend",
     description="Token server for Simli AI talking heads",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS for development (Railway handles production)
@@ -46,45 +107,124 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms for /api/metrics
+app.add_middleware(metrics.RequestMetrics)
+
 # Configuration from environment
 SIMLI_API_KEY = os.getenv("SIMLI_API_KEY", "")
 SIMLI_API_URL = os.getenv("SIMLI_API_URL", "https://api.simli.ai")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
+ANTHROPIC_API_URL = os.getenv("ANTHROPIC_API_URL", "https://api.anthropic.com")
 PORT = int(os.getenv("PORT", 8000))
 
 # Path to frontend files (parent directory of backend/)
 FRONTEND_DIR = Path(__file__).parent.parent
 PROMPTS_DIR = Path(__file__).parent / "prompts"
-AUDIO_DIR = Path(__file__).parent / "audio_uploads"
+AUDIO_DIR = Path(os.getenv("AUDIO_UPLOAD_DIR", str(Path(__file__).parent / "audio_uploads")))
 
 # Ensure audio directory exists
 AUDIO_DIR.mkdir(exist_ok=True)
 
-# In-memory job tracking (for production, use Redis or database)
-chapter_jobs: Dict[str, dict] = {}
+# Frontend files: ETags, ranges, fingerprinted caching, compressed variants
+static_files = StaticDelivery(FRONTEND_DIR)
 
-# Whisper model (lazy loaded)
-whisper_model = None
+# Recordings and transcripts (SQLite, WAL mode)
+catalog = get_catalog()
 
-def get_whisper_model():
-    """Lazy load Whisper model"""
-    global whisper_model
-    if whisper_model is None:
-        try:
-            from faster_whisper import WhisperModel
-            # Use 'base' model - good balance of speed and accuracy
-            # Use CPU since Railway may not have GPU
-            whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
-            print("[HEARSAY] Whisper model loaded (base, cpu)")
-        except ImportError:
-            print("[HEARSAY] Warning: faster-whisper not installed. Audio transcription disabled.")
-            return None
-        except Exception as e:
-            print(f"[HEARSAY] Warning: Failed to load Whisper: {e}")
-            return None
-    return whisper_model
+# Writing Engine jobs (durable, TTL + size bounded)
+job_store = JobStore(catalog)
+chapter_cache = ChapterCache(catalog)
+
+# Per-session stage timings for /api/debug/timeline
+tracer = Tracer(catalog)
+
+# Every Claude call: concurrency cap, rate-limit buckets, priority, retries
+anthropic_scheduler = AnthropicScheduler()
+
+# Rolling "story so far" per reader, replacing verbatim previous chapters
+story_continuity = ContinuityStore(catalog, chapter_cache, anthropic_scheduler)
+
+# Keep-alive connection pools for Simli and Anthropic
+upstream = UpstreamClients(SIMLI_API_URL, ANTHROPIC_API_URL, ANTHROPIC_API_KEY)
+
+# Simli transcripts: fetched once with backoff, then served locally
+simli_transcripts = SimliTranscripts(upstream, catalog, SIMLI_API_KEY)
+
+# Clip statuses that still count as "transcribing"
+PENDING_STATUSES = ("pending_transcription", "live")
+
+# Push notifications per session (replaces client polling)
+session_events = SessionEvents()
+
+
+def utc_timestamp(iso: str) -> float:
+    """Epoch seconds from the pool's utcnow().isoformat() timestamps"""
+    return datetime.fromisoformat(iso).replace(tzinfo=timezone.utc).timestamp()
+
+
+def record_transcription(job: dict):
+    """Whisper throughput for /api/metrics and the session's timeline"""
+    path = "queued" if job.get("jobId") else "live"
+    metrics.TRANSCRIPTION_CLIPS.inc(path=path, status=job["status"])
+    clip = catalog.get_clip(job["clipId"]) or {}
+    audio = clip.get("audioSeconds") or 0
+    compute = clip.get("transcribeSeconds") or 0
+
+    if job.get("queuedAt") and job.get("startedAt"):
+        queued, started = utc_timestamp(job["queuedAt"]), utc_timestamp(job["startedAt"])
+        metrics.TRANSCRIPTION_QUEUE_WAIT.observe(started - queued)
+        tracer.record(job["sessionId"], "transcription.queue", queued, started, clipId=job["clipId"])
+        if job.get("finishedAt"):
+            tracer.record(
+                job["sessionId"], "transcription.whisper", started, utc_timestamp(job["finishedAt"]),
+                status="error" if job["status"] == "error" else "ok",
+                clipId=job["clipId"], audioSeconds=audio, speechSeconds=clip.get("speechSeconds"),
+                batchRtf=job.get("batchRtf"), error=job.get("error")
+            )
+
+    if not audio:
+        return
+    metrics.TRANSCRIPTION_AUDIO_SECONDS.inc(audio, path=path)
+    metrics.TRANSCRIPTION_SPEECH_SECONDS.inc(clip.get("speechSeconds") or 0, path=path)
+    metrics.TRANSCRIPTION_COMPUTE_SECONDS.inc(compute, path=path)
+    metrics.TRANSCRIPTION_RTF.observe(compute / audio, path=path)
+
+
+def publish_transcription(job: dict):
+    """Tell the session a clip finished transcribing"""
+    try:
+        record_transcription(job)
+    except Exception as e:
+        print(f"[HEARSAY] Transcription metrics error: {e}")
+    session_events.publish(job["sessionId"], "transcription-complete", {
+        "clipId": job["clipId"],
+        "jobId": job.get("jobId"),
+        "status": job["status"],
+        "error": job.get("error"),
+        "pendingCount": catalog.count_clips(job["sessionId"], PENDING_STATUSES)
+    })
+
+
+# Whisper runs in a bounded worker pool, off the event loop. Under serve.py
+# (several web workers) the pool lives in the sidecar process instead, and
+# session events go through it so every worker sees them.
+if SIDECAR_SOCKET:
+    sidecar = SidecarClient(SIDECAR_SOCKET)
+    transcription_pool = RemoteTranscriptionPool(sidecar, on_finished=publish_transcription)
+    session_events.relay = sidecar.publish
+    sidecar.on_event = session_events.deliver
+    sidecar.on_restart = lambda: run_in_background(requeue_after_sidecar_restart())
+else:
+    sidecar = None
+    transcription_pool = TranscriptionPool(on_finished=publish_transcription)
+
+# Partially uploaded clips (resumable uploads)
+upload_store = ResumableUploadStore(AUDIO_DIR / ".uploads")
+
+# Transcribed audio: Opus, then per-session archives, TTL and quota
+retention = Retention(catalog, AUDIO_DIR)
 
 # Load Writing Engine system prompt
 WRITING_ENGINE_PROMPT = ""
@@ -96,10 +236,201 @@ else:
     print(f"[HEARSAY] Warning: Writing Engine prompt not found at {prompt_path}")
 
 
+async def warm_model() -> dict:
+    detail = await transcription_pool.warm()
+    if not detail["available"]:
+        raise WarmupUnavailable("faster-whisper not installed - transcription disabled")
+    return detail
+
+
+async def warm_prompt() -> dict:
+    global WRITING_ENGINE_PROMPT
+    if not WRITING_ENGINE_PROMPT and prompt_path.exists():
+        WRITING_ENGINE_PROMPT = prompt_path.read_text()
+    if not WRITING_ENGINE_PROMPT:
+        raise RuntimeError(f"Writing Engine prompt not found at {prompt_path}")
+    return {"chars": len(WRITING_ENGINE_PROMPT), "anthropicConfigured": bool(ANTHROPIC_API_KEY)}
+
+
+async def warm_upstream() -> dict:
+    if not upstream.ready:
+        raise RuntimeError("Upstream pools not started")
+    # An unreachable upstream is reported, not waited for - it isn't this instance's fault
+    return await upstream.warm()
+
+
+# Slow startup work, done after the server is listening; /api/ready waits for it
+warmup = Warmup()
+warmup.add("whisper", warm_model)
+warmup.add("prompt", warm_prompt)
+warmup.add("upstream", warm_upstream)
+
+
+# Strong references to fire-and-forget tasks (asyncio only keeps weak ones)
+background_jobs: set = set()
+
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_jobs.add(task)
+    task.add_done_callback(background_jobs.discard)
+    return task
+
+
+async def recover_unfinished_work():
+    """
+    Pick up work that was in flight when the previous process stopped:
+    clips still waiting for Whisper and chapters still being written.
+    """
+    # Live recordings can't be resumed - the client re-uploads them
+    for clip in catalog.clips_with_status(("live",)):
+        Path(clip["audioPath"]).unlink(missing_ok=True)
+        remove_normalized(clip["audioPath"])
+        catalog.delete_clip(clip["clipId"])
+    
+    pending = catalog.clips_with_status(("pending_transcription",))
+    jobs = job_store.unfinished()
+    if pending or jobs:
+        print(f"[HEARSAY] Recovering {len(pending)} transcription(s) and {len(jobs)} chapter job(s)")
+    
+    for job in jobs:
+        if job["source"] == "audio":
+            run_in_background(
+                generate_chapter_background(job["jobId"], job["sessionId"], job["conversations"])
+            )
+        else:
+            # Streamed from client transcripts - nobody is listening any more
+            job_store.fail(job["jobId"], "Interrupted by a server restart. Please try again.")
+    
+    for clip in pending:
+        await transcription_pool.enqueue(clip["audioPath"], clip["clipId"], clip["sessionId"])
+
+
+async def requeue_after_sidecar_restart():
+    """
+    A restarted sidecar starts with an empty queue. One worker queues the
+    clips still waiting for Whisper again (live recordings are left alone -
+    they belong to workers that are still running).
+    """
+    if not await sidecar.claim("recovery"):
+        return
+    in_queue = {
+        job["clipId"] for job in transcription_pool.jobs.values()
+        if job["status"] in ("queued", "running")
+    }
+    pending = [
+        clip for clip in catalog.clips_with_status(("pending_transcription",))
+        if clip["clipId"] not in in_queue
+    ]
+    if pending:
+        print(f"[HEARSAY] Re-queueing {len(pending)} transcription(s) on the restarted sidecar")
+    for clip in pending:
+        await transcription_pool.enqueue(clip["audioPath"], clip["clipId"], clip["sessionId"])
+
+
+async def startup():
+    # Clips recorded before the catalog existed still have JSON sidecars
+    await asyncio.to_thread(catalog.import_sidecars, AUDIO_DIR)
+    await upstream.start()
+    await transcription_pool.start()
+    if SIMLI_API_KEY:
+        await token_pool.start()
+    run_in_background(warmup.run())
+    run_in_background(asyncio.to_thread(job_store.evict))
+    run_in_background(asyncio.to_thread(tracer.evict))
+    # With several workers, only the first one to start recovers
+    if sidecar is None or await sidecar.claim("recovery"):
+        run_in_background(recover_unfinished_work())
+    # Retention runs in whichever worker holds the lease, and moves on if it dies
+    run_in_background(retention.run_forever(
+        claim=(lambda: sidecar.lease("retention")) if sidecar is not None else None
+    ))
+    run_in_background(asyncio.to_thread(static_files.precompress))
+
+
+async def shutdown():
+    await token_pool.stop()
+    await transcription_pool.stop()
+    await upstream.stop()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # API ENDPOINTS
 # ─────────────────────────────────────────────────────────────────────────────
 
+async def mint_simli_token(agentId: str, faceId: str) -> dict:
+    """
+    Mint a session token with Simli's /auto/token.
+    Returns {"token", "sessionId"}; raises HTTPException on failure.
+    """
+    client = upstream.simli
+    
+    # Clean API key
+    simli_key = SIMLI_API_KEY.strip().replace('\n', '').replace('\r', '').replace(' ', '')
+    
+    # Full payload per Simli docs - including TTS key for voice!
+    elevenlabs_key = ELEVENLABS_API_KEY.strip().replace('\n', '').replace('\r', '') if ELEVENLABS_API_KEY else ""
+    
+    payload = {
+        "simliAPIKey": simli_key,
+        "agentId": agentId,
+        "faceId": faceId,
+        "ttsAPIKey": elevenlabs_key,  # CRITICAL: Without this, no voice!
+        "expiryStamp": -1,  # -1 means no expiry
+        "createTranscript": True  # Enable transcript for Writing Engine
+    }
+    
+    # Log what we're sending (without exposing full keys)
+    print(f"[HEARSAY] ttsAPIKey present: {bool(elevenlabs_key)}, length: {len(elevenlabs_key)}")
+    
+    print(f"[HEARSAY] Calling /auto/token for agent {agentId}")
+    
+    try:
+        response = await client.post("/auto/token", json=payload)
+    except httpx.RequestError as e:
+        print(f"[HEARSAY] Request error: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Failed to connect to Simli API: {str(e)}"
+        )
+    
+    if response.status_code != 200:
+        print(f"[HEARSAY] Simli API error: {response.status_code}")
+        print(f"[HEARSAY] Response: {response.text}")
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Simli API error: {response.text}"
+        )
+    
+    data = response.json()
+    print(f"[HEARSAY] Simli response for {agentId}: {data}")
+    
+    # Simli may return token as 'sessionToken', 'session_token', or 'token'
+    token = data.get("sessionToken") or data.get("session_token") or data.get("token") or ""
+    
+    # Capture sessionId for transcript retrieval later
+    session_id = data.get("sessionId") or data.get("session_id") or ""
+    if session_id:
+        print(f"[HEARSAY] Session ID (for transcript): {session_id}")
+    
+    if not token:
+        print(f"[HEARSAY] No token in response: {data}")
+        raise HTTPException(
+            status_code=500,
+            detail="No token in Simli response"
+        )
+    
+    # Return both token and sessionId (frontend needs sessionId for transcript retrieval)
+    return {
+        "token": token,
+        "sessionId": session_id  # Store this to retrieve transcript later
+    }
+
+
+# Ready tokens for every character in config.js (minted ahead of walkups)
+token_pool = TokenPool(mint_simli_token, load_character_faces(FRONTEND_DIR / "config.js"))
+
+
 @app.post("/api/simli-token")
 async def get_simli_token(
     agentId: str = Query(..., description="Simli Agent ID"),
@@ -108,6 +439,9 @@ async def get_simli_token(
     """
     Generate a session token for the Simli widget.
     Uses /auto/token - LLM/TTS keys are configured in each agent in Simli dashboard.
+    
+    Answered from the pre-minted token pool when possible; otherwise the
+    token is minted live.
     """
     
     if not SIMLI_API_KEY:
@@ -116,85 +450,22 @@ async def get_simli_token(
             detail="SIMLI_API_KEY not configured. Set it in Railway environment variables."
         )
     
-    try:
-        async with httpx.AsyncClient() as client:
-            
-            # Clean API key
-            simli_key = SIMLI_API_KEY.strip().replace('\n', '').replace('\r', '').replace(' ', '')
-            
-            # Full payload per Simli docs - including TTS key for voice!
-            elevenlabs_key = ELEVENLABS_API_KEY.strip().replace('\n', '').replace('\r', '') if ELEVENLABS_API_KEY else ""
-            
-            payload = {
-                "simliAPIKey": simli_key,
-                "agentId": agentId,
-                "faceId": faceId,
-                "ttsAPIKey": elevenlabs_key,  # CRITICAL: Without this, no voice!
-                "expiryStamp": -1,  # -1 means no expiry
-                "createTranscript": True  # Enable transcript for Writing Engine
-            }
-            
-            # Log what we're sending (without exposing full keys)
-            print(f"[HEARSAY] ttsAPIKey present: {bool(elevenlabs_key)}, length: {len(elevenlabs_key)}")
-            
-            print(f"[HEARSAY] Calling /auto/token for agent {agentId}")
-            
-            response = await client.post(
-                f"{SIMLI_API_URL}/auto/token",
-                headers={
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                print(f"[HEARSAY] Simli API error: {response.status_code}")
-                print(f"[HEARSAY] Response: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Simli API error: {response.text}"
-                )
-            
-            data = response.json()
-            print(f"[HEARSAY] Simli response for {agentId}: {data}")
-            
-            # Simli may return token as 'sessionToken', 'session_token', or 'token'
-            token = data.get("sessionToken") or data.get("session_token") or data.get("token") or ""
-            
-            # Capture sessionId for transcript retrieval later
-            session_id = data.get("sessionId") or data.get("session_id") or ""
-            if session_id:
-                print(f"[HEARSAY] Session ID (for transcript): {session_id}")
-            
-            if not token:
-                print(f"[HEARSAY] No token in response: {data}")
-                raise HTTPException(
-                    status_code=500,
-                    detail="No token in Simli response"
-                )
-            
-            # Return both token and sessionId (frontend needs sessionId for transcript retrieval)
-            return {
-                "token": token,
-                "sessionId": session_id  # Store this to retrieve transcript later
-            }
-            
-    except httpx.RequestError as e:
-        print(f"[HEARSAY] Request error: {e}")
-        raise HTTPException(
-            status_code=503,
-            detail=f"Failed to connect to Simli API: {str(e)}"
-        )
+    pooled = token_pool.take(agentId, faceId)
+    if pooled is not None:
+        print(f"[HEARSAY] Token for agent {agentId} served from pool")
+        return {**pooled, "pooled": True}
+    
+    return {**await mint_simli_token(agentId, faceId), "pooled": False}
 
 
 @app.get("/api/simli-transcript/{session_id}")
-async def get_transcript(session_id: str):
+async def get_transcript(session_id: str, sessionId: Optional[str] = Query(None, description="Hearsay session ID")):
     """
     Retrieve transcript for a completed Simli session.
     Call this after the conversation ends (not during).
     
     The transcript is used by the Writing Engine to narrativize conversations.
+    Pass the Hearsay `sessionId` to have the fetch show up in its timeline.
     """
     
     if not SIMLI_API_KEY:
@@ -209,63 +480,146 @@ async def get_transcript(session_id: str):
             detail="session_id is required"
         )
     
-    print(f"[HEARSAY] Fetching transcript for session: {session_id}")
-    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.simli.ai/auto/transcript/{session_id}",
-                headers={
-                    "api-key": SIMLI_API_KEY.strip(),
-                    "Content-Type": "application/json"
-                },
-                timeout=30.0
-            )
-            
-            print(f"[HEARSAY] Transcript response status: {response.status_code}")
-            
-            if response.status_code == 404:
-                # Transcript may not be ready yet, or session doesn't exist
-                return JSONResponse(
-                    status_code=202,  # Accepted - try again later
-                    content={
-                        "status": "pending",
-                        "message": "Transcript not yet available. Try again in a few seconds.",
-                        "sessionId": session_id
-                    }
-                )
-            
-            if response.status_code != 200:
-                print(f"[HEARSAY] Transcript error: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Simli transcript error: {response.text}"
-                )
-            
-            data = response.json()
-            print(f"[HEARSAY] Transcript retrieved successfully for {session_id}")
-            
-            return {
-                "status": "complete",
-                "sessionId": session_id,
-                "transcript": data
-            }
-            
+        with tracer.span(sessionId, "simli.transcript", simliSessionId=session_id) as span:
+            data = await simli_transcripts.get(session_id)
+            span.set(ready=data is not None)
+    except SimliTranscriptError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except httpx.RequestError as e:
         print(f"[HEARSAY] Transcript request error: {e}")
         raise HTTPException(
             status_code=503,
             detail=f"Failed to retrieve transcript: {str(e)}"
         )
+    
+    if data is None:
+        # Transcript may not be ready yet - keep polling Simli server-side
+        simli_transcripts.watch(session_id)
+        return JSONResponse(
+            status_code=202,  # Accepted - try again later
+            content={
+                "status": "pending",
+                "message": "Transcript not yet available. Try again in a few seconds.",
+                "sessionId": session_id
+            }
+        )
+    
+    return {
+        "status": "complete",
+        "sessionId": session_id,
+        "transcript": data
+    }
+
+
+# (Simli session, Hearsay session) pairs waiting for a transcript push
+simli_deliveries: set = set()
+
+
+async def deliver_simli_transcript(simli_session_id: str, session_id: str):
+    """
+    Wait for the shared Simli watcher, then push the transcript to the
+    Hearsay session's event channel.
+    """
+    event = {"simliSessionId": simli_session_id}
+    try:
+        with tracer.span(session_id, "simli.transcript.wait", simliSessionId=simli_session_id) as span:
+            data = await asyncio.shield(simli_transcripts.watch(simli_session_id))
+            span.set(ready=data is not None)
+        if data is not None:
+            session_events.publish(session_id, "simli-transcript-ready", {**event, "transcript": data})
+        else:
+            session_events.publish(session_id, "simli-transcript-unavailable", event)
+    finally:
+        simli_deliveries.discard((simli_session_id, session_id))
+
+
+@app.post("/api/simli-transcript/{simli_session_id}/watch")
+async def watch_transcript(simli_session_id: str, sessionId: str = Query(..., description="Hearsay session ID")):
+    """
+    Call when a Simli conversation ends. The server polls Simli with backoff
+    and delivers the transcript as a `simli-transcript-ready` (or
+    `simli-transcript-unavailable`) event on /api/events/{sessionId}.
+    """
+    if not SIMLI_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="SIMLI_API_KEY not configured"
+        )
+    
+    if (simli_session_id, sessionId) not in simli_deliveries:
+        simli_deliveries.add((simli_session_id, sessionId))
+        run_in_background(deliver_simli_transcript(simli_session_id, sessionId))
+    
+    return {"status": "watching", "simliSessionId": simli_session_id, "sessionId": sessionId}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # AUDIO UPLOAD & TRANSCRIPTION
 # ─────────────────────────────────────────────────────────────────────────────
 
+def check_transcription_capacity():
+    """Backpressure: refuse uploads before writing anything to disk"""
+    if transcription_pool.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Transcription queue is full. Try again shortly.",
+            headers={"Retry-After": "10"}
+        )
+
+
+def new_clip_path(session_id: str, character_id: str, timestamp: str, filename: str) -> tuple:
+    """Pick a unique path for a clip inside its session directory"""
+    session_dir = AUDIO_DIR / session_id
+    session_dir.mkdir(exist_ok=True)
+    
+    audio_id = str(uuid.uuid4())[:8]
+    file_ext = Path(filename or "").suffix or ".webm"
+    audio_filename = f"{character_id}_{timestamp}_{audio_id}{file_ext}"
+    return audio_id, session_dir / audio_filename
+
+
+def register_clip(audio_path: Path, fields: dict, status: str = "pending_transcription") -> int:
+    """Add a clip to the catalog and return its id"""
+    return catalog.add_clip(
+        fields["sessionId"],
+        fields["characterId"],
+        fields["characterName"],
+        int(fields["duration"]),
+        int(fields["timestamp"]),
+        audio_path,
+        status
+    )
+
+
+def queue_clip(audio_id: str, audio_path: Path, fields: dict) -> dict:
+    """
+    Catalog a saved clip and queue it for Whisper.
+    Shared by the one-shot and resumable upload paths.
+    """
+    clip_id = register_clip(audio_path, fields)
+    
+    # Queue transcription on the worker pool
+    try:
+        job = transcription_pool.submit(str(audio_path), clip_id, fields["sessionId"])
+    except QueueFullError as e:
+        catalog.delete_clip(clip_id)
+        audio_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    
+    return {
+        "status": "queued",
+        "audioId": audio_id,
+        "clipId": clip_id,
+        "jobId": job["jobId"],
+        "filename": audio_path.name,
+        "sessionId": fields["sessionId"],
+        "characterId": fields["characterId"]
+    }
+
+
 @app.post("/api/upload-audio")
 async def upload_audio(
-    background_tasks: BackgroundTasks,
     sessionId: str = Form(...),
     characterId: str = Form(...),
     characterName: str = Form(...),
@@ -274,112 +628,283 @@ async def upload_audio(
     audio: UploadFile = File(...)
 ):
     """
-    Upload recorded audio from a conversation.
-    Audio will be transcribed by Whisper in the background.
+    Upload recorded audio from a conversation in one request.
+    The file is streamed to disk in chunks and transcribed by Whisper
+    in the background. Returns 503 when the transcription queue is full.
     """
+    check_transcription_capacity()
     
-    # Create session directory
-    session_dir = AUDIO_DIR / sessionId
-    session_dir.mkdir(exist_ok=True)
-    
-    # Generate unique filename
-    audio_id = str(uuid.uuid4())[:8]
-    file_ext = Path(audio.filename).suffix or ".webm"
-    audio_filename = f"{characterId}_{timestamp}_{audio_id}{file_ext}"
-    audio_path = session_dir / audio_filename
+    audio_id, audio_path = new_clip_path(sessionId, characterId, timestamp, audio.filename)
     
-    # Save audio file
+    # Save audio file (chunked copy, never the whole clip in memory)
     try:
-        contents = await audio.read()
-        with open(audio_path, "wb") as f:
-            f.write(contents)
-        
-        print(f"[HEARSAY] Audio saved: {audio_path} ({len(contents) / 1024:.1f} KB)")
+        with tracer.span(sessionId, "upload.save", characterId=characterId) as span:
+            size = await save_upload_file(audio.file, audio_path)
+            span.set(bytes=size)
+        metrics.UPLOAD_BYTES.inc(size, path="upload")
+        print(f"[HEARSAY] Audio saved: {audio_path} ({size / 1024:.1f} KB)")
     except Exception as e:
         print(f"[HEARSAY] Audio save failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save audio: {e}")
     
-    # Create metadata file
-    metadata = {
+    return queue_clip(audio_id, audio_path, {
         "sessionId": sessionId,
         "characterId": characterId,
         "characterName": characterName,
-        "duration": int(duration),
-        "timestamp": int(timestamp),
-        "filename": audio_filename,
-        "status": "pending_transcription",
-        "transcript": None
-    }
+        "duration": duration,
+        "timestamp": timestamp
+    })
+
+
+@app.post("/api/uploads")
+async def create_resumable_upload(
+    sessionId: str = Form(...),
+    characterId: str = Form(...),
+    characterName: str = Form(...),
+    duration: str = Form(...),
+    timestamp: str = Form(...),
+    filename: str = Form(""),
+    totalSize: int = Form(...)
+):
+    """
+    Start a resumable upload. The client then PUTs the bytes in chunks to
+    /api/uploads/{uploadId}?offset=N and can GET the same URL to find out
+    where to resume after a dropped connection.
+    """
+    if totalSize <= 0:
+        raise HTTPException(status_code=400, detail="totalSize must be positive")
     
-    metadata_path = session_dir / f"{audio_filename}.json"
-    import json
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=2)
+    check_transcription_capacity()
     
-    # Queue transcription in background
-    background_tasks.add_task(transcribe_audio_file, str(audio_path), str(metadata_path))
+    state = upload_store.create(totalSize, {
+        "sessionId": sessionId,
+        "characterId": characterId,
+        "characterName": characterName,
+        "duration": duration,
+        "timestamp": timestamp,
+        "filename": filename
+    })
     
     return {
-        "status": "queued",
-        "audioId": audio_id,
-        "filename": audio_filename,
-        "sessionId": sessionId,
-        "characterId": characterId
+        "uploadId": state["uploadId"],
+        "offset": 0,
+        "totalSize": totalSize,
+        "chunkSize": UPLOAD_CHUNK_SIZE
     }
 
 
-async def transcribe_audio_file(audio_path: str, metadata_path: str):
+@app.get("/api/uploads/{upload_id}")
+async def get_resumable_upload(upload_id: str):
     """
-    Background task to transcribe audio using Whisper.
+    Report how many bytes of an upload the server has (where to resume).
+    """
+    state = upload_store.get(upload_id)
+    if state is None:
+        result = upload_store.finished(upload_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        # Already finished: PUT at this offset returns the same clip
+        return {
+            "uploadId": upload_id,
+            "offset": result["totalSize"],
+            "totalSize": result["totalSize"],
+            "status": "complete"
+        }
+    
+    return {
+        "uploadId": upload_id,
+        "offset": state["offset"],
+        "totalSize": state["totalSize"]
+    }
+
+
+@app.put("/api/uploads/{upload_id}")
+async def append_resumable_upload(upload_id: str, request: Request, offset: int = Query(...)):
+    """
+    Append one chunk (raw request body) at `offset`.
+    Returns 409 with the server's offset if the client is out of step.
+    When the last byte arrives the clip is queued for transcription; a
+    retry after that gets the same result back. If the queue is full the
+    upload is kept and the client retries an empty PUT at the end offset.
+    """
+    result = upload_store.finished(upload_id)
+    if result is not None:
+        return result
+    
+    state = upload_store.get(upload_id)
+    session_id = state["fields"]["sessionId"] if state else None
+    try:
+        with tracer.span(session_id, "upload.chunk", uploadId=upload_id, offset=offset) as span:
+            state = await upload_store.append(upload_id, offset, request.stream())
+            span.set(bytes=state["offset"] - offset)
+    except KeyError:
+        # A concurrent retry may have just finished it
+        result = upload_store.finished(upload_id)
+        if result is not None:
+            return result
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetError as e:
+        return JSONResponse(
+            status_code=409,
+            content={"uploadId": upload_id, "offset": e.expected, "detail": str(e)}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    metrics.UPLOAD_BYTES.inc(state["offset"] - offset, path="resumable")
+    
+    if state["offset"] < state["totalSize"]:
+        return {
+            "status": "uploading",
+            "uploadId": upload_id,
+            "offset": state["offset"],
+            "totalSize": state["totalSize"]
+        }
+    
+    def consume(state: dict) -> dict:
+        # Check for room before consuming the upload, so a full queue
+        # leaves the bytes where the client can finish them later
+        check_transcription_capacity()
+        
+        # Move into the session directory and transcribe
+        fields = state["fields"]
+        audio_id, audio_path = new_clip_path(
+            fields["sessionId"], fields["characterId"], fields["timestamp"], fields["filename"]
+        )
+        upload_store.complete(upload_id, audio_path)
+        print(f"[HEARSAY] Audio saved: {audio_path} ({state['totalSize'] / 1024:.1f} KB, resumable)")
+        return {**queue_clip(audio_id, audio_path, fields), "uploadId": upload_id, "totalSize": state["totalSize"]}
+    
+    # Upload finished - under the upload's lock, so two final PUTs queue it once
+    try:
+        return await upload_store.finalize(upload_id, consume)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+
+@app.websocket("/api/live-transcribe")
+async def live_transcribe(
+    websocket: WebSocket,
+    sessionId: str,
+    characterId: str,
+    characterName: str,
+    timestamp: str,
+    ext: str = ".webm"
+):
+    """
+    Transcribe a conversation while it is happening.
+    
+    The client sends MediaRecorder chunks as binary frames, then a text frame
+    {"type": "stop", "duration": ms}. The server answers with
+    {"type": "partial"|"final"} messages as speech is recognised and a
+    {"type": "complete"} message once the clip is fully transcribed.
+    
+    "stop" is acknowledged with {"type": "stopped"}: from then on the clip
+    is the server's to finish, even if the socket drops. If the socket drops
+    (or a frame can't be handled) before that, the partial clip is discarded
+    and the client falls back to a normal upload.
     """
     import json
     
-    print(f"[HEARSAY] Transcribing: {audio_path}")
+    await websocket.accept()
     
-    model = get_whisper_model()
-    if model is None:
-        print("[HEARSAY] Whisper not available, skipping transcription")
-        return
+    fields = {
+        "sessionId": sessionId,
+        "characterId": characterId,
+        "characterName": characterName,
+        "duration": "0",
+        "timestamp": timestamp
+    }
+    audio_id, audio_path = new_clip_path(sessionId, characterId, timestamp, f"clip{ext}")
+    clip_id = register_clip(audio_path, fields, status="live")
+    live = LiveTranscriber(transcription_pool, audio_path, clip_id, websocket.send_json)
     
+    print(f"[HEARSAY] Live transcription started: {audio_path}")
+    
+    stopped = False
+    duration = 0
+    recording_started = time.time()
     try:
-        # Transcribe with Whisper
-        segments, info = model.transcribe(audio_path, beam_size=5)
-        
-        # Combine all segments into transcript
-        transcript_parts = []
-        for segment in segments:
-            transcript_parts.append(segment.text.strip())
-        
-        full_transcript = " ".join(transcript_parts)
-        
-        print(f"[HEARSAY] Transcription complete: {len(full_transcript)} chars")
-        print(f"[HEARSAY] Language: {info.language}, Probability: {info.language_probability:.2f}")
-        
-        # Update metadata file
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
-        
-        metadata["status"] = "transcribed"
-        metadata["transcript"] = full_transcript
-        metadata["language"] = info.language
-        metadata["languageProb"] = info.language_probability
-        
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=2)
-        
+        while not stopped:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                await live.feed(message["bytes"])
+                metrics.UPLOAD_BYTES.inc(len(message["bytes"]), path="live")
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "stop":
+                    duration = int(control.get("duration") or 0)
+                    stopped = True
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        print(f"[HEARSAY] Transcription error: {e}")
-        
-        # Update metadata with error
+        # Malformed frame or a failed write - don't leave a "live" clip behind
+        print(f"[HEARSAY] Live transcription error: {e}")
+        stopped = False
         try:
-            with open(metadata_path, "r") as f:
-                metadata = json.load(f)
-            metadata["status"] = "error"
-            metadata["error"] = str(e)
-            with open(metadata_path, "w") as f:
-                json.dump(metadata, f, indent=2)
-        except:
+            await websocket.close(code=1011)
+        except Exception:
             pass
+    
+    tracer.record(
+        sessionId, "upload.live", recording_started, time.time(),
+        status="ok" if stopped else "error", characterId=characterId, bytes=live.bytes_received,
+        error=None if stopped else "socket closed before stop"
+    )
+    if not stopped:
+        print(f"[HEARSAY] Live transcription abandoned: {audio_path}")
+        await live.abort()
+        return
+    
+    try:
+        await websocket.send_json({"type": "stopped", "audioId": audio_id, "clipId": clip_id})
+    except Exception:
+        pass
+    
+    catalog.update_clip(clip_id, duration=duration)
+    try:
+        # Only the tail is left to transcribe - the rest ran while recording
+        with tracer.span(sessionId, "transcription.live.finish", clipId=clip_id):
+            result = await live.finish()
+        job_id = None
+    except Exception as e:
+        # Live pass failed - hand the complete file to the regular queue
+        print(f"[HEARSAY] Live transcription failed, queueing clip: {e}")
+        catalog.update_clip(clip_id, status="pending_transcription", segments=None, transcript=None)
+        # The client won't upload it again after "stopped" - wait for room rather than drop it
+        job_id = (await transcription_pool.enqueue(str(audio_path), clip_id, sessionId))["jobId"]
+        result = {"status": "pending_transcription"}
+    
+    if result["status"] != "pending_transcription":
+        publish_transcription({"sessionId": sessionId, "clipId": clip_id, "status": result["status"]})
+    
+    try:
+        await websocket.send_json({
+            "type": "complete",
+            "status": result["status"],
+            "audioId": audio_id,
+            "clipId": clip_id,
+            "jobId": job_id,
+            "filename": audio_path.name,
+            "sessionId": sessionId,
+            "characterId": characterId
+        })
+        await websocket.close()
+    except Exception:
+        pass
+
+
+@app.get("/api/transcription/{job_id}")
+async def get_transcription_job(job_id: str):
+    """
+    Check status of a single transcription job.
+    """
+    job = transcription_pool.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
 
 
 @app.get("/api/session-transcripts/{session_id}")
@@ -388,37 +913,26 @@ async def get_session_transcripts(session_id: str):
     Get all transcripts for a session.
     Used by the Writing Engine to gather conversation data.
     """
-    import json
-    
-    session_dir = AUDIO_DIR / session_id
-    if not session_dir.exists():
+    clips = catalog.session_clips(session_id)
+    if not clips:
         return {"sessionId": session_id, "conversations": [], "status": "no_audio"}
     
-    conversations = []
-    pending = 0
-    
-    # Find all metadata files
-    for metadata_file in session_dir.glob("*.json"):
-        try:
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
-            
-            if metadata.get("status") == "pending_transcription":
-                pending += 1
-            
-            conversations.append({
-                "characterId": metadata.get("characterId"),
-                "characterName": metadata.get("characterName"),
-                "timestamp": metadata.get("timestamp"),
-                "duration": metadata.get("duration"),
-                "status": metadata.get("status"),
-                "transcript": metadata.get("transcript")
-            })
-        except Exception as e:
-            print(f"[HEARSAY] Error reading metadata {metadata_file}: {e}")
-    
-    # Sort by timestamp
-    conversations.sort(key=lambda x: x.get("timestamp", 0))
+    pending = sum(1 for clip in clips if clip["status"] in PENDING_STATUSES)
+    conversations = [
+        {
+            "characterId": clip["characterId"],
+            "characterName": clip["characterName"],
+            "timestamp": clip["timestamp"],
+            "duration": clip["duration"],
+            "status": clip["status"],
+            "error": clip["error"],
+            "transcript": clip["transcript"],
+            "partial": clip["partial"],
+            "audioSeconds": clip["audioSeconds"],
+            "speechSeconds": clip["speechSeconds"]
+        }
+        for clip in clips
+    ]
     
     return {
         "sessionId": session_id,
@@ -428,6 +942,58 @@ async def get_session_transcripts(session_id: str):
     }
 
 
+@app.get("/api/session-transcripts/{session_id}/segments")
+async def get_session_segments(
+    session_id: str,
+    since: Optional[int] = Query(None, description="Window start, ms since the epoch"),
+    until: Optional[int] = Query(None, description="Window end, ms since the epoch"),
+    characterId: Optional[str] = None,
+    words: bool = False
+):
+    """
+    Timed segments for part of a session, oldest first. Times are wall-clock
+    ms (like clip timestamps) so they line up with the Simli transcript;
+    only the clips overlapping the window are read.
+    """
+    if since is not None and until is not None and until <= since:
+        raise HTTPException(status_code=400, detail="until must be after since")
+    
+    segments = catalog.session_segments(session_id, since, until, characterId, words)
+    return {"sessionId": session_id, "since": since, "until": until, "segments": segments}
+
+
+@app.get("/api/clips/{clip_id}/segments")
+async def get_clip_segments(
+    clip_id: int,
+    start: Optional[float] = Query(None, ge=0, description="Seconds into the clip"),
+    end: Optional[float] = Query(None, ge=0, description="Seconds into the clip"),
+    words: bool = True
+):
+    """
+    One clip's segments (start, end, text, avgLogprob, words) overlapping
+    [start, end) seconds.
+    """
+    clip = catalog.get_clip(clip_id)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Clip not found")
+    
+    return {
+        "clipId": clip_id,
+        "sessionId": clip["sessionId"],
+        "timestamp": clip["timestamp"],
+        "status": clip["status"],
+        "segments": catalog.clip_segments(clip_id, start, end, words)
+    }
+
+
+@app.get("/api/sessions")
+async def list_sessions(limit: int = Query(50, ge=1, le=500)):
+    """
+    List recent sessions across the catalog with clip and pending counts.
+    """
+    return {"sessions": catalog.list_sessions(limit, PENDING_STATUSES)}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # WRITING ENGINE
 # ─────────────────────────────────────────────────────────────────────────────
@@ -450,17 +1016,11 @@ class ChapterRequest(BaseModel):
     transcripts: List[Conversation]
     previousChapters: Optional[List[str]] = []
     chapterLength: Optional[str] = "medium"  # short, medium, long
+    storyId: Optional[str] = None  # the reader's run of chapters (continuity summary)
 
 
-@app.post("/api/writing-engine/generate")
-async def generate_chapter(request: ChapterRequest):
-    """
-    Generate a literary chapter from conversation transcripts using Claude Opus.
-    
-    This is the heart of the Writing Engine. It takes raw Simli transcripts
-    and transforms them into narrativized prose.
-    """
-    
+def check_writing_engine_ready():
+    """Raise if the Writing Engine can't run (missing key or prompt)"""
     if not ANTHROPIC_API_KEY:
         raise HTTPException(
             status_code=500,
@@ -472,6 +1032,82 @@ async def generate_chapter(request: ChapterRequest):
             status_code=500,
             detail="Writing Engine prompt not loaded. Check backend/prompts/writing_engine.md"
         )
+
+
+def chapter_plan(request: ChapterRequest, story: Optional[dict]) -> ChapterPlan:
+    """Prompt plan for client-supplied transcripts (map-reduce when long)"""
+    return ChapterPlan(
+        request.sessionId,
+        WRITING_ENGINE_PROMPT,
+        lambda notes: build_chapter_message(
+            request.sessionId, request.transcripts, request.previousChapters, request.chapterLength,
+            notes, story
+        ),
+        transcript_scenes(request.transcripts)
+    )
+
+
+def audio_chapter_plan(session_id: str, conversations: list, story: Optional[dict]) -> ChapterPlan:
+    """Prompt plan for Whisper transcripts (map-reduce when long)"""
+    return ChapterPlan(
+        session_id,
+        WRITING_ENGINE_PROMPT,
+        lambda notes: build_audio_chapter_message(session_id, conversations, notes, story),
+        audio_scenes(conversations)
+    )
+
+
+async def story_context(session_id: str, story_id: Optional[str]) -> Optional[dict]:
+    """The reader's story so far (waits for a summary still being written)"""
+    if not story_id:
+        return None
+    with tracer.span(session_id, "chapter.continuity", storyId=story_id):
+        return await story_continuity.context(story_id, session_id)
+
+
+async def chapter_prompt(plan: ChapterPlan, ticket, **kwargs):
+    """The chapter prompt; for long sessions, after the scene notes are drafted"""
+    if not plan.map_reduce:
+        return await plan.message(upstream.anthropic, cache=chapter_cache, ticket=ticket, **kwargs)
+    with tracer.span(plan.session_id, "chapter.scene_notes", scenes=len(plan.scenes)):
+        return await plan.message(upstream.anthropic, cache=chapter_cache, ticket=ticket, **kwargs)
+
+
+def remember_chapter(session_id: str, story_id: Optional[str], chapter: str, story: Optional[dict],
+                     previous_chapters: List[str] = ()):
+    """Fold a finished chapter into the reader's story summary (background)"""
+    # A story without a summary yet is seeded from the client's previous chapters
+    seed = [] if story is not None else list(previous_chapters or [])
+    story_continuity.record(upstream.anthropic, WRITING_ENGINE_PROMPT, story_id, chapter, seed, session_id)
+
+
+def usage_attributes(usage: dict) -> dict:
+    """Token counts for a chapter.claude span"""
+    return {
+        "inputTokens": usage.get("input_tokens"),
+        "outputTokens": usage.get("output_tokens"),
+        "cacheReadTokens": usage.get("cache_read_input_tokens")
+    }
+
+
+def record_chapter_result(path: str, started: float, cached: bool, usage: dict):
+    """Chapter duration for /api/metrics; tokens only when Claude actually wrote it"""
+    elapsed = time.perf_counter() - started
+    if cached:
+        metrics.record_chapter(path, "cached", elapsed)
+    else:
+        metrics.record_chapter(path, "ok", elapsed, usage)
+
+
+@app.post("/api/writing-engine/generate")
+async def generate_chapter(request: ChapterRequest):
+    """
+    Generate a literary chapter from conversation transcripts using Claude Opus.
+    
+    This is the heart of the Writing Engine. It takes raw Simli transcripts
+    and transforms them into narrativized prose.
+    """
+    check_writing_engine_ready()
     
     if not request.transcripts or len(request.transcripts) == 0:
         raise HTTPException(
@@ -482,178 +1118,102 @@ async def generate_chapter(request: ChapterRequest):
     print(f"[HEARSAY] Generating chapter for session {request.sessionId}")
     print(f"[HEARSAY] Conversations: {len(request.transcripts)}")
     
+    story = await story_context(request.sessionId, request.storyId)
+    plan = chapter_plan(request, story)
+    # Someone is waiting on this response - ahead of background jobs
+    ticket = anthropic_scheduler.ticket(PRIORITY_INTERACTIVE)
+    started = time.perf_counter()
+    
     try:
-        # Format transcripts for the prompt
-        formatted_transcripts = []
-        for conv in request.transcripts:
-            formatted = f"\n--- Conversation with {conv.character}"
-            if conv.role:
-                formatted += f" ({conv.role})"
-            formatted += f" ---\nTime: {conv.timestamp}\n\n"
-            
-            # Handle transcript format (could be list or string)
-            if isinstance(conv.transcript, list):
-                for entry in conv.transcript:
-                    if isinstance(entry, dict):
-                        speaker = entry.get('speaker', 'unknown')
-                        text = entry.get('text', '')
-                    else:
-                        speaker = entry.speaker
-                        text = entry.text
-                    formatted += f"[{speaker}]: {text}\n"
-            else:
-                # Already a string
-                formatted += conv.transcript
-            
-            formatted_transcripts.append(formatted)
+        # Long sessions: scene notes per conversation first (concurrently)
+        user_message = await chapter_prompt(plan, ticket, timeout=120.0)
         
-        transcripts_text = "\n".join(formatted_transcripts)
-        
-        # Build the user message
-        user_message = f"""Please write a chapter based on the following conversation transcripts from tonight's session.
-
-SESSION: {request.sessionId}
-CONVERSATION COUNT: {len(request.transcripts)}
-REQUESTED LENGTH: {request.chapterLength} (~{"1000" if request.chapterLength == "short" else "2000" if request.chapterLength == "medium" else "3500"} words)
-
-{transcripts_text}
-
----
-
-Write the chapter now. Remember:
-- Preserve actual dialogue (may polish for flow)
-- Add setting, interiority, sensory detail
-- Weave multiple conversations into one coherent chapter
-- Ground us in Room 412, the peephole, the hallway
-- End with an image, not a cliffhanger or closure"""
-
-        # Include previous chapters if provided (for continuity)
-        if request.previousChapters and len(request.previousChapters) > 0:
-            prev_chapters_text = "\n\n---\n\n".join(request.previousChapters[-2:])  # Last 2 chapters
-            user_message = f"""PREVIOUS CHAPTERS (for continuity):
-
-{prev_chapters_text}
-
----
-
-NOW, for tonight's session:
-
-{user_message}"""
-
         # Call Claude Opus
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": ANTHROPIC_API_KEY.strip(),
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
-                },
-                json={
-                    "model": "claude-opus-4-20250514",
-                    "max_tokens": 8192,
-                    "system": WRITING_ENGINE_PROMPT,
-                    "messages": [
-                        {"role": "user", "content": user_message}
-                    ]
-                },
-                timeout=120.0  # Opus can take a while
+        with tracer.span(request.sessionId, "chapter.claude", path="generate") as span:
+            result = await writing_engine.generate(
+                upstream.anthropic,
+                WRITING_ENGINE_PROMPT,
+                user_message,
+                timeout=120.0,  # Opus can take a while
+                cache=chapter_cache,
+                ticket=ticket
             )
-            
-            if response.status_code != 200:
-                print(f"[HEARSAY] Anthropic API error: {response.status_code}")
-                print(f"[HEARSAY] Response: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Anthropic API error: {response.text}"
-                )
-            
-            data = response.json()
-            
-            # Extract the chapter text
-            chapter_content = ""
-            if data.get("content"):
-                for block in data["content"]:
-                    if block.get("type") == "text":
-                        chapter_content += block.get("text", "")
-            
-            if not chapter_content:
-                raise HTTPException(
-                    status_code=500,
-                    detail="No chapter content in Anthropic response"
-                )
-            
-            # Generate chapter ID
-            chapter_id = str(uuid.uuid4())
-            
-            # Count words
-            word_count = len(chapter_content.split())
-            
-            # Extract character names from transcripts
-            characters = list(set([t.character for t in request.transcripts]))
-            
-            print(f"[HEARSAY] Chapter generated: {word_count} words, {len(characters)} characters")
-            
-            return {
-                "chapterId": chapter_id,
-                "sessionId": request.sessionId,
-                "content": chapter_content,
-                "wordCount": word_count,
-                "charactersIncluded": characters,
-                "generatedAt": datetime.utcnow().isoformat() + "Z"
-            }
-            
+            span.set(cached=result["cached"], **usage_attributes(result["usage"]))
+    except WritingEngineError as e:
+        metrics.record_chapter("generate", "error", time.perf_counter() - started)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except httpx.RequestError as e:
+        metrics.record_chapter("generate", "error", time.perf_counter() - started)
         print(f"[HEARSAY] Writing Engine request error: {e}")
         raise HTTPException(
             status_code=503,
             detail=f"Failed to connect to Anthropic API: {str(e)}"
         )
+    
+    record_chapter_result("generate", started, result["cached"], result["usage"])
+    chapter_content = result["text"]
+    remember_chapter(request.sessionId, request.storyId, chapter_content, story, request.previousChapters)
+    
+    # Generate chapter ID
+    chapter_id = str(uuid.uuid4())
+    
+    # Count words
+    word_count = len(chapter_content.split())
+    
+    # Extract character names from transcripts
+    characters = list(set([t.character for t in request.transcripts]))
+    
+    print(f"[HEARSAY] Chapter generated: {word_count} words, {len(characters)} characters")
+    
+    return {
+        "chapterId": chapter_id,
+        "sessionId": request.sessionId,
+        "content": chapter_content,
+        "wordCount": word_count,
+        "charactersIncluded": characters,
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "cached": result["cached"],
+        "mapReduce": plan.map_reduce
+    }
 
 
-@app.post("/api/writing-engine/generate-from-audio")
-async def generate_chapter_from_audio(
-    background_tasks: BackgroundTasks,
-    session_id: str = Form(...)
-):
+def gather_audio_conversations(session_id: str, since: Optional[int] = None, until: Optional[int] = None):
     """
-    Generate a chapter from audio transcripts.
-    This is the main entry point for the Writing Engine.
+    Collect a session's Whisper transcripts for the Writing Engine.
+    Returns a ready list of conversations, or a response to send instead
+    (202 while clips are still transcribing).
     
-    1. Checks all audio has been transcribed
-    2. Gathers transcripts
-    3. Generates chapter with Claude
-    4. Returns job ID for status polling
+    With `since`/`until` (ms since the epoch) only the speech inside that
+    window is used, read from the timed segments.
     """
-    import json
-    
     # Check session exists
-    session_dir = AUDIO_DIR / session_id
-    if not session_dir.exists():
+    clips = catalog.session_clips(session_id)
+    if not clips:
         raise HTTPException(status_code=404, detail="No audio found for this session")
     
-    # Gather all transcripts
+    windowed = None
+    if since is not None or until is not None:
+        windowed = {}
+        for segment in catalog.session_segments(session_id, since, until):
+            windowed.setdefault(segment["clipId"], []).append(segment["text"])
+    
+    # Gather all transcripts (already in timestamp order)
     conversations = []
     pending = 0
     
-    for metadata_file in session_dir.glob("*.json"):
-        try:
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
-            
-            if metadata.get("status") == "pending_transcription":
-                pending += 1
-                continue
-            
-            if metadata.get("transcript"):
-                conversations.append({
-                    "character": metadata.get("characterName", "Unknown"),
-                    "role": None,
-                    "timestamp": datetime.fromtimestamp(metadata.get("timestamp", 0) / 1000).isoformat(),
-                    "transcript": metadata.get("transcript")
-                })
-        except Exception as e:
-            print(f"[HEARSAY] Error reading {metadata_file}: {e}")
+    for clip in clips:
+        if clip["status"] in PENDING_STATUSES:
+            pending += 1
+            continue
+        
+        transcript = clip["transcript"] if windowed is None else " ".join(windowed.get(clip["clipId"], []))
+        if transcript:
+            conversations.append({
+                "character": clip["characterName"] or "Unknown",
+                "role": None,
+                "timestamp": datetime.fromtimestamp((clip["timestamp"] or 0) / 1000).isoformat(),
+                "transcript": transcript
+            })
     
     if pending > 0:
         return JSONResponse(
@@ -668,22 +1228,38 @@ async def generate_chapter_from_audio(
     if len(conversations) == 0:
         raise HTTPException(status_code=400, detail="No transcripts available for this session")
     
-    # Sort by timestamp
-    conversations.sort(key=lambda x: x.get("timestamp", ""))
+    return conversations
+
+
+@app.post("/api/writing-engine/generate-from-audio")
+async def generate_chapter_from_audio(
+    session_id: str = Form(...),
+    since: Optional[int] = Form(None),
+    until: Optional[int] = Form(None),
+    story_id: Optional[str] = Form(None)
+):
+    """
+    Generate a chapter from audio transcripts.
+    This is the main entry point for the Writing Engine.
+    
+    1. Checks all audio has been transcribed
+    2. Gathers transcripts
+    3. Generates chapter with Claude
+    4. Returns job ID for status polling
+    
+    Optional `since`/`until` (ms since the epoch) limit it to part of the session;
+    `story_id` carries the reader's story summary into the chapter.
+    """
+    conversations = gather_audio_conversations(session_id, since, until)
+    if isinstance(conversations, JSONResponse):
+        return conversations
     
     # Create job
     job_id = str(uuid.uuid4())
-    chapter_jobs[job_id] = {
-        "status": "processing",
-        "sessionId": session_id,
-        "startedAt": datetime.utcnow().isoformat(),
-        "conversations": len(conversations),
-        "chapter": None,
-        "error": None
-    }
+    job_store.create(job_id, session_id, conversations)
     
-    # Queue chapter generation in background
-    background_tasks.add_task(generate_chapter_background, job_id, session_id, conversations)
+    # Generate the chapter in the background
+    run_in_background(generate_chapter_background(job_id, session_id, conversations, story_id))
     
     return {
         "status": "processing",
@@ -694,103 +1270,209 @@ async def generate_chapter_from_audio(
     }
 
 
-async def generate_chapter_background(job_id: str, session_id: str, conversations: list):
+async def generate_chapter_background(job_id: str, session_id: str, conversations: list,
+                                      story_id: Optional[str] = None):
     """
     Background task to generate a chapter from transcripts.
     """
+    started = time.perf_counter()
     
     try:
         print(f"[HEARSAY] Generating chapter for job {job_id}")
         
-        # Format transcripts for Claude
-        formatted_transcripts = []
-        for conv in conversations:
-            formatted = f"\n--- Conversation with {conv['character']} ---\n"
-            formatted += f"Time: {conv['timestamp']}\n\n"
-            
-            # Format as dialogue (user is speaking to character)
-            # Note: We only have user's speech from Whisper
-            formatted += f"Occupant of 412: {conv['transcript']}\n"
-            formatted += f"[{conv['character']} responds - content inferred from conversation flow]\n"
-            
-            formatted_transcripts.append(formatted)
+        story = await story_context(session_id, story_id)
+        ticket = anthropic_scheduler.ticket(PRIORITY_BACKGROUND, job_id)
+        user_message = await chapter_prompt(audio_chapter_plan(session_id, conversations, story), ticket)
+        
+        # Call Claude
+        with tracer.span(session_id, "chapter.claude", path="background", jobId=job_id) as span:
+            result = await writing_engine.generate(
+                upstream.anthropic, WRITING_ENGINE_PROMPT, user_message, cache=chapter_cache, ticket=ticket
+            )
+            span.set(cached=result["cached"], **usage_attributes(result["usage"]))
+        chapter_content = result["text"]
+        record_chapter_result("background", started, result["cached"], result["usage"])
+        
+        # Update job
+        job_store.complete(job_id, chapter_content, [c["character"] for c in conversations])
+        remember_chapter(session_id, story_id, chapter_content, story)
+        word_count = len(chapter_content.split())
+        session_events.publish(session_id, "chapter-ready", {"jobId": job_id, "wordCount": word_count})
         
-        transcripts_text = "\n".join(formatted_transcripts)
+        print(f"[HEARSAY] Chapter complete for job {job_id}: {word_count} words")
         
-        # Build prompt
-        user_message = f"""Please write a chapter based on the following conversation transcripts from tonight's session.
-
-Note: These transcripts capture the occupant's side of the conversation (what they said aloud).
-The character's responses should be inferred from the flow and context of the occupant's words.
+    except Exception as e:
+        metrics.record_chapter("background", "error", time.perf_counter() - started)
+        print(f"[HEARSAY] Chapter generation error: {e}")
+        job_store.fail(job_id, str(e))
+        session_events.publish(session_id, "chapter-error", {"jobId": job_id, "error": str(e)})
 
-SESSION: {session_id}
-CONVERSATION COUNT: {len(conversations)}
 
-{transcripts_text}
+# ─────────────────────────────────────────────────────────────────────────────
+# WRITING ENGINE - STREAMING (Server-Sent Events)
+# ─────────────────────────────────────────────────────────────────────────────
 
----
+def sse_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Event"""
+    import json
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
 
-Write the chapter now. Remember:
-- The transcripts show what the occupant said; imagine what the characters said in response
-- Add setting, interiority, sensory detail
-- Weave multiple conversations into one coherent chapter
-- Ground us in Room 412, the peephole, the hallway
-- End with an image, not a cliffhanger or closure"""
 
-        # Call Claude
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": ANTHROPIC_API_KEY.strip(),
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
-                },
-                json={
-                    "model": "claude-opus-4-20250514",
-                    "max_tokens": 8192,
-                    "system": WRITING_ENGINE_PROMPT,
-                    "messages": [
-                        {"role": "user", "content": user_message}
-                    ]
-                },
-                timeout=180.0  # 3 minutes for Opus
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Anthropic API error: {response.status_code} - {response.text}")
-            
-            data = response.json()
-            
-            # Extract chapter
-            chapter_content = ""
-            if data.get("content"):
-                for block in data["content"]:
-                    if block.get("type") == "text":
-                        chapter_content += block.get("text", "")
-            
-            if not chapter_content:
-                raise Exception("No chapter content in response")
-            
-            # Update job
-            chapter_jobs[job_id] = {
-                "status": "complete",
-                "sessionId": session_id,
-                "completedAt": datetime.utcnow().isoformat(),
-                "chapter": chapter_content,
-                "wordCount": len(chapter_content.split()),
-                "characters": [c["character"] for c in conversations]
-            }
-            
-            print(f"[HEARSAY] Chapter complete for job {job_id}: {len(chapter_content.split())} words")
-            
-    except Exception as e:
-        print(f"[HEARSAY] Chapter generation error: {e}")
-        chapter_jobs[job_id] = {
-            "status": "error",
+async def stream_chapter_job(
+    job_id: str,
+    session_id: str,
+    plan: ChapterPlan,
+    characters: List[str],
+    events: asyncio.Queue,
+    remember: Optional[Callable[[str], None]] = None
+):
+    """
+    Stream a chapter from Claude into `events` and record the result in the
+    job store. Runs as its own task, so the chapter is still finished and
+    saved if the reader closes the page mid-stream.
+    """
+    usage: dict = {}
+    parts = []
+    started = time.perf_counter()
+    
+    try:
+        print(f"[HEARSAY] Streaming chapter for job {job_id}")
+        
+        # The reader is watching the stream - interactive priority
+        ticket = anthropic_scheduler.ticket(PRIORITY_INTERACTIVE, job_id)
+        
+        # Map stage (long sessions only): a `notes` event per finished scene
+        user_message = await chapter_prompt(
+            plan, ticket,
+            on_note=lambda done, total: events.put_nowait(("notes", {"done": done, "total": total}))
+        )
+        
+        with tracer.span(session_id, "chapter.claude", path="stream", jobId=job_id) as span:
+            async for text in writing_engine.stream(
+                upstream.anthropic, WRITING_ENGINE_PROMPT, user_message, usage, cache=chapter_cache, ticket=ticket
+            ):
+                if not parts:
+                    # Time to first text is what the reader feels
+                    span.set(firstDeltaMs=round((time.time() - span.start) * 1000))
+                parts.append(text)
+                events.put_nowait(("delta", {"text": text}))
+            span.set(cached=usage.get("cached", False), **usage_attributes(usage))
+        
+        chapter_content = "".join(parts)
+        if not chapter_content:
+            raise WritingEngineError(500, "No chapter content in Anthropic response")
+        record_chapter_result("stream", started, usage.get("cached", False), usage)
+        
+        job_store.complete(job_id, chapter_content, characters)
+        if remember is not None:
+            remember(chapter_content)
+        word_count = len(chapter_content.split())
+        session_events.publish(session_id, "chapter-ready", {"jobId": job_id, "wordCount": word_count})
+        print(f"[HEARSAY] Chapter complete for job {job_id}: {word_count} words (streamed)")
+        
+        events.put_nowait(("complete", {
+            "chapterId": job_id,
+            "jobId": job_id,
             "sessionId": session_id,
-            "error": str(e)
-        }
+            "content": chapter_content,
+            "wordCount": word_count,
+            "charactersIncluded": characters,
+            "generatedAt": datetime.utcnow().isoformat() + "Z",
+            "usage": usage
+        }))
+        
+    except Exception as e:
+        if isinstance(e, httpx.RequestError):
+            detail = f"Failed to connect to Anthropic API: {str(e)}"
+        else:
+            detail = getattr(e, "detail", str(e))
+        metrics.record_chapter("stream", "error", time.perf_counter() - started)
+        print(f"[HEARSAY] Chapter stream error: {detail}")
+        job_store.fail(job_id, detail)
+        session_events.publish(session_id, "chapter-error", {"jobId": job_id, "error": detail})
+        events.put_nowait(("error", {"jobId": job_id, "error": detail}))
+    
+    finally:
+        events.put_nowait(None)
+
+
+def chapter_event_stream(job_id: str, session_id: str, plan: ChapterPlan, characters: List[str],
+                         remember: Optional[Callable[[str], None]] = None):
+    """
+    SSE response for a chapter job: `job` first, `notes` progress while a
+    long session's scene notes are drafted, then `delta` events as Claude
+    writes, then `complete` (or `error`).
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    run_in_background(stream_chapter_job(job_id, session_id, plan, characters, events, remember))
+    
+    async def event_source():
+        yield sse_event("job", {"jobId": job_id, "sessionId": session_id, "mapReduce": plan.map_reduce})
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            yield sse_event(*item)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/writing-engine/stream")
+async def stream_chapter(request: ChapterRequest):
+    """
+    Same input as /api/writing-engine/generate, but the chapter is streamed
+    back as Server-Sent Events while Claude writes it.
+    """
+    check_writing_engine_ready()
+    
+    if not request.transcripts:
+        raise HTTPException(status_code=400, detail="No transcripts provided")
+    
+    job_id = str(uuid.uuid4())
+    job_store.create(job_id, request.sessionId, jsonable_encoder(request.transcripts), source="request")
+    
+    characters = list(set([t.character for t in request.transcripts]))
+    story = await story_context(request.sessionId, request.storyId)
+    
+    return chapter_event_stream(
+        job_id, request.sessionId, chapter_plan(request, story), characters,
+        lambda chapter: remember_chapter(request.sessionId, request.storyId, chapter, story, request.previousChapters)
+    )
+
+
+@app.post("/api/writing-engine/stream-from-audio")
+async def stream_chapter_from_audio(
+    session_id: str = Form(...),
+    since: Optional[int] = Form(None),
+    until: Optional[int] = Form(None),
+    story_id: Optional[str] = Form(None)
+):
+    """
+    Same input as /api/writing-engine/generate-from-audio, but the chapter is
+    streamed back as Server-Sent Events instead of polled via /status.
+    Returns 202 (not a stream) while clips are still transcribing.
+    """
+    check_writing_engine_ready()
+    
+    conversations = gather_audio_conversations(session_id, since, until)
+    if isinstance(conversations, JSONResponse):
+        return conversations
+    
+    job_id = str(uuid.uuid4())
+    job_store.create(job_id, session_id, conversations)
+    
+    characters = [c["character"] for c in conversations]
+    story = await story_context(session_id, story_id)
+    
+    return chapter_event_stream(
+        job_id, session_id, audio_chapter_plan(session_id, conversations, story), characters,
+        lambda chapter: remember_chapter(session_id, story_id, chapter, story)
+    )
 
 
 @app.get("/api/writing-engine/status/{job_id}")
@@ -798,10 +1480,138 @@ async def get_chapter_status(job_id: str):
     """
     Check status of a chapter generation job.
     """
-    if job_id not in chapter_jobs:
+    job = job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return chapter_jobs[job_id]
+    if job["status"] == "processing":
+        # Place of the job's next Claude call in the scheduler (None = running)
+        job["queuePosition"] = anthropic_scheduler.position(job_id)
+    
+    return job
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SESSION EVENTS (Server-Sent Events)
+# ─────────────────────────────────────────────────────────────────────────────
+
+EVENT_HEARTBEAT_SECONDS = 15
+
+
+@app.get("/api/events/{session_id}")
+async def session_event_stream(session_id: str, request: Request, lastEventId: Optional[int] = None):
+    """
+    Push channel for one session: transcription-complete,
+    simli-transcript-ready / simli-transcript-unavailable, chapter-ready and
+    chapter-error events, as they happen.
+    
+    Opens with a `state` event ({pendingCount, clips}) so the client doesn't
+    miss anything that finished before it subscribed. Reconnecting with
+    Last-Event-ID replays the events missed in between.
+    """
+    header_id = request.headers.get("last-event-id", "")
+    last_event_id = int(header_id) if header_id.isdigit() else lastEventId
+    
+    queue = session_events.subscribe(session_id, last_event_id)
+    state = {
+        "sessionId": session_id,
+        "pendingCount": catalog.count_clips(session_id, PENDING_STATUSES),
+        "clips": len(catalog.session_clips(session_id))
+    }
+    
+    async def event_source():
+        try:
+            yield sse_event("state", state)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(message["event"], message["data"], message["id"])
+        finally:
+            session_events.unsubscribe(session_id, queue)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def transcription_queue_samples():
+    stats = transcription_pool.stats()
+    yield "hearsay_transcription_queue_depth", {"state": "queued"}, stats["queued"]
+    yield "hearsay_transcription_queue_depth", {"state": "running"}, stats["running"]
+
+
+def anthropic_queue_samples():
+    stats = anthropic_scheduler.stats()
+    yield "hearsay_anthropic_calls", {"state": "active", "priority": ""}, stats["active"]
+    for priority, waiting in stats["waiting"].items():
+        yield "hearsay_anthropic_calls", {"state": "waiting", "priority": priority}, waiting
+
+
+def storage_samples():
+    for tier, usage in retention.tiers().items():
+        yield "hearsay_audio_storage_bytes", {"tier": tier}, usage["bytes"]
+
+
+# Queue depths and storage are read from the pool, scheduler and catalog when scraped
+metrics.REGISTRY.collector(
+    "hearsay_transcription_queue_depth", "Clips waiting for or being transcribed by Whisper",
+    transcription_queue_samples
+)
+metrics.REGISTRY.collector(
+    "hearsay_anthropic_calls", "Claude calls in flight or queued in the scheduler",
+    anthropic_queue_samples
+)
+metrics.REGISTRY.collector(
+    "hearsay_audio_storage_bytes", "Bytes of clip audio on disk by retention tier",
+    storage_samples
+)
+
+
+@app.get("/api/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format 0.0.4)"""
+    return Response(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/debug/timeline/{session_id}")
+async def session_timeline(session_id: str):
+    """
+    Stage-by-stage waterfall for a session: uploads, transcription queue and
+    Whisper time, Simli transcript fetches, continuity waits, scene notes and
+    the Claude call, each with its offset from the first span.
+    """
+    timeline = tracer.timeline(session_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="No spans recorded for this session")
+    return timeline
+
+
+@app.get("/api/upstream/stats")
+async def upstream_stats():
+    """Connection pool statistics for Simli and Anthropic (reuse rates)"""
+    return upstream.snapshot()
+
+
+@app.get("/api/storage")
+async def storage_usage():
+    """Disk used by clip audio per retention tier, the largest sessions, and the volume"""
+    return await asyncio.to_thread(retention.report)
+
+
+@app.get("/api/ready")
+async def readiness_check():
+    """
+    Readiness for Railway's healthcheck: 200 once the Whisper model, the
+    Writing Engine prompt and the upstream pools are warm, 503 until then.
+    """
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.report())
 
 
 @app.get("/api/health")
@@ -809,12 +1619,26 @@ async def health_check():
     """Health check for Railway monitoring"""
     return {
         "status": "ok",
+        "ready": warmup.ready,
         "service": "hearsay",
         "simli_configured": bool(SIMLI_API_KEY),
         "openai_configured": bool(OPENAI_API_KEY),
         "elevenlabs_configured": bool(ELEVENLABS_API_KEY),
         "anthropic_configured": bool(ANTHROPIC_API_KEY),
-        "writing_engine_ready": bool(WRITING_ENGINE_PROMPT)
+        "writing_engine_ready": bool(WRITING_ENGINE_PROMPT),
+        "transcription": transcription_pool.stats(),
+        "speech": catalog.speech_stats(),
+        "segments": catalog.segments.stats(),
+        "chapter_jobs": job_store.stats(),
+        "chapter_cache": chapter_cache.stats(),
+        "continuity": story_continuity.stats(),
+        "anthropic_scheduler": anthropic_scheduler.stats(),
+        "tracing": tracer.stats(),
+        "session_events": session_events.stats(),
+        "simli_transcripts": simli_transcripts.stats(),
+        "token_pool": token_pool.stats(),
+        "static": static_files.stats(),
+        "storage": retention.stats()
     }
 
 
@@ -822,31 +1646,107 @@ async def health_check():
 # STATIC FILE SERVING
 # ─────────────────────────────────────────────────────────────────────────────
 
-@app.get("/")
-async def serve_index():
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for it)"""
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+async def static_response(request: Request, path: Path) -> Response:
+    """
+    Serve a frontend file: strong ETag, 304s, byte ranges, gzip/brotli for
+    text, and immutable caching when the URL carries the current ?v= hash.
+    """
+    entry = await asyncio.to_thread(static_files.load, path)
+    headers = {
+        "Cache-Control": IMMUTABLE if request.query_params.get("v") == entry.fingerprint else REVALIDATE,
+        "Accept-Ranges": "bytes"
+    }
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range.strip() != entry.etag:
+        range_header = None  # File changed since the client's partial copy
+    
+    # Compressed variant for text files (ranges are always served identity)
+    encoding, body = None, entry.body
+    if entry.body is not None and not range_header:
+        for candidate in static_files.negotiate(request.headers.get("accept-encoding", "")):
+            variant = await asyncio.to_thread(static_files.variant, entry, candidate)
+            if variant is not None:
+                encoding, body = candidate, variant
+                break
+    if entry.body is not None:
+        headers["Vary"] = "Accept-Encoding"
+    
+    etag = entry.etag if encoding is None else f'"{entry.digest[:32]}-{encoding}"'
+    headers["ETag"] = etag
+    
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    
+    status_code = 200
+    start, end = 0, entry.size - 1
+    if range_header:
+        try:
+            byte_range = static_files.parse_range(range_header, entry.size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{entry.size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            status_code = 206
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{entry.size}"
+    
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    length = len(body) if encoding is not None else end - start + 1
+    headers["Content-Length"] = str(length)
+    
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=entry.media_type)
+    if body is not None:
+        if encoding is None:
+            body = body[start:end + 1]
+        return Response(content=body, status_code=status_code, headers=headers, media_type=entry.media_type)
+    return StreamingResponse(
+        static_files.iter_file(entry.path, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=entry.media_type
+    )
+
+
+@app.api_route("/", methods=["GET", "HEAD"])
+async def serve_index(request: Request):
     """Serve main index.html"""
-    index_path = FRONTEND_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
+    index_path = static_files.resolve("index.html")
+    if index_path is not None:
+        return await static_response(request, index_path)
     return JSONResponse(
         status_code=404,
         content={"error": "index.html not found"}
     )
 
 
-# Serve assets folder
-assets_dir = FRONTEND_DIR / "assets"
-if assets_dir.exists():
-    app.mount("/assets", StaticFiles(directory=str(assets_dir)), name="assets")
+# Serve assets folder (videos, images, sounds)
+@app.api_route("/assets/{path:path}", methods=["GET", "HEAD"])
+async def serve_asset(path: str, request: Request):
+    asset_path = static_files.resolve(path, within="assets")
+    if asset_path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return await static_response(request, asset_path)
 
 
 # Serve root-level static files (JS, CSS)
-@app.get("/{filename:path}")
-async def serve_static(filename: str):
+@app.api_route("/{filename:path}", methods=["GET", "HEAD"])
+async def serve_static(filename: str, request: Request):
     """Serve static files from frontend directory"""
     
-    # Security: prevent directory traversal
-    if ".." in filename:
+    # Security: prevent directory traversal, and only root-level files - the
+    # backend (catalog, uploaded audio) lives below the frontend directory
+    if ".." in filename or "/" in filename or "\\" in filename:
         raise HTTPException(status_code=400, detail="Invalid path")
     
     # Only serve known file types
@@ -856,10 +1756,10 @@ async def serve_static(filename: str):
     if ext not in allowed_extensions:
         raise HTTPException(status_code=404, detail="File not found")
     
-    file_path = FRONTEND_DIR / filename
+    file_path = static_files.resolve(filename)
     
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
+    if file_path is not None:
+        return await static_response(request, file_path)
     
     raise HTTPException(status_code=404, detail="File not found")
 
@@ -0,0 +1,116 @@
+"""
+HEARSAY Session Events - push notifications per session
+─────────────────────────────────────────────────────────────────────────────
+One event channel per Hearsay session. The server publishes as things
+happen (a clip finished transcribing, a Simli transcript became available,
+a chapter is ready) and the browser listens on
+GET /api/events/{session_id} (Server-Sent Events) instead of polling the
+status endpoints.
+
+Each channel keeps its most recent events with increasing ids, so a
+browser that reconnects (EventSource sends Last-Event-ID) or subscribes a
+little late still sees what it missed. Channels nobody has touched for
+SESSION_EVENT_TTL_MINUTES are dropped.
+
+With several web workers a browser's event stream and the code publishing
+to it are usually in different processes. A `relay` (the sidecar, in
+multi-worker mode) then takes each published event, numbers it, and sends
+it back to every worker, which `deliver`s it to its own subscribers - so
+event ids are the same everywhere and Last-Event-ID works across workers.
+
+Environment Variables:
+    SESSION_EVENT_HISTORY     - events replayed per session (default: 50)
+    SESSION_EVENT_TTL_MINUTES - drop idle channels after this (default: 120)
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+SESSION_EVENT_HISTORY = int(os.getenv("SESSION_EVENT_HISTORY", 50))
+SESSION_EVENT_TTL_MINUTES = float(os.getenv("SESSION_EVENT_TTL_MINUTES", 120))
+
+
+class Channel:
+    """Subscribers and recent history for one session"""
+
+    def __init__(self):
+        self.subscribers: List[asyncio.Queue] = []
+        self.history: deque = deque(maxlen=SESSION_EVENT_HISTORY)
+        self.touched = time.monotonic()
+
+
+class SessionEvents:
+    """In-process pub/sub keyed by session id (all calls on the event loop)"""
+
+    def __init__(self, ttl_minutes: float = SESSION_EVENT_TTL_MINUTES):
+        self.ttl_seconds = ttl_minutes * 60
+        self.channels: Dict[str, Channel] = {}
+        self._next_id = 1
+        self.published = 0
+        # relay(session_id, event, data) -> True when it took the event
+        self.relay: Optional[Callable[[str, str, dict], bool]] = None
+
+    def _channel(self, session_id: str) -> Channel:
+        channel = self.channels.get(session_id)
+        if channel is None:
+            self._prune()
+            channel = self.channels[session_id] = Channel()
+        channel.touched = time.monotonic()
+        return channel
+
+    def publish(self, session_id: str, event: str, data: dict) -> dict:
+        """Send an event to everyone listening on the session"""
+        if not session_id:
+            return {}
+        if self.relay is not None and self.relay(session_id, event, data):
+            return {"event": event, "data": data}
+        message = {"id": self._next_id, "event": event, "data": data}
+        self.deliver(session_id, message)
+        return message
+
+    def deliver(self, session_id: str, message: dict):
+        """Hand a numbered event to this process's subscribers"""
+        self._next_id = max(self._next_id, message["id"] + 1)
+        self.published += 1
+
+        channel = self._channel(session_id)
+        channel.history.append(message)
+        for queue in channel.subscribers:
+            queue.put_nowait(message)
+
+    def subscribe(self, session_id: str, last_event_id: Optional[int] = None) -> asyncio.Queue:
+        """
+        New subscriber queue for the session, pre-filled with the history
+        after `last_event_id` (all of it when None).
+        """
+        channel = self._channel(session_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in channel.history:
+            if last_event_id is None or message["id"] > last_event_id:
+                queue.put_nowait(message)
+        channel.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue):
+        channel = self.channels.get(session_id)
+        if channel is not None and queue in channel.subscribers:
+            channel.subscribers.remove(queue)
+            channel.touched = time.monotonic()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for session_id in [
+            session_id for session_id, channel in self.channels.items()
+            if not channel.subscribers and channel.touched < cutoff
+        ]:
+            del self.channels[session_id]
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self.channels),
+            "subscribers": sum(len(c.subscribers) for c in self.channels.values()),
+            "published": self.published
+        }
@@ -0,0 +1,478 @@
+"""
+HEARSAY Sidecar - one Whisper process shared by every web worker
+─────────────────────────────────────────────────────────────────────────────
+With `uvicorn --workers N` each worker used to hold its own transcription
+queue, its own session event channels and its own Whisper model: a status
+poll landing on another worker got a 404, a chapter-ready event published
+in one worker never reached a browser listening on another, and N copies of
+the model sat in RAM.
+
+In multi-worker mode (serve.py) the web workers keep request handling and
+this sidecar process owns what must exist once:
+
+  - the TranscriptionPool and the only Whisper model. Workers submit clips
+    and live-transcription model calls over a local Unix socket.
+  - transcription job state. Every job change is pushed to all workers,
+    which mirror it, so any worker answers /api/transcription/{job_id};
+    the worker that submitted a clip runs its on_finished callback.
+  - session event numbering and fan-out (see session_events.py)
+  - one-time claims, so only one worker re-queues unfinished work on startup,
+    and leases, held by one worker's connection until it drops (retention)
+
+The queue itself only lives here. When serve.py restarts a crashed sidecar
+the workers reconnect, notice the new instance id in its hello, and one of
+them queues the catalog's pending_transcription clips again.
+
+Clip transcripts and chapter jobs are already shared through the catalog's
+SQLite database (WAL mode), which every process opens.
+
+Messages are length-prefixed pickles. The socket is created mode 0600 and
+only the same user's processes (the workers) connect to it.
+
+Run on its own:
+    python sidecar.py
+
+Environment Variables:
+    SIDECAR_SOCKET - Unix socket path; set in the workers, it switches them to the sidecar
+                     (default for this process: /tmp/hearsay-sidecar.sock)
+"""
+
+import os
+import time
+import uuid
+import pickle
+import struct
+import asyncio
+import itertools
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from transcription import TranscriptionPool, QueueFullError, TRANSCRIBE_QUEUE_SIZE
+
+SIDECAR_SOCKET = os.getenv("SIDECAR_SOCKET", "")
+DEFAULT_SOCKET = "/tmp/hearsay-sidecar.sock"
+
+HEADER = struct.Struct("!I")
+RECONNECT_INITIAL = 0.5
+RECONNECT_MAX = 5.0
+
+
+class SidecarError(Exception):
+    """The sidecar is unreachable or a call it ran raised"""
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return pickle.loads(await reader.readexactly(length))
+
+
+def write_frame(writer: asyncio.StreamWriter, message: dict):
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(HEADER.pack(len(body)) + body)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sidecar process
+# ─────────────────────────────────────────────────────────────────────────────
+
+class SidecarServer:
+    """The pool, the event counter and the claims, served to the workers"""
+
+    def __init__(self, path: str = SIDECAR_SOCKET or DEFAULT_SOCKET):
+        self.path = path
+        self.pool = TranscriptionPool(on_finished=self._job_finished, on_started=self._job_changed)
+        self.connections: Dict[int, asyncio.StreamWriter] = {}
+        self._connection_ids = itertools.count(1)
+        # Job id -> connection that submitted it (runs its on_finished)
+        self.owners: Dict[str, int] = {}
+        # Milliseconds, so ids keep increasing across sidecar restarts
+        self._event_id = int(time.time() * 1000)
+        self.claims: set = set()
+        # Lease name -> connection holding it, released when that connection drops
+        self.leases: Dict[str, int] = {}
+        # New on every start, so workers can tell a restarted sidecar from a reconnect
+        self.instance = uuid.uuid4().hex
+        self._tasks: set = set()
+        self._warm: Optional[asyncio.Task] = None
+
+    async def serve_forever(self):
+        await self.pool.start()
+        # Load the model now, not on the first guest's clip
+        self._warm = asyncio.create_task(self.pool.warm())
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, self.path)
+        finally:
+            os.umask(umask)
+        print(f"[HEARSAY] Sidecar listening on {self.path}")
+        async with server:
+            await server.serve_forever()
+
+    def _broadcast(self, message: dict):
+        for writer in list(self.connections.values()):
+            try:
+                write_frame(writer, message)
+            except Exception as e:
+                print(f"[HEARSAY] Sidecar broadcast failed: {e}")
+
+    def _job_changed(self, job: dict, owner: Optional[int] = None):
+        self._broadcast({"push": "job", "job": dict(job), "stats": self.pool.stats(), "owner": owner})
+
+    def _job_finished(self, job: dict):
+        owner = self.owners.pop(job["jobId"], None)
+        if owner not in self.connections:
+            # The submitting worker is gone - any worker can publish the result
+            owner = next(iter(self.connections), None)
+        self._job_changed(job, owner)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = next(self._connection_ids)
+        self.connections[connection] = writer
+        try:
+            while True:
+                message = await read_frame(reader)
+                # Model calls take seconds; keep reading the next request meanwhile
+                task = asyncio.create_task(self._dispatch(connection, writer, message))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections.pop(connection, None)
+            for name in [name for name, holder in self.leases.items() if holder == connection]:
+                del self.leases[name]
+            writer.close()
+
+    async def _dispatch(self, connection: int, writer: asyncio.StreamWriter, message: dict):
+        op = message.get("op")
+        try:
+            if op == "hello":
+                result = {
+                    "connection": connection,
+                    "instance": self.instance,
+                    "jobs": [dict(job) for job in self.pool.jobs.values()],
+                    "stats": self.pool.stats()
+                }
+            elif op == "submit":
+                # The worker already checked capacity against its mirror; wait for room
+                self.owners[message["jobId"]] = connection
+                job = await self.pool.enqueue(
+                    message["audioPath"], message["clipId"], message["sessionId"], message["jobId"]
+                )
+                self._job_changed(job)
+                result = None
+            elif op == "warm":
+                # Every worker waits on the same warmup; a failed one is retried
+                if self._warm.done() and self._warm.exception() is not None:
+                    self._warm = asyncio.create_task(self.pool.warm())
+                result = await asyncio.shield(self._warm)
+            elif op == "call":
+                result = await self.pool.run_blocking(message["fn"], *message["args"])
+            elif op == "publish":
+                self._event_id += 1
+                self._broadcast({
+                    "push": "event",
+                    "sessionId": message["sessionId"],
+                    "message": {"id": self._event_id, "event": message["event"], "data": message["data"]}
+                })
+                result = None
+            elif op == "claim":
+                result = message["name"] not in self.claims
+                self.claims.add(message["name"])
+            elif op == "lease":
+                holder = self.leases.get(message["name"])
+                result = holder is None or holder == connection or holder not in self.connections
+                if result:
+                    self.leases[message["name"]] = connection
+            else:
+                raise ValueError(f"Unknown sidecar op: {op}")
+            reply = {"id": message.get("id"), "result": result}
+        except Exception as e:
+            reply = {"id": message.get("id"), "error": f"{type(e).__name__}: {e}"}
+
+        if message.get("id") is not None and connection in self.connections:
+            try:
+                write_frame(writer, reply)
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Web worker side
+# ─────────────────────────────────────────────────────────────────────────────
+
+class SidecarClient:
+    """
+    A worker's connection to the sidecar. Reconnects on its own; pushes go
+    to `on_push(message)` and each (re)connection's hello reply to
+    `on_connect(hello)`, so mirrors can resync. `on_restart()` runs when
+    the sidecar on the other end is a new process (its queue is gone).
+    """
+
+    def __init__(self, path: str = SIDECAR_SOCKET):
+        self.path = path
+        self.on_push: Optional[Callable[[dict], None]] = None
+        self.on_connect: Optional[Callable[[dict], None]] = None
+        self.on_event: Optional[Callable[[str, dict], None]] = None
+        self.on_restart: Optional[Callable[[], None]] = None
+        self.connection: Optional[int] = None
+        self.instance: Optional[str] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self.reconnects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and self.connection is not None
+
+    async def start(self, timeout: float = 30.0):
+        """Connect (call on app startup); waits up to `timeout` for the sidecar"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[HEARSAY] Sidecar not reachable at {self.path} yet - retrying in the background")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        delay = RECONNECT_INITIAL
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(RECONNECT_MAX, delay * 2)
+                continue
+
+            self._writer = writer
+            reading = asyncio.create_task(self._read(reader))
+            try:
+                hello = await self._request_on(writer, {"op": "hello", "pid": os.getpid()})
+                self.connection = hello["connection"]
+                restarted = self.instance is not None and hello["instance"] != self.instance
+                self.instance = hello["instance"]
+                if self.on_connect is not None:
+                    self.on_connect(hello)
+                if restarted:
+                    print("[HEARSAY] Sidecar was restarted")
+                    if self.on_restart is not None:
+                        self.on_restart()
+                self._connected.set()
+                delay = RECONNECT_INITIAL
+                print(f"[HEARSAY] Connected to sidecar ({self.path})")
+                await reading
+            except (SidecarError, ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                reading.cancel()
+                self._writer = None
+                self.connection = None
+                self._connected.clear()
+                writer.close()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(SidecarError("Sidecar connection lost"))
+                self._pending.clear()
+            self.reconnects += 1
+            print("[HEARSAY] Sidecar connection lost, reconnecting")
+            await asyncio.sleep(delay)
+
+    async def _read(self, reader: asyncio.StreamReader):
+        while True:
+            message = await read_frame(reader)
+            if "push" in message:
+                if message["push"] == "event" and self.on_event is not None:
+                    self.on_event(message["sessionId"], message["message"])
+                elif self.on_push is not None:
+                    self.on_push(message)
+                continue
+            future = self._pending.pop(message.get("id"), None)
+            if future is None or future.done():
+                continue
+            if "error" in message:
+                future.set_exception(SidecarError(message["error"]))
+            else:
+                future.set_result(message["result"])
+
+    def send(self, message: dict) -> bool:
+        """Fire-and-forget; False when not connected"""
+        if not self.connected:
+            return False
+        write_frame(self._writer, message)
+        return True
+
+    async def _request_on(self, writer: asyncio.StreamWriter, message: dict):
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        write_frame(writer, {**message, "id": request_id})
+        await writer.drain()
+        return await future
+
+    async def request(self, message: dict):
+        """Send and wait for the reply; raises SidecarError"""
+        if not self.connected:
+            raise SidecarError(f"Sidecar not connected ({self.path})")
+        return await self._request_on(self._writer, message)
+
+    def publish(self, session_id: str, event: str, data: dict) -> bool:
+        """SessionEvents relay: the sidecar numbers the event and sends it to every worker"""
+        return self.send({"op": "publish", "sessionId": session_id, "event": event, "data": data})
+
+    async def claim(self, name: str) -> bool:
+        """True for the first worker to claim `name` in this sidecar's lifetime"""
+        try:
+            return await self.request({"op": "claim", "name": name})
+        except SidecarError:
+            return False
+
+    async def lease(self, name: str) -> bool:
+        """
+        True while this worker holds `name`: the first to ask gets it and
+        keeps it until its connection drops, then the next to ask takes over.
+        """
+        try:
+            return await self.request({"op": "lease", "name": name})
+        except SidecarError:
+            return False
+
+
+class RemoteTranscriptionPool:
+    """
+    TranscriptionPool's interface for a web worker, backed by the sidecar.
+    Job state and queue stats are a mirror kept current by the sidecar's
+    pushes, so submit, is_full, get_job and stats stay synchronous.
+    """
+
+    mode = "sidecar"
+
+    def __init__(self, client: SidecarClient, on_finished: Optional[Callable[[dict], None]] = None):
+        self.client = client
+        self.on_finished = on_finished
+        self.jobs: Dict[str, dict] = {}
+        self._stats: dict = {"queued": 0, "queueSize": TRANSCRIBE_QUEUE_SIZE, "running": 0}
+        client.on_push = self._on_push
+        client.on_connect = self._on_connect
+
+    async def start(self):
+        await self.client.start()
+
+    async def stop(self):
+        await self.client.stop()
+
+    def _on_connect(self, hello: dict):
+        self.jobs = {job["jobId"]: job for job in hello["jobs"]}
+        self._stats = hello["stats"]
+
+    def _on_push(self, message: dict):
+        if message["push"] != "job":
+            return
+        job = message["job"]
+        self._stats = message["stats"]
+        self.jobs[job["jobId"]] = job
+        if job["status"] not in ("queued", "running"):
+            if message.get("owner") == self.client.connection and self.on_finished is not None:
+                try:
+                    self.on_finished(job)
+                except Exception as e:
+                    print(f"[HEARSAY] Transcription callback error: {e}")
+            self._prune()
+
+    def _prune(self):
+        from transcription import FINISHED_JOB_HISTORY
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] not in ("queued", "running")]
+        for job_id in finished[:-FINISHED_JOB_HISTORY]:
+            del self.jobs[job_id]
+
+    def is_full(self) -> bool:
+        return not self.client.connected or self._stats["queued"] >= self._stats["queueSize"]
+
+    def _job(self, audio_path: str, clip_id: int, session_id: str) -> dict:
+        return {
+            "jobId": str(uuid.uuid4()),
+            "sessionId": session_id,
+            "audioPath": audio_path,
+            "clipId": clip_id,
+            "status": "queued",
+            "queuedAt": datetime.utcnow().isoformat(),
+            "startedAt": None,
+            "finishedAt": None,
+            "error": None
+        }
+
+    def submit(self, audio_path: str, clip_id: int, session_id: str = "") -> dict:
+        """Queue a clip on the sidecar. Raises QueueFullError when full or unreachable."""
+        if self.is_full():
+            raise QueueFullError("Transcription queue full" if self.client.connected
+                                 else "Transcription sidecar not reachable")
+        job = self._job(audio_path, clip_id, session_id)
+        self.client.send({"op": "submit", **{k: job[k] for k in ("jobId", "audioPath", "clipId", "sessionId")}})
+        self.jobs[job["jobId"]] = job
+        self._stats = {**self._stats, "queued": self._stats["queued"] + 1}
+        return job
+
+    async def enqueue(self, audio_path: str, clip_id: int, session_id: str = "") -> dict:
+        job = self._job(audio_path, clip_id, session_id)
+        self.jobs[job["jobId"]] = job
+        await self.client.request({"op": "submit", **{k: job[k] for k in ("jobId", "audioPath", "clipId", "sessionId")}})
+        return job
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        result = dict(job)
+        if job["status"] == "queued":
+            queued = sorted(
+                (j["queuedAt"], j["jobId"]) for j in self.jobs.values() if j["status"] == "queued"
+            )
+            result["queuePosition"] = next(
+                (i + 1 for i, (_, queued_id) in enumerate(queued) if queued_id == job_id), None
+            )
+        return result
+
+    async def run_blocking(self, fn, *args):
+        # Decoding and VAD don't need the model - run them in this worker
+        return await asyncio.to_thread(fn, *args)
+
+    async def warm(self) -> dict:
+        """Wait for the sidecar's model warmup"""
+        return await self.client.request({"op": "warm"})
+
+    async def run_model(self, fn, *args):
+        try:
+            return await self.client.request({"op": "call", "fn": fn, "args": args})
+        except SidecarError as e:
+            raise RuntimeError(f"Sidecar model call failed: {e}") from e
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "mode": f"sidecar ({self._stats.get('mode', 'unknown')})",
+            "sidecar": {
+                "connected": self.client.connected,
+                "socket": self.client.path,
+                "reconnects": self.client.reconnects
+            }
+        }
+
+
+def main():
+    asyncio.run(SidecarServer().serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+HEARSAY Simli Transcripts - server-side fetcher and local store
+─────────────────────────────────────────────────────────────────────────────
+Simli only publishes a conversation transcript some time after the session
+ends, and /auto/transcript/{id} answers 404 until then. This module owns
+every call to that endpoint:
+
+  - watch(): once a Simli session ends, poll with exponential backoff
+    until the transcript exists (or give up after SIMLI_TRANSCRIPT_WATCH_SECONDS)
+  - get(): concurrent requests for the same session share one upstream call
+  - completed transcripts are stored in the catalog database, so later
+    reads never leave the box
+
+Environment Variables:
+    SIMLI_TRANSCRIPT_BACKOFF_INITIAL - first retry delay in seconds (default: 1)
+    SIMLI_TRANSCRIPT_BACKOFF_MAX     - longest retry delay in seconds (default: 30)
+    SIMLI_TRANSCRIPT_WATCH_SECONDS   - stop watching after this long (default: 180)
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+from catalog import Catalog
+from http_clients import UpstreamClients
+
+SIMLI_TRANSCRIPT_BACKOFF_INITIAL = float(os.getenv("SIMLI_TRANSCRIPT_BACKOFF_INITIAL", 1))
+SIMLI_TRANSCRIPT_BACKOFF_MAX = float(os.getenv("SIMLI_TRANSCRIPT_BACKOFF_MAX", 30))
+SIMLI_TRANSCRIPT_WATCH_SECONDS = float(os.getenv("SIMLI_TRANSCRIPT_WATCH_SECONDS", 180))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS simli_transcripts (
+    simli_session_id TEXT PRIMARY KEY,
+    transcript       TEXT NOT NULL,
+    fetched_at       REAL NOT NULL
+);
+"""
+
+
+class SimliTranscriptError(Exception):
+    """Simli answered with an error other than "not ready yet" """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SimliTranscripts:
+    """Single-flight, locally cached access to Simli's transcript API"""
+
+    def __init__(self, upstream: UpstreamClients, catalog: Catalog, api_key: str):
+        self.upstream = upstream
+        self.catalog = catalog
+        self.api_key = api_key.strip()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._watchers: Dict[str, asyncio.Task] = {}
+        self.local_hits = 0
+        self.upstream_calls = 0
+        self.collapsed = 0
+        self.catalog.connection().executescript(SCHEMA)
+
+    def stored(self, simli_session_id: str) -> Optional[dict]:
+        row = self.catalog.connection().execute(
+            "SELECT transcript FROM simli_transcripts WHERE simli_session_id = ?",
+            (simli_session_id,)
+        ).fetchone()
+        return json.loads(row["transcript"]) if row else None
+
+    def _store(self, simli_session_id: str, transcript: dict):
+        self.catalog.connection().execute(
+            "INSERT OR REPLACE INTO simli_transcripts (simli_session_id, transcript, fetched_at) VALUES (?, ?, ?)",
+            (simli_session_id, json.dumps(transcript), time.time())
+        )
+
+    async def get(self, simli_session_id: str) -> Optional[dict]:
+        """
+        The transcript, or None while Simli doesn't have it yet.
+        Raises SimliTranscriptError or httpx.RequestError on upstream failure.
+        """
+        transcript = self.stored(simli_session_id)
+        if transcript is not None:
+            self.local_hits += 1
+            return transcript
+
+        pending = self._in_flight.get(simli_session_id)
+        if pending is not None:
+            self.collapsed += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[simli_session_id] = future
+        try:
+            transcript = await self._fetch(simli_session_id)
+            if transcript is not None:
+                self._store(simli_session_id, transcript)
+            future.set_result(transcript)
+            return transcript
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._in_flight.pop(simli_session_id, None)
+
+    async def _fetch(self, simli_session_id: str) -> Optional[dict]:
+        self.upstream_calls += 1
+        print(f"[HEARSAY] Fetching transcript for session: {simli_session_id}")
+
+        response = await self.upstream.simli.get(
+            f"/auto/transcript/{simli_session_id}",
+            headers={"api-key": self.api_key}
+        )
+
+        print(f"[HEARSAY] Transcript response status: {response.status_code}")
+
+        if response.status_code == 404:
+            return None
+
+        if response.status_code != 200:
+            print(f"[HEARSAY] Transcript error: {response.text}")
+            raise SimliTranscriptError(response.status_code, f"Simli transcript error: {response.text}")
+
+        print(f"[HEARSAY] Transcript retrieved successfully for {simli_session_id}")
+        return response.json()
+
+    def watch(self, simli_session_id: str) -> asyncio.Task:
+        """
+        Start (or join) background polling for a finished Simli session.
+        The task resolves to the transcript, or None if it never appeared.
+        """
+        task = self._watchers.get(simli_session_id)
+        if task is None:
+            task = asyncio.create_task(self._watch(simli_session_id))
+            self._watchers[simli_session_id] = task
+            task.add_done_callback(lambda _: self._watchers.pop(simli_session_id, None))
+        return task
+
+    async def _watch(self, simli_session_id: str) -> Optional[dict]:
+        deadline = time.monotonic() + SIMLI_TRANSCRIPT_WATCH_SECONDS
+        delay = SIMLI_TRANSCRIPT_BACKOFF_INITIAL
+        while True:
+            try:
+                transcript = await self.get(simli_session_id)
+                if transcript is not None:
+                    return transcript
+            except (httpx.RequestError, SimliTranscriptError) as e:
+                print(f"[HEARSAY] Transcript watch error ({simli_session_id}): {e}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"[HEARSAY] Gave up waiting for transcript {simli_session_id}")
+                return None
+            # Jitter keeps many ended sessions from polling in lockstep
+            await asyncio.sleep(min(remaining, random.uniform(delay / 2, delay)))
+            delay = min(delay * 2, SIMLI_TRANSCRIPT_BACKOFF_MAX)
+
+    def stats(self) -> dict:
+        stored = self.catalog.connection().execute(
+            "SELECT COUNT(*) FROM simli_transcripts"
+        ).fetchone()[0]
+        return {
+            "stored": stored,
+            "localHits": self.local_hits,
+            "upstreamCalls": self.upstream_calls,
+            "collapsedRequests": self.collapsed,
+            "watching": len(self._watchers)
+        }
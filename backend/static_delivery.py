@@ -0,0 +1,291 @@
+"""
+HEARSAY Static Delivery - frontend files and assets
+─────────────────────────────────────────────────────────────────────────────
+Serves index.html, the JS/CSS modules and the ~54 MB of walkup videos with:
+
+  - Byte ranges (206 / 416, If-Range) so MP4s seek and show a first frame
+    without downloading the whole file
+  - Strong ETags (content hash) and 304s on If-None-Match
+  - Fingerprinted URLs: 'assets/...' references in HTML/JS/CSS are rewritten
+    to 'assets/...?v=<hash>', and a request carrying the current hash is
+    served `immutable` for a year. Everything else is `no-cache`, so it is
+    revalidated (304) instead of downloaded again
+  - gzip and brotli variants of text files, computed once per version
+  - An in-memory LRU for small files (and their compressed variants)
+
+Module URLs themselves are not fingerprinted: the same module imported
+under two URLs would be evaluated twice (two SessionManager singletons),
+so JS is revalidated by ETag instead.
+
+brotli is used when the `brotli` package is installed; gzip always is.
+
+Environment Variables:
+    STATIC_CACHE_MAX_MB - in-memory LRU size for small files (default: 32)
+    STATIC_CACHE_FILE_KB - largest file kept in memory (default: 512)
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import mimetypes
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+STATIC_CACHE_MAX_MB = float(os.getenv("STATIC_CACHE_MAX_MB", 32))
+STATIC_CACHE_FILE_KB = int(os.getenv("STATIC_CACHE_FILE_KB", 512))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Text types that get compressed variants and asset-URL rewriting
+TEXT_EXTENSIONS = {".html", ".js", ".css", ".json", ".svg", ".txt"}
+REWRITE_EXTENSIONS = {".html", ".js", ".css"}
+
+# Not worth compressing below this
+MIN_COMPRESS_BYTES = 1024
+
+READ_CHUNK = 256 * 1024
+
+# 'assets/...' string literals (or url(assets/...)) without an existing query
+ASSET_REF = re.compile(r"""(?P<q>['"(])(?P<path>assets/[^'"()?#\n`$]+)(?=['")])""")
+
+mimetypes.add_type("text/javascript", ".js")
+mimetypes.add_type("video/mp4", ".mp4")
+
+
+class RangeNotSatisfiable(ValueError):
+    """Range header that starts past the end of the file (416)"""
+
+
+class StaticFile:
+    """One version of a file as served (after rewriting)"""
+
+    def __init__(self, path: Path, stat: os.stat_result, digest: str,
+                 body: Optional[bytes], size: int):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.disk_size = stat.st_size
+        self.digest = digest
+        self.body = body            # None for large files (streamed from disk)
+        self.size = size
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if self.media_type.startswith("text/") or path.suffix == ".js":
+            self.media_type += "; charset=utf-8"
+        self.variants: Dict[str, bytes] = {}
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest[:32]}"'
+
+    @property
+    def fingerprint(self) -> str:
+        return self.digest[:12]
+
+    @property
+    def memory(self) -> int:
+        return (self.size if self.body is not None else 0) + sum(len(v) for v in self.variants.values())
+
+    def current(self, stat: os.stat_result) -> bool:
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.disk_size
+
+
+class StaticDelivery:
+    """Resolves, fingerprints, caches and range-slices files under `root`"""
+
+    def __init__(self, root: Path,
+                 max_mb: float = STATIC_CACHE_MAX_MB, file_kb: int = STATIC_CACHE_FILE_KB):
+        self.root = root.resolve()
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.file_max = file_kb * 1024
+        self._lru: "OrderedDict[Path, StaticFile]" = OrderedDict()
+        self._large: Dict[Path, StaticFile] = {}   # too big for the LRU
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Lookup
+    # ─────────────────────────────────────────────────────────────────────
+
+    def resolve(self, relative: str, within: str = "") -> Optional[Path]:
+        """
+        Path under root/`within` for a URL path, or None (missing, outside
+        that directory, or any `..` segment)
+        """
+        if ".." in relative.replace("\\", "/").split("/"):
+            return None
+        base = (self.root / within).resolve() if within else self.root
+        try:
+            path = (base / relative.lstrip("/")).resolve()
+        except (OSError, ValueError):
+            return None
+        if not path.is_relative_to(base) or not path.is_file():
+            return None
+        return path
+
+    def load(self, path: Path) -> StaticFile:
+        """Current version of a file (blocking: reads and hashes on a miss)"""
+        stat = path.stat()
+        with self._lock:
+            cached = self._lru.get(path) or self._large.get(path)
+            if cached is not None and cached.current(stat):
+                if path in self._lru:
+                    self._lru.move_to_end(path)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        if path.suffix.lower() in REWRITE_EXTENSIONS:
+            body = self.rewrite(path.read_bytes())
+            entry = StaticFile(path, stat, hashlib.sha256(body).hexdigest(), body, len(body))
+        elif stat.st_size <= self.file_max:
+            body = path.read_bytes()
+            entry = StaticFile(path, stat, hashlib.sha256(body).hexdigest(), body, len(body))
+        else:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                    digest.update(chunk)
+            entry = StaticFile(path, stat, digest.hexdigest(), None, stat.st_size)
+
+        with self._lock:
+            if entry.body is not None and entry.size <= self.file_max:
+                self._large.pop(path, None)
+                self._lru[path] = entry
+                self._evict()
+            else:
+                self._large[path] = entry
+        return entry
+
+    def rewrite(self, body: bytes) -> bytes:
+        """Append ?v=<hash> to 'assets/...' references that exist on disk"""
+        text = body.decode("utf-8", errors="surrogateescape")
+
+        def fingerprinted(match: re.Match) -> str:
+            asset = self.resolve(match.group("path"))
+            # Rewritten types are left alone (no fingerprint chains or cycles)
+            if asset is None or asset.suffix.lower() in REWRITE_EXTENSIONS:
+                return match.group(0)
+            return f"{match.group('q')}{match.group('path')}?v={self.load(asset).fingerprint}"
+
+        return ASSET_REF.sub(fingerprinted, text).encode("utf-8", errors="surrogateescape")
+
+    def variant(self, entry: StaticFile, encoding: str) -> Optional[bytes]:
+        """Compressed body for `encoding` ('br' or 'gzip'), made once per version"""
+        if entry.body is None or entry.size < MIN_COMPRESS_BYTES:
+            return None
+        if entry.path.suffix.lower() not in TEXT_EXTENSIONS:
+            return None
+        if encoding == "br" and not BROTLI_AVAILABLE:
+            return None
+
+        with self._lock:
+            data = entry.variants.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = brotli.compress(entry.body, quality=11)
+            else:
+                data = gzip.compress(entry.body, compresslevel=9, mtime=0)
+            with self._lock:
+                entry.variants[encoding] = data
+                self._evict()
+        return data if len(data) < entry.size else None
+
+    def precompress(self) -> int:
+        """Build compressed variants for every text file under root"""
+        count = 0
+        for path in self.root.rglob("*"):
+            if path.suffix.lower() not in TEXT_EXTENSIONS or not path.is_file():
+                continue
+            if any(part.startswith(".") or part in ("backend", "node_modules") for part in path.relative_to(self.root).parts):
+                continue
+            try:
+                entry = self.load(path)
+                for encoding in ("br", "gzip"):
+                    if self.variant(entry, encoding) is not None:
+                        count += 1
+            except OSError:
+                continue
+        return count
+
+    def _evict(self):
+        total = sum(entry.memory for entry in self._lru.values())
+        while total > self.max_bytes and len(self._lru) > 1:
+            _, entry = self._lru.popitem(last=False)
+            total -= entry.memory
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Response pieces
+    # ─────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def negotiate(accept_encoding: str) -> Tuple[str, ...]:
+        """Encodings the client accepts, best first"""
+        accepted = {
+            token.split(";")[0].strip().lower()
+            for token in accept_encoding.split(",")
+            if not token.strip().endswith(";q=0")
+        }
+        return tuple(e for e in ("br", "gzip") if e in accepted)
+
+    @staticmethod
+    def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+        """
+        First range of a `bytes=` Range header as (start, end) inclusive.
+        Returns None for a header to ignore (malformed or other unit);
+        raises RangeNotSatisfiable when it lies outside the file.
+        """
+        if not header.startswith("bytes="):
+            return None
+        start_text, _, end_text = header[6:].split(",")[0].strip().partition("-")
+        if not (start_text or end_text):
+            return None
+        if (start_text and not start_text.isdigit()) or (end_text and not end_text.isdigit()):
+            return None
+
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            if int(end_text) == 0:
+                raise RangeNotSatisfiable(header)
+            start, end = max(0, size - int(end_text)), size - 1
+
+        if start >= size or start > end:
+            raise RangeNotSatisfiable(header)
+        return start, end
+
+    @staticmethod
+    def iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
+        """File bytes start..end (inclusive), in chunks"""
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cachedFiles": len(self._lru),
+                "cachedBytes": sum(entry.memory for entry in self._lru.values()),
+                "maxBytes": self.max_bytes,
+                "largeFiles": len(self._large),
+                "hits": self.hits,
+                "misses": self.misses,
+                "brotli": BROTLI_AVAILABLE
+            }
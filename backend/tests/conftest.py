@@ -0,0 +1,14 @@
+"""
+Backend tests import the modules the way server.py does (flat, from
+backend/), and never touch the real catalog.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+os.environ.setdefault("CATALOG_PATH", str(Path(tempfile.mkdtemp()) / "hearsay.db"))
@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+
+import anthropic_scheduler
+from anthropic_scheduler import AnthropicScheduler, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class APIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(anthropic_scheduler.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def scheduler(clock, monkeypatch):
+    # Jitter off: the top of each range
+    monkeypatch.setattr(anthropic_scheduler.random, "uniform", lambda low, high: high)
+    return AnthropicScheduler(max_concurrency=2, rpm=60, input_tpm=0, max_retries=3)
+
+
+def test_bucket_refills_over_time(clock):
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(1) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    clock.now += 120
+    assert bucket.snapshot() == {"perMinute": 60, "available": 60}
+
+
+def test_bucket_caps_requests_at_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.take(1000)
+    assert bucket.level == 0
+    # A call bigger than the whole bucket waits for a full bucket, not forever
+    assert bucket.wait_time(1000) == pytest.approx(60.0)
+
+
+def test_bucket_observe_only_lowers(clock):
+    bucket = TokenBucket(60)
+    bucket.observe("10")
+    assert bucket.level == 10
+    bucket.observe("50")
+    assert bucket.level == 10
+    bucket.observe("not a number")
+    bucket.observe(None)
+    assert bucket.level == 10
+
+
+def test_unlimited_bucket(clock):
+    bucket = TokenBucket(0)
+    assert bucket.unlimited
+    bucket.take(10 ** 9)
+    assert bucket.wait_time(10 ** 9) == 0
+    assert bucket.snapshot() is None
+
+
+def test_retryable_errors_back_off_exponentially(scheduler):
+    assert scheduler.retry_delay(APIError(529), 0) == 2.0
+    assert scheduler.retry_delay(APIError(500), 2) == 8.0
+    assert scheduler.retry_delay(httpx.ConnectError("reset"), 1) == 4.0
+    assert scheduler.retries == 3
+
+
+def test_non_retryable_errors(scheduler):
+    assert scheduler.retry_delay(APIError(400), 0) is None
+    assert scheduler.retry_delay(ValueError("bad"), 0) is None
+    assert scheduler.retry_delay(httpx.ReadTimeout("slow"), 0) is None
+    assert scheduler.retry_delay(APIError(529), 3) is None
+    assert scheduler.retries == 0
+
+
+def test_retry_after_is_honoured(scheduler):
+    assert scheduler.retry_delay(APIError(503, retry_after="7"), 0) == 8.0
+
+
+def test_429_pauses_the_whole_queue(scheduler, clock):
+    delay = scheduler.retry_delay(APIError(429, retry_after="10"), 0)
+    assert delay == 11.0
+    assert scheduler.rate_limited == 1
+    assert scheduler._ready_in(1) == pytest.approx(11.0)
+    assert scheduler.stats()["pausedFor"] == 11.0
+
+    clock.now += 11
+    assert scheduler._ready_in(1) <= 0
+
+
+def test_observe_corrects_buckets_from_headers(scheduler):
+    scheduler.observe({"anthropic-ratelimit-requests-remaining": "0"})
+    assert scheduler._ready_in(1) == pytest.approx(1.0)
+    assert scheduler.stats()["inputTokens"] is None
+
+
+def test_calls_start_by_priority():
+    scheduler = AnthropicScheduler(max_concurrency=1, rpm=0, input_tpm=0, max_retries=0)
+    started = []
+
+    async def run():
+        async def call(name, priority):
+            async with scheduler.slot(priority, 0, name):
+                started.append(name)
+                await asyncio.sleep(0)
+
+        async with scheduler.slot(anthropic_scheduler.PRIORITY_INTERACTIVE, 0):
+            tasks = [
+                asyncio.create_task(call("summary", anthropic_scheduler.PRIORITY_MAINTENANCE)),
+                asyncio.create_task(call("job", anthropic_scheduler.PRIORITY_BACKGROUND)),
+                asyncio.create_task(call("chapter", anthropic_scheduler.PRIORITY_INTERACTIVE)),
+            ]
+            await asyncio.sleep(0.01)
+            assert scheduler.position("summary") == 3
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert started == ["chapter", "job", "summary"]
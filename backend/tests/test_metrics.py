@@ -0,0 +1,58 @@
+from metrics import Counter, Histogram, Registry
+
+
+def test_counter_renders_one_line_per_label_set():
+    counter = Counter("clips_total", "Clips", ["status"])
+    counter.inc(status="transcribed")
+    counter.inc(2, status="transcribed")
+    counter.inc(0.5, status="error")
+    assert counter.header() == ["# HELP clips_total Clips", "# TYPE clips_total counter"]
+    assert counter.render() == [
+        'clips_total{status="error"} 0.5',
+        'clips_total{status="transcribed"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("routes_total", "Routes", ["route"])
+    counter.inc(route='a"b\\c\nd')
+    assert counter.render() == ['routes_total{route="a\\"b\\\\c\\nd"} 1']
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(1, 0.1, 5))
+    for value in (0.05, 0.5, 0.7, 10):
+        histogram.observe(value)
+    assert histogram.render() == [
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="5"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 11.25",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_histogram_labels_come_before_le():
+    histogram = Histogram("rtf", "RTF", ["path"], buckets=(1,))
+    histogram.observe(0.5, path="batch")
+    assert histogram.render()[0] == 'rtf_bucket{path="batch",le="1"} 1'
+
+
+def test_registry_renders_metrics_and_collectors():
+    registry = Registry()
+    registry.add(Counter("uploads_total", "Uploads")).inc()
+    registry.collector("queue_depth", "Clips waiting", lambda: [("queue_depth", {"queue": "whisper"}, 3)])
+
+    def broken():
+        raise RuntimeError("gone")
+
+    registry.collector("broken", "Never rendered", broken)
+    assert registry.render() == "\n".join([
+        "# HELP uploads_total Uploads",
+        "# TYPE uploads_total counter",
+        "uploads_total 1",
+        "# HELP queue_depth Clips waiting",
+        "# TYPE queue_depth gauge",
+        'queue_depth{queue="whisper"} 3',
+    ]) + "\n"
@@ -0,0 +1,137 @@
+import tarfile
+from datetime import datetime, timedelta
+
+import pytest
+
+import retention
+from audio_normalize import normalized_path
+from catalog import Catalog
+from retention import Retention, restore_archived
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return Catalog(tmp_path / "hearsay.db")
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    return tmp_path / "audio"
+
+
+@pytest.fixture
+def no_pyav(monkeypatch):
+    def encode_opus(audio_path, target, bitrate=None):
+        raise ImportError("av")
+
+    monkeypatch.setattr(retention, "encode_opus", encode_opus)
+
+
+def add_clip(catalog, audio_dir, session, name, age_hours, size=1000, status="transcribed"):
+    """A clip (upload plus PCM cache) recorded `age_hours` ago"""
+    path = audio_dir / session / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"a" * size)
+    normalized_path(path).write_bytes(b"p" * size * 2)
+    clip_id = catalog.add_clip(session, "wire", "Wire", 1000, 1, path, status)
+    at = (datetime.utcnow() - timedelta(hours=age_hours)).isoformat()
+    catalog.connection().execute(
+        "UPDATE clips SET created_at = ?, updated_at = ? WHERE id = ?", (at, at, clip_id)
+    )
+    return path
+
+
+def clips_per_tier(policy):
+    return {name: tier["clips"] for name, tier in policy.stats()["tiers"].items() if tier["clips"]}
+
+
+def test_new_clips_stay_raw(catalog, audio_dir):
+    path = add_clip(catalog, audio_dir, "s1", "a.webm", 1)
+    policy = Retention(catalog, audio_dir, compact_after_hours=24, archive_after_hours=48)
+    assert policy.sweep()["tracked"] == 1
+    assert clips_per_tier(policy) == {"raw": 1}
+    assert policy.total_bytes() == 3000
+    assert path.exists() and normalized_path(path).exists()
+
+
+def test_compact_reencodes_to_opus(catalog, audio_dir, monkeypatch):
+    def encode_opus(audio_path, target, bitrate=None):
+        target.write_bytes(b"o" * 100)
+
+    monkeypatch.setattr(retention, "encode_opus", encode_opus)
+    path = add_clip(catalog, audio_dir, "s1", "a.webm", 30)
+    clip_id = catalog.session_clips("s1")[0]["clipId"]
+    policy = Retention(catalog, audio_dir, compact_after_hours=24, archive_after_hours=0)
+
+    assert policy.sweep()["compacted"] == 1
+    assert not path.exists() and not normalized_path(path).exists()
+    assert catalog.get_clip(clip_id)["audioPath"] == str(path.with_suffix(".opus"))
+    assert policy.total_bytes() == 100
+    assert policy.stats()["savedBytes"] == 2900
+
+
+def test_compact_without_pyav_drops_the_pcm_cache(catalog, audio_dir, no_pyav):
+    path = add_clip(catalog, audio_dir, "s1", "a.webm", 30)
+    policy = Retention(catalog, audio_dir, compact_after_hours=24, archive_after_hours=0)
+    policy.sweep()
+    assert clips_per_tier(policy) == {"compact": 1}
+    assert policy.opus_available is False
+    assert path.exists() and not normalized_path(path).exists()
+    assert policy.total_bytes() == 1000
+
+
+def test_pending_sessions_are_not_archived(catalog, audio_dir, no_pyav):
+    add_clip(catalog, audio_dir, "s1", "a.webm", 100)
+    add_clip(catalog, audio_dir, "s1", "b.webm", 100, status="pending_transcription")
+    policy = Retention(catalog, audio_dir, compact_after_hours=24, archive_after_hours=48)
+    assert policy.sweep()["archived"] == 0
+    assert clips_per_tier(policy) == {"compact": 1, "raw": 1}
+
+
+def test_finished_sessions_are_archived_and_restored(catalog, audio_dir, no_pyav):
+    first = add_clip(catalog, audio_dir, "s1", "a.webm", 100)
+    add_clip(catalog, audio_dir, "s1", "b.webm", 99)
+    add_clip(catalog, audio_dir, "s2", "c.webm", 1)
+    policy = Retention(catalog, audio_dir, compact_after_hours=24, archive_after_hours=48)
+
+    assert policy.sweep()["archived"] == 1
+    assert clips_per_tier(policy) == {"archived": 2, "raw": 1}
+    assert not (audio_dir / "s1").exists()
+    archive = audio_dir / ".archive" / "s1.tar"
+    assert sorted(tarfile.open(archive).getnames()) == ["a.webm", "b.webm"]
+
+    assert restore_archived(catalog, str(first))
+    assert first.read_bytes() == b"a" * 1000
+    assert clips_per_tier(policy) == {"archived": 1, "compact": 1, "raw": 1}
+    assert not restore_archived(catalog, str(first))
+
+    # The next pass packs it away again without adding it twice
+    policy.sweep()
+    assert not first.exists()
+    assert sorted(tarfile.open(archive).getnames()) == ["a.webm", "b.webm"]
+
+
+def test_ttl_deletes_audio_but_keeps_transcripts(catalog, audio_dir, no_pyav):
+    path = add_clip(catalog, audio_dir, "s1", "a.webm", 100)
+    add_clip(catalog, audio_dir, "s2", "b.webm", 1)
+    catalog.update_clip(catalog.session_clips("s1")[0]["clipId"], transcript="hello")
+    policy = Retention(catalog, audio_dir, compact_after_hours=0, archive_after_hours=0, ttl_days=2)
+
+    assert policy.sweep()["expired"] == 1
+    assert clips_per_tier(policy) == {"deleted": 1, "raw": 1}
+    assert not path.exists() and not (audio_dir / "s1").exists()
+    assert catalog.session_clips("s1")[0]["transcript"] == "hello"
+
+
+def test_quota_evicts_oldest_sessions_first(catalog, audio_dir, no_pyav):
+    add_clip(catalog, audio_dir, "old", "a.webm", 10)
+    add_clip(catalog, audio_dir, "mid", "b.webm", 5)
+    add_clip(catalog, audio_dir, "new", "c.webm", 1)
+    add_clip(catalog, audio_dir, "pending", "d.webm", 20, status="pending_transcription")
+    policy = Retention(catalog, audio_dir, compact_after_hours=0, archive_after_hours=0, quota_mb=0)
+    policy.quota_bytes = 7000
+
+    assert policy.sweep()["evicted"] == 2
+    assert not (audio_dir / "old").exists() and not (audio_dir / "mid").exists()
+    assert (audio_dir / "new").exists() and (audio_dir / "pending").exists()
+    assert policy.total_bytes() == 6000
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import pytest
+
+from catalog import Catalog
+from transcription import remap_record
+
+SEGMENTS = [
+    {"start": 4.0, "end": 6.0, "text": "third", "avgLogprob": -0.5},
+    {"start": 0.0, "end": 2.0, "text": "first", "avgLogprob": -0.25},
+    # Overlaps the next one and ends after it
+    {"start": 1.5, "end": 5.0, "text": "second - café", "avgLogprob": -0.75},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return Catalog(tmp_path / "hearsay.db")
+
+
+@pytest.fixture
+def store(catalog):
+    return catalog.segments
+
+
+def test_put_get_sorts_by_start(store):
+    store.put(1, SEGMENTS)
+    segments = store.get(1)
+    assert len(segments) == 3
+    assert [s["text"] for s in segments.slice()] == ["first", "second - café", "third"]
+    assert segments.segment(0) == {"start": 0.0, "end": 2.0, "text": "first", "avgLogprob": -0.25}
+
+
+def test_missing_logprob_is_omitted(store):
+    store.put(1, [{"start": 0.0, "end": 1.0, "text": "imported"}])
+    assert store.get(1).segment(0) == {"start": 0.0, "end": 1.0, "text": "imported"}
+
+
+def test_window_includes_overlapping_segments(store):
+    store.put(1, SEGMENTS)
+    segments = store.get(1)
+    # "second" (1.5-5.0) still covers 4.5 even though "first" ended before it
+    assert [s["text"] for s in segments.slice(4.5, 10)] == ["second - café", "third"]
+    assert [s["text"] for s in segments.slice(2.0, 4.0)] == ["second - café"]
+    assert [s["text"] for s in segments.slice(None, 1.5)] == ["first"]
+    assert segments.slice(6.0, None) == []
+    assert segments.text(0, 1.6) == "first second - café"
+
+
+def test_words_follow_their_segment(store):
+    store.put(1, [
+        {"start": 1.0, "end": 2.0, "text": "b c", "words": [
+            {"start": 1.0, "end": 1.5, "word": "b", "probability": 0.5},
+            {"start": 1.5, "end": 2.0, "word": "c", "probability": 0.75},
+        ]},
+        {"start": 0.0, "end": 1.0, "text": "a", "words": [
+            {"start": 0.0, "end": 1.0, "word": "a", "probability": 1.0},
+        ]},
+    ])
+    segments = store.get(1)
+    assert [w["word"] for w in segments.segment(0)["words"]] == ["a"]
+    assert segments.segment(1)["words"][1] == {"start": 1.5, "end": 2.0, "word": "c", "probability": 0.75}
+    assert "words" not in segments.segment(1, words=False)
+
+
+def test_delete_and_stats(store):
+    store.put(1, SEGMENTS)
+    store.put(2, SEGMENTS[:1])
+    stats = store.stats()
+    assert (stats["clips"], stats["segments"], stats["clipsWithWords"]) == (2, 4, 0)
+    assert stats["bytes"] > 0
+
+    store.delete(1)
+    assert store.get(1) is None
+    assert store.stats()["segments"] == 1
+
+
+def test_catalog_clip_segments(catalog):
+    clip_id = catalog.add_clip("s1", "wire", "Wire", 6000, 1_000_000, Path("/tmp/a.webm"))
+    catalog.update_clip(clip_id, segments=SEGMENTS, status="transcribed")
+    assert [s["text"] for s in catalog.clip_segments(clip_id, 4.5)] == ["second - café", "third"]
+
+    at = [s["at"] for s in catalog.session_segments("s1", since=1_004_500)]
+    assert at == [1_001_500, 1_004_000]
+
+    catalog.update_clip(clip_id, segments=None)
+    assert catalog.clip_segments(clip_id) == []
+
+
+def test_remap_record_moves_words_too():
+    record = {"start": 0.5, "end": 1.0, "text": "a", "words": [{"start": 0.5, "end": 1.0, "word": "a"}]}
+    remap_record(record, lambda t: t + 10)
+    assert (record["start"], record["end"]) == (10.5, 11.0)
+    assert (record["words"][0]["start"], record["words"][0]["end"]) == (10.5, 11.0)
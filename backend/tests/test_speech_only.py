@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from transcription import SAMPLE_RATE, SPEECH_GAP_SECONDS, OffsetMap, speech_only
+
+
+def test_offset_map_without_spans_is_identity():
+    assert OffsetMap().original(3.456) == 3.46
+
+
+def test_offset_map_shifts_each_span():
+    offsets = OffsetMap()
+    offsets.add(0.0, 2.0, 1.0)
+    offsets.add(1.2, 10.0, 3.0)
+    assert offsets.original(0.5) == 2.5
+    assert offsets.original(1.2) == 10.0
+    assert offsets.original(2.7) == 11.5
+
+
+def test_offset_map_clamps_the_gap_to_the_span_end():
+    offsets = OffsetMap()
+    offsets.add(0.0, 2.0, 1.0)
+    offsets.add(1.2, 10.0, 3.0)
+    # Inside the gap after the first span: still the first span's end
+    assert offsets.original(1.1) == 3.0
+
+
+def test_speech_only_joins_regions_with_a_gap():
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    regions = [(1 * SAMPLE_RATE, 2 * SAMPLE_RATE), (5 * SAMPLE_RATE, 7 * SAMPLE_RATE)]
+    speech, offsets, samples = speech_only(audio, regions)
+
+    gap = int(SPEECH_GAP_SECONDS * SAMPLE_RATE)
+    assert samples == 3 * SAMPLE_RATE
+    assert len(speech) == samples + 2 * gap
+    assert speech[0] == audio[SAMPLE_RATE]
+    assert not speech[SAMPLE_RATE:SAMPLE_RATE + gap].any()
+    assert speech[SAMPLE_RATE + gap] == audio[5 * SAMPLE_RATE]
+
+    second = 1 + SPEECH_GAP_SECONDS
+    assert offsets.spans == [
+        (0.0, 1.0, 1.0),
+        (pytest.approx(second), 5.0, 2.0),
+    ]
+    assert offsets.original(0.25) == 1.25
+    assert offsets.original(second + 1.5) == 6.5
+
+
+def test_speech_only_without_regions():
+    speech, offsets, samples = speech_only(np.ones(SAMPLE_RATE, dtype=np.float32), [])
+    assert len(speech) == 0
+    assert samples == 0
+    assert offsets.original(0.7) == 0.7
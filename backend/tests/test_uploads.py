@@ -0,0 +1,107 @@
+import os
+import time
+import asyncio
+
+import pytest
+
+from uploads import ResumableUploadStore, UploadOffsetError
+
+
+async def body(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def append(store, upload_id, offset, *chunks):
+    return asyncio.run(store.append(upload_id, offset, body(*chunks)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumableUploadStore(tmp_path / ".uploads", ttl_hours=1)
+
+
+def test_create_starts_empty(store):
+    upload = store.create(10, {"sessionId": "s1"})
+    state = store.get(upload["uploadId"])
+    assert state["offset"] == 0
+    assert state["totalSize"] == 10
+    assert state["fields"] == {"sessionId": "s1"}
+
+
+def test_append_advances_offset(store):
+    upload_id = store.create(10, {})["uploadId"]
+    assert append(store, upload_id, 0, b"abc", b"", b"de")["offset"] == 5
+    assert append(store, upload_id, 5, b"fghij")["offset"] == 10
+    assert store.get(upload_id)["offset"] == 10
+    assert store.part_path(upload_id).read_bytes() == b"abcdefghij"
+
+
+def test_wrong_offset_reports_where_to_resume(store):
+    upload_id = store.create(10, {})["uploadId"]
+    append(store, upload_id, 0, b"abcd")
+    with pytest.raises(UploadOffsetError) as excinfo:
+        append(store, upload_id, 2, b"cd")
+    assert excinfo.value.expected == 4
+    assert store.get(upload_id)["offset"] == 4
+
+
+def test_chunk_past_total_size_is_refused(store):
+    upload_id = store.create(4, {})["uploadId"]
+    with pytest.raises(ValueError):
+        append(store, upload_id, 0, b"abc", b"de")
+    # The chunk that fit stays; the client resumes from there
+    assert store.get(upload_id)["offset"] == 3
+
+
+def test_unknown_upload(store):
+    assert store.get("missing") is None
+    assert store.get("../etc") is None
+    with pytest.raises(KeyError):
+        append(store, "missing", 0, b"a")
+
+
+def test_finalize_consumes_once(store, tmp_path):
+    upload_id = store.create(3, {})["uploadId"]
+    append(store, upload_id, 0, b"abc")
+    calls = []
+
+    def consume(state):
+        calls.append(state)
+        store.complete(upload_id, tmp_path / "clip.webm")
+        return {"clipId": len(calls)}
+
+    async def finalize_twice():
+        return await asyncio.gather(store.finalize(upload_id, consume),
+                                    store.finalize(upload_id, consume))
+
+    assert asyncio.run(finalize_twice()) == [{"clipId": 1}, {"clipId": 1}]
+    assert len(calls) == 1
+    assert (tmp_path / "clip.webm").read_bytes() == b"abc"
+    assert store.get(upload_id) is None
+    assert store.finished(upload_id) == {"clipId": 1}
+
+
+def test_finalize_leaves_upload_when_consume_fails(store):
+    upload_id = store.create(1, {})["uploadId"]
+    append(store, upload_id, 0, b"a")
+
+    def consume(state):
+        raise RuntimeError("queue full")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.finalize(upload_id, consume))
+    assert store.get(upload_id)["offset"] == 1
+    assert store.finished(upload_id) is None
+
+
+def test_evict_drops_idle_uploads(store):
+    idle = store.create(5, {})["uploadId"]
+    active = store.create(5, {})["uploadId"]
+    stale = time.time() - 2 * 3600
+    for path in store.root.glob(f"{idle}.*"):
+        os.utime(path, (stale, stale))
+
+    assert store.evict() == 1
+    assert store.get(idle) is None
+    assert store.get(active) is not None
@@ -0,0 +1,154 @@
+"""
+HEARSAY Token Pool - pre-minted Simli session tokens
+─────────────────────────────────────────────────────────────────────────────
+Minting a Simli token is a round trip to /auto/token, and without a pool
+the guest waits for it while the character walks up. Tokens are minted with
+expiryStamp -1 (no expiry), so they can be made ahead of time.
+
+The pool keeps SIMLI_TOKEN_POOL_SIZE ready tokens for every agentId/faceId
+pair in config.js's character list (characters with status 'ready', plus
+their faceVariants). A token taken from the pool is replaced in the
+background; when a pool is empty the endpoint mints live, as before.
+
+Environment Variables:
+    SIMLI_TOKEN_POOL_SIZE - ready tokens kept per agent/face (default: 2, 0 = off)
+"""
+
+import os
+import re
+import asyncio
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+SIMLI_TOKEN_POOL_SIZE = int(os.getenv("SIMLI_TOKEN_POOL_SIZE", 2))
+
+# Simultaneous /auto/token calls while filling pools
+REFILL_CONCURRENCY = 4
+# Consecutive mint failures before a pool stops refilling until next use
+MAX_REFILL_FAILURES = 5
+
+PoolKey = Tuple[str, str]
+MintFunc = Callable[[str, str], Awaitable[dict]]
+
+
+def load_character_faces(config_path: Path) -> List[PoolKey]:
+    """
+    agentId/faceId pairs for the ready characters in config.js.
+    Placeholders ('xxx') and coming_soon characters are skipped.
+    """
+    if not config_path.exists():
+        print(f"[HEARSAY] Warning: character config not found at {config_path}")
+        return []
+
+    source = config_path.read_text()
+    keys: List[PoolKey] = []
+    # Each character block starts at its agentId and runs to the next one
+    starts = [m.start() for m in re.finditer(r"agentId:\s*'", source)]
+    for start, end in zip(starts, starts[1:] + [len(source)]):
+        block = source[start:end]
+        agent = re.match(r"agentId:\s*'([^']+)'", block).group(1)
+        status = re.search(r"status:\s*'([^']+)'", block)
+        if agent == "xxx" or (status and status.group(1) != "ready"):
+            continue
+
+        faces = re.findall(r"faceId:\s*'([^']+)'", block)
+        variants = re.search(r"faceVariants:\s*\[(.*?)\]", block, re.S)
+        if variants:
+            # Skip commented-out variants
+            live = "\n".join(line.split("//")[0] for line in variants.group(1).splitlines())
+            faces += re.findall(r"id:\s*'([^']+)'", live)
+
+        for face in dict.fromkeys(faces):
+            if face != "xxx":
+                keys.append((agent, face))
+    return list(dict.fromkeys(keys))
+
+
+class TokenPool:
+    """Ready Simli tokens per (agentId, faceId), refilled in the background"""
+
+    def __init__(self, mint: MintFunc, keys: List[PoolKey], size: int = SIMLI_TOKEN_POOL_SIZE):
+        self.mint = mint
+        self.keys = keys
+        self.size = size
+        self.pools: Dict[PoolKey, Deque[dict]] = {key: deque() for key in keys}
+        self.hits = 0
+        self.misses = 0
+        self.mint_errors = 0
+        self._refilling: Dict[PoolKey, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and bool(self.keys)
+
+    async def start(self):
+        """Fill every pool in the background (call on app startup)"""
+        if not self.enabled:
+            return
+        self._semaphore = asyncio.Semaphore(REFILL_CONCURRENCY)
+        for key in self.keys:
+            self.refill(key)
+        print(f"[HEARSAY] Token pool filling: {len(self.keys)} agent/face pair(s) x {self.size}")
+
+    async def stop(self):
+        tasks = list(self._refilling.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refilling.clear()
+
+    def take(self, agent_id: str, face_id: str) -> Optional[dict]:
+        """A ready token ({token, sessionId}) or None; counts the hit or miss"""
+        key = (agent_id, face_id)
+        pool = self.pools.get(key)
+        if pool:
+            self.hits += 1
+            token = pool.popleft()
+            self.refill(key)
+            return token
+
+        self.misses += 1
+        if pool is not None:
+            self.refill(key)
+        return None
+
+    def refill(self, key: PoolKey):
+        """Top the pool back up to `size` unless a refill is already running"""
+        if not self.enabled or self._semaphore is None or key in self._refilling:
+            return
+        task = asyncio.create_task(self._refill(key))
+        self._refilling[key] = task
+        task.add_done_callback(lambda _: self._refilling.pop(key, None))
+
+    async def _refill(self, key: PoolKey):
+        pool = self.pools[key]
+        failures = 0
+        while len(pool) < self.size:
+            try:
+                async with self._semaphore:
+                    token = await self.mint(*key)
+                pool.append(token)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.mint_errors += 1
+                failures += 1
+                print(f"[HEARSAY] Token pool mint failed for agent {key[0]}: {e}")
+                if failures >= MAX_REFILL_FAILURES:
+                    return
+                await asyncio.sleep(min(60, 2 ** failures))
+
+    def stats(self) -> dict:
+        taken = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / taken, 3) if taken else None,
+            "mintErrors": self.mint_errors,
+            "ready": {f"{agent}/{face}": len(pool) for (agent, face), pool in self.pools.items()}
+        }
@@ -0,0 +1,244 @@
+"""
+HEARSAY Tracing - where a session's time went
+─────────────────────────────────────────────────────────────────────────────
+"The chapter took forever" could mean a slow upload, a long Whisper queue,
+slow inference, Simli holding the transcript back, or Opus. Each stage of
+the pipeline records a span - a name, start and end, and a few attributes -
+keyed by the Hearsay sessionId, and /api/debug/timeline/{session_id}
+returns them as a waterfall.
+
+Spans opened inside another span (same task) become its children. Stages
+that are timed elsewhere (the transcription queue, Whisper in a worker
+process) are recorded after the fact from their timestamps.
+
+Spans are kept in the catalog database for TRACE_TTL_HOURS. With
+TRACE_EXPORT_FILE set, every finished span is also appended to that file
+as one OTLP/JSON line (the format of the OpenTelemetry Collector's file
+exporter and otlpjsonfile receiver).
+
+Environment Variables:
+    TRACE_TTL_HOURS   - keep spans this long, 0 = tracing off (default: 72)
+    TRACE_EXPORT_FILE - append finished spans here as OTLP/JSON lines (default: off)
+"""
+
+import os
+import json
+import time
+import hashlib
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from catalog import Catalog
+
+TRACE_TTL_HOURS = float(os.getenv("TRACE_TTL_HOURS", 72))
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+
+# Evict expired spans every this many writes
+EVICT_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trace_spans (
+    span_id     TEXT PRIMARY KEY,
+    session_id  TEXT NOT NULL,
+    parent_id   TEXT,
+    name        TEXT NOT NULL,
+    start       REAL NOT NULL,
+    end         REAL NOT NULL,
+    status      TEXT NOT NULL,
+    attributes  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spans_session ON trace_spans (session_id, start);
+CREATE INDEX IF NOT EXISTS idx_spans_end ON trace_spans (end);
+"""
+
+_current: ContextVar[Optional["Span"]] = ContextVar("hearsay_span", default=None)
+
+
+def trace_id(session_id: str) -> str:
+    """One trace per session: 32 hex chars derived from the sessionId"""
+    return hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+
+
+class Span:
+    """A stage in progress; `set` adds attributes before it ends"""
+
+    def __init__(self, session_id: str, name: str, attributes: dict, parent_id: Optional[str] = None):
+        self.session_id = session_id
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.status = "ok"
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+
+    def set(self, **attributes):
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Session spans in the catalog database, optionally mirrored to a file"""
+
+    def __init__(self, catalog: Catalog, ttl_hours: float = TRACE_TTL_HOURS,
+                 export_path: str = TRACE_EXPORT_FILE):
+        self.catalog = catalog
+        self.enabled = ttl_hours > 0
+        self.ttl_seconds = ttl_hours * 3600
+        self.export_path = export_path
+        self._export_lock = threading.Lock()
+        self._writes = 0
+        self.exported = 0
+        self.export_errors = 0
+        self.catalog.connection().executescript(SCHEMA)
+
+    @contextmanager
+    def span(self, session_id: Optional[str], name: str, **attributes) -> Iterator[Span]:
+        """
+        Time the enclosed block as one stage of `session_id`'s pipeline.
+        An exception marks the span as an error and is re-raised.
+        """
+        parent = _current.get()
+        span = Span(session_id or "", name, attributes, parent.span_id if parent else None)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=str(getattr(e, "detail", None) or e) or type(e).__name__)
+            raise
+        finally:
+            _current.reset(token)
+            span.end = time.time()
+            if session_id:
+                self._save(span)
+
+    def record(self, session_id: Optional[str], name: str, start: float, end: float,
+               status: str = "ok", **attributes) -> None:
+        """Add a stage that was timed elsewhere (epoch seconds)"""
+        if not session_id:
+            return
+        parent = _current.get()
+        span = Span(session_id, name, attributes, parent.span_id if parent else None)
+        span.start, span.end, span.status = start, max(start, end), status
+        self._save(span)
+
+    def _save(self, span: Span):
+        if not self.enabled:
+            return
+        try:
+            self.catalog.connection().execute(
+                """
+                INSERT INTO trace_spans (span_id, session_id, parent_id, name, start, end, status, attributes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (span.span_id, span.session_id, span.parent_id, span.name, span.start, span.end,
+                 span.status, json.dumps(span.attributes, default=str))
+            )
+        except Exception as e:
+            # Tracing must never break the request it is timing
+            print(f"[HEARSAY] Trace span not saved ({span.name}): {e}")
+            return
+
+        if self.export_path:
+            self._export(span)
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def _export(self, span: Span):
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "hearsay"}}]},
+            "scopeSpans": [{
+                "scope": {"name": "hearsay"},
+                "spans": [{
+                    "traceId": trace_id(span.session_id),
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(int(span.start * 1e9)),
+                    "endTimeUnixNano": str(int(span.end * 1e9)),
+                    "attributes": [
+                        {"key": key, "value": _otlp_value(value)}
+                        for key, value in {"hearsay.session_id": span.session_id, **span.attributes}.items()
+                    ],
+                    "status": {"code": 2 if span.status == "error" else 1}
+                }]
+            }]
+        }]}, default=str)
+        try:
+            with self._export_lock, open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.exported += 1
+        except OSError as e:
+            self.export_errors += 1
+            print(f"[HEARSAY] Trace export failed: {e}")
+
+    def timeline(self, session_id: str) -> Optional[dict]:
+        """A session's spans in start order, offsets in ms from the first one"""
+        rows = self.catalog.connection().execute(
+            "SELECT * FROM trace_spans WHERE session_id = ? ORDER BY start, end", (session_id,)
+        ).fetchall()
+        if not rows:
+            return None
+
+        origin = rows[0]["start"]
+        finish = max(row["end"] for row in rows)
+        stages: dict = {}
+        spans = []
+        for row in rows:
+            duration = (row["end"] - row["start"]) * 1000
+            stage = stages.setdefault(row["name"], {"count": 0, "totalMs": 0.0, "errors": 0})
+            stage["count"] += 1
+            stage["totalMs"] = round(stage["totalMs"] + duration, 1)
+            stage["errors"] += row["status"] == "error"
+            spans.append({
+                "spanId": row["span_id"],
+                "parentSpanId": row["parent_id"],
+                "name": row["name"],
+                "startMs": round((row["start"] - origin) * 1000, 1),
+                "durationMs": round(duration, 1),
+                "status": row["status"],
+                "attributes": json.loads(row["attributes"])
+            })
+
+        return {
+            "sessionId": session_id,
+            "traceId": trace_id(session_id),
+            "startedAt": origin,
+            "totalMs": round((finish - origin) * 1000, 1),
+            "stages": stages,
+            "spans": spans
+        }
+
+    def evict(self) -> int:
+        """Drop spans older than the TTL"""
+        return self.catalog.connection().execute(
+            "DELETE FROM trace_spans WHERE end < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+
+    def stats(self) -> dict:
+        spans, sessions = self.catalog.connection().execute(
+            "SELECT COUNT(*), COUNT(DISTINCT session_id) FROM trace_spans"
+        ).fetchone()
+        return {
+            "enabled": self.enabled,
+            "spans": spans,
+            "sessions": sessions,
+            "exportFile": self.export_path or None,
+            "exported": self.exported,
+            "exportErrors": self.export_errors
+        }
@@ -0,0 +1,752 @@
+"""
+HEARSAY Transcription - Whisper worker pool
+─────────────────────────────────────────────────────────────────────────────
+Runs faster-whisper off the uvicorn event loop. Uploads are queued on a
+bounded asyncio queue and drained by a fixed number of workers, each of
+which hands the blocking Whisper call to a thread or process pool.
+
+When the queue is full, `submit` raises `QueueFullError` so the upload
+endpoint can answer 503 instead of piling up work it cannot finish.
+
+With TRANSCRIBE_BATCH_SIZE set, a worker gathers up to that many queued
+clips (waiting at most TRANSCRIBE_BATCH_WAIT_MS for more to arrive), splits
+them into VAD speech chunks and runs them through faster-whisper's
+BatchedInferencePipeline in one call - several guests finishing at once,
+or one long clip, share batched decoding instead of queueing behind each
+other. Each batch's real-time factor is reported in the pool stats.
+
+Either way only speech reaches the model: Silero VAD finds the speech
+regions, the silence between them (the guest listening while the avatar
+talks) is cut out, and an offset map puts segment times back on the
+original clip. Each clip records audio, speech and compute seconds.
+
+Segments keep their timing, avg_logprob and (with TRANSCRIBE_WORDS on) word
+timestamps; the catalog stores them packed per clip (segment_store.py).
+
+Environment Variables:
+    TRANSCRIBE_EXECUTOR      - "thread" (default, one shared model) or "process"
+    TRANSCRIBE_WORKERS       - concurrent transcriptions (default: 2)
+    TRANSCRIBE_QUEUE_SIZE    - clips allowed to wait for a worker (default: 32)
+    TRANSCRIBE_BATCH_SIZE    - clips / speech chunks per batch, 0 = off (default: 0)
+    TRANSCRIBE_BATCH_WAIT_MS - wait this long to fill a batch (default: 250)
+    TRANSCRIBE_VAD           - "0" sends whole clips to Whisper, for comparison (default: 1)
+    TRANSCRIBE_WORDS         - "1" adds word timestamps to segments (default: 0)
+    WHISPER_MODEL            - faster-whisper model size (default: base)
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from catalog import get_catalog
+from audio_normalize import SAMPLE_RATE, load_normalized, normalized_path
+
+CPU_COUNT = os.cpu_count() or 1
+
+TRANSCRIBE_EXECUTOR = os.getenv("TRANSCRIBE_EXECUTOR", "thread").lower()
+TRANSCRIBE_WORKERS = max(1, int(os.getenv("TRANSCRIBE_WORKERS", 2)))
+TRANSCRIBE_QUEUE_SIZE = max(1, int(os.getenv("TRANSCRIBE_QUEUE_SIZE", 32)))
+TRANSCRIBE_BATCH_SIZE = max(0, int(os.getenv("TRANSCRIBE_BATCH_SIZE", 0)))
+TRANSCRIBE_BATCH_WAIT_MS = float(os.getenv("TRANSCRIBE_BATCH_WAIT_MS", 250))
+TRANSCRIBE_VAD = os.getenv("TRANSCRIBE_VAD", "1") != "0"
+TRANSCRIBE_WORDS = os.getenv("TRANSCRIBE_WORDS", "0") == "1"
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+# Whisper's window; batched chunks never exceed it
+MAX_CHUNK_SECONDS = 30
+
+# Silence between clips when a batch is laid end to end
+BATCH_GAP_SECONDS = 0.5
+
+# Silence kept between speech regions so words don't run together
+SPEECH_GAP_SECONDS = 0.2
+
+# Recent batches kept for the RTF stats
+BATCH_HISTORY = 50
+
+# How many jobs to remember after they finish (for status lookups)
+FINISHED_JOB_HISTORY = 500
+
+
+class QueueFullError(Exception):
+    """Raised when the transcription queue cannot accept another clip"""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WHISPER MODEL
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Error recorded on clips that arrive while no model can be loaded
+WHISPER_UNAVAILABLE = "Whisper is not available on this server (faster-whisper missing or failed to load)"
+
+# Whisper model (lazy loaded, one per process)
+whisper_model = None
+_model_lock = threading.Lock()
+
+
+def get_whisper_model():
+    """Lazy load Whisper model"""
+    global whisper_model
+    if whisper_model is None:
+        with _model_lock:
+            if whisper_model is not None:
+                return whisper_model
+            try:
+                from faster_whisper import WhisperModel
+
+                # Split the cores between concurrent transcriptions. In thread
+                # mode one model serves every worker; in process mode each
+                # worker process loads its own copy.
+                shared = TRANSCRIBE_EXECUTOR != "process"
+                cpu_threads = max(1, CPU_COUNT // TRANSCRIBE_WORKERS)
+
+                # Use CPU since Railway may not have GPU
+                whisper_model = WhisperModel(
+                    WHISPER_MODEL,
+                    device="cpu",
+                    compute_type="int8",
+                    cpu_threads=cpu_threads,
+                    num_workers=TRANSCRIBE_WORKERS if shared else 1
+                )
+                print(f"[HEARSAY] Whisper model loaded ({WHISPER_MODEL}, cpu, {cpu_threads} threads)")
+            except ImportError:
+                print("[HEARSAY] Warning: faster-whisper not installed. Audio transcription disabled.")
+                return None
+            except Exception as e:
+                print(f"[HEARSAY] Warning: Failed to load Whisper: {e}")
+                return None
+    return whisper_model
+
+
+def warm_whisper() -> dict:
+    """
+    Load the model and run one short inference, so the first guest's clip
+    doesn't pay for the download and initialisation. Blocking - run it in
+    the pool's executor (TranscriptionPool.warm).
+    """
+    import importlib.util
+    if importlib.util.find_spec("faster_whisper") is None:
+        return {"available": False}
+
+    started = time.perf_counter()
+    model = get_whisper_model()
+    if model is None:
+        raise RuntimeError("Whisper model failed to load")
+    loaded = time.perf_counter()
+
+    import numpy as np
+
+    # A second of faint noise exercises VAD, the encoder and the decoder
+    audio = (np.random.default_rng(0).standard_normal(SAMPLE_RATE) * 0.01).astype(np.float32)
+    speech_regions(audio)
+    segments, _ = model.transcribe(audio, beam_size=1, vad_filter=False)
+    list(segments)
+    if TRANSCRIBE_BATCH_SIZE:
+        get_batched_pipeline()
+
+    return {
+        "available": True,
+        "model": WHISPER_MODEL,
+        "loadSeconds": round(loaded - started, 2),
+        "inferenceSeconds": round(time.perf_counter() - loaded, 2)
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SPEECH DETECTION
+# ─────────────────────────────────────────────────────────────────────────────
+
+def speech_regions(audio) -> List[Tuple[int, int]]:
+    """
+    Silero VAD speech regions as (start, end) sample offsets, none longer
+    than MAX_CHUNK_SECONDS. With TRANSCRIBE_VAD off, the whole clip.
+    """
+    if not TRANSCRIBE_VAD:
+        limit = MAX_CHUNK_SECONDS * SAMPLE_RATE
+        return [(start, min(start + limit, len(audio))) for start in range(0, len(audio), limit)]
+
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    regions = get_speech_timestamps(
+        audio, VadOptions(min_silence_duration_ms=500, max_speech_duration_s=MAX_CHUNK_SECONDS)
+    )
+    return [(region["start"], region["end"]) for region in regions]
+
+
+class OffsetMap:
+    """Maps times in speech-only audio back to times in the original clip"""
+
+    def __init__(self):
+        # (start in speech-only audio, start in clip, length) in seconds
+        self.spans: List[Tuple[float, float, float]] = []
+
+    def add(self, compact_start: float, original_start: float, length: float):
+        self.spans.append((compact_start, original_start, length))
+
+    def original(self, t: float) -> float:
+        for compact_start, original_start, length in reversed(self.spans):
+            if t >= compact_start:
+                return round(original_start + min(t - compact_start, length), 2)
+        return round(t, 2)
+
+
+def speech_only(audio, regions: List[Tuple[int, int]]):
+    """
+    Cut the speech regions out of `audio` and join them with a short gap.
+    Returns (speech audio, OffsetMap, speech samples).
+    """
+    import numpy as np
+
+    gap = np.zeros(int(SPEECH_GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    pieces = []
+    offsets = OffsetMap()
+    cursor = 0
+    speech = 0
+    for start, end in regions:
+        offsets.add(cursor / SAMPLE_RATE, start / SAMPLE_RATE, (end - start) / SAMPLE_RATE)
+        pieces += [audio[start:end], gap]
+        cursor += end - start + len(gap)
+        speech += end - start
+    if not pieces:
+        return np.zeros(0, dtype=np.float32), offsets, 0
+    return np.concatenate(pieces), offsets, speech
+
+
+def segment_record(segment, to_clip: Callable[[float], float]) -> dict:
+    """
+    A faster-whisper segment as stored in the catalog, with its times
+    (and its words' times) mapped onto the clip by `to_clip`.
+    """
+    record = {
+        "start": round(to_clip(segment.start), 2),
+        "end": round(to_clip(segment.end), 2),
+        "text": segment.text.strip(),
+        "avgLogprob": round(segment.avg_logprob, 3)
+    }
+    if segment.words:
+        record["words"] = [
+            {
+                "start": round(to_clip(word.start), 2),
+                "end": round(to_clip(word.end), 2),
+                "word": word.word.strip(),
+                "probability": round(word.probability, 3)
+            }
+            for word in segment.words
+        ]
+    return record
+
+
+def remap_record(record: dict, to_clip: Callable[[float], float]) -> dict:
+    """Map an already-built segment record's times (and its words') through `to_clip`"""
+    for item in [record, *record.get("words", [])]:
+        item["start"] = round(to_clip(item["start"]), 2)
+        item["end"] = round(to_clip(item["end"]), 2)
+    return record
+
+
+def load_clip_audio(audio_path: str):
+    """load_normalized, first extracting the clip from its session's archive if retention packed it away"""
+    if not os.path.exists(audio_path) and not normalized_path(audio_path).exists():
+        from retention import restore_archived
+        restore_archived(get_catalog(), audio_path)
+    return load_normalized(audio_path)
+
+
+def fail_without_model(clip_ids: List[int]):
+    """
+    No Whisper model in this process: mark the clips as failed, so they
+    show up as errors instead of staying pending (and blocking chapters)
+    until the next restart.
+    """
+    print("[HEARSAY] Whisper not available, failing transcription")
+    catalog = get_catalog()
+    for clip_id in clip_ids:
+        catalog.update_clip(clip_id, status="error", error=WHISPER_UNAVAILABLE)
+
+
+def transcribe_audio_file(audio_path: str, clip_id: int) -> str:
+    """
+    Transcribe one clip and record the result in the catalog.
+    Blocking - always called inside the pool's executor.
+
+    Returns the final clip status.
+    """
+    print(f"[HEARSAY] Transcribing: {audio_path}")
+
+    model = get_whisper_model()
+    if model is None:
+        fail_without_model([clip_id])
+        return "error"
+
+    try:
+        started = time.perf_counter()
+
+        # Decoded once to 16 kHz mono, then memory-mapped on every later pass
+        audio = load_clip_audio(audio_path)
+
+        # Only the speech goes to Whisper; offsets map it back onto the clip
+        speech, offsets, speech_samples = speech_only(audio, speech_regions(audio))
+
+        segments = []
+        language, language_prob = None, None
+        if speech_samples:
+            # Transcribe with Whisper
+            results, info = model.transcribe(
+                speech, beam_size=5, vad_filter=False, word_timestamps=TRANSCRIBE_WORDS
+            )
+            segments = [
+                segment_record(segment, offsets.original)
+                for segment in results
+                if segment.text.strip()
+            ]
+            language, language_prob = info.language, info.language_probability
+
+        # Combine all segments into transcript
+        full_transcript = " ".join(segment["text"] for segment in segments)
+        elapsed = time.perf_counter() - started
+
+        print(f"[HEARSAY] Transcription complete: {len(full_transcript)} chars")
+        print(f"[HEARSAY] Speech {speech_samples / SAMPLE_RATE:.1f}s of {len(audio) / SAMPLE_RATE:.1f}s, "
+              f"transcribed in {elapsed:.1f}s")
+        if language:
+            print(f"[HEARSAY] Language: {language}, Probability: {language_prob:.2f}")
+
+        get_catalog().update_clip(
+            clip_id,
+            status="transcribed",
+            transcript=full_transcript,
+            segments=segments,
+            language=language,
+            languageProb=language_prob,
+            audioSeconds=round(len(audio) / SAMPLE_RATE, 2),
+            speechSeconds=round(speech_samples / SAMPLE_RATE, 2),
+            transcribeSeconds=round(elapsed, 2)
+        )
+
+        return "transcribed"
+
+    except Exception as e:
+        print(f"[HEARSAY] Transcription error: {e}")
+
+        # Record the error
+        try:
+            get_catalog().update_clip(clip_id, status="error", error=str(e))
+        except Exception:
+            pass
+
+        return "error"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BATCHED TRANSCRIPTION
+# ─────────────────────────────────────────────────────────────────────────────
+
+batched_pipeline = None
+
+
+def get_batched_pipeline():
+    """Lazy load faster-whisper's BatchedInferencePipeline around the model"""
+    global batched_pipeline
+    model = get_whisper_model()
+    if model is None:
+        return None
+    if batched_pipeline is None:
+        with _model_lock:
+            if batched_pipeline is None:
+                from faster_whisper import BatchedInferencePipeline
+                batched_pipeline = BatchedInferencePipeline(model=model)
+    return batched_pipeline
+
+
+def speech_chunks(regions: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Speech regions merged into chunks of at most MAX_CHUNK_SECONDS"""
+    limit = MAX_CHUNK_SECONDS * SAMPLE_RATE
+    chunks: List[Tuple[int, int]] = []
+    for start, end in regions:
+        if chunks and end - chunks[-1][0] <= limit:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+def detect_language(speech) -> Tuple[str, float]:
+    """Whisper's language guess for one clip's speech (its first 30 seconds)"""
+    language, probability, _ = get_whisper_model().detect_language(speech)
+    return language, probability
+
+
+def transcribe_laid_out(pipeline, clips: List[dict], language: str) -> int:
+    """
+    Lay the clips' speech end to end (with a short gap) and transcribe it
+    in one batched call, forced to `language`. Each clip's segments are
+    mapped back onto the clip. Returns the number of chunks.
+    """
+    import numpy as np
+
+    gap = np.zeros(int(BATCH_GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    pieces, chunks = [], []
+    cursor = 0
+    for clip in clips:
+        speech = clip["speech_audio"]
+        clip["start"], clip["end"] = cursor, cursor + len(speech) + len(gap)
+        # The regions' positions in the speech-only audio
+        compact = [
+            (round(start * SAMPLE_RATE), round((start + length) * SAMPLE_RATE))
+            for start, _, length in clip["offsets"].spans
+        ]
+        chunks += [
+            {"start": (cursor + start) / SAMPLE_RATE, "end": (cursor + end) / SAMPLE_RATE}
+            for start, end in speech_chunks(compact)
+        ]
+        pieces += [speech, gap]
+        cursor += len(speech) + len(gap)
+
+    segments, _ = pipeline.transcribe(
+        np.concatenate(pieces),
+        language=language,
+        batch_size=TRANSCRIBE_BATCH_SIZE,
+        beam_size=5,
+        vad_filter=False,
+        word_timestamps=TRANSCRIBE_WORDS,
+        clip_timestamps=chunks
+    )
+    for segment in segments:
+        position = segment.start * SAMPLE_RATE
+        owner = next((c for c in clips if c["start"] <= position < c["end"]), None)
+        if owner is not None and segment.text.strip():
+            origin, offsets = owner["start"] / SAMPLE_RATE, owner["offsets"]
+            owner["segments"].append(segment_record(segment, lambda t: offsets.original(t - origin)))
+    return len(chunks)
+
+
+def transcribe_batch(items: List[Tuple[str, int]]) -> dict:
+    """
+    Transcribe several clips ((audio_path, clip_id) pairs) in one batched
+    pipeline call and record each result in the catalog. Blocking - always
+    called inside the pool's executor.
+
+    Each clip is cut down to its speech (speech_only, as for a single clip)
+    and its language detected. Clips of the same language are laid end to
+    end with a short gap, and speech_chunks over them are passed as
+    clip_timestamps - so only speech and the short gaps are decoded, chunks
+    from different clips share batches, and no clip is transcribed in
+    another clip's language. Returns per-clip statuses and the batch's
+    real-time factor.
+    """
+    started = time.perf_counter()
+    statuses: List[str] = ["error"] * len(items)
+
+    pipeline = get_batched_pipeline()
+    if pipeline is None:
+        fail_without_model([clip_id for _, clip_id in items])
+        return {"statuses": statuses, "clips": len(items), "chunks": 0,
+                "audioSeconds": 0.0, "seconds": 0.0, "rtf": None}
+
+    catalog = get_catalog()
+    clips = []
+    for index, (audio_path, clip_id) in enumerate(items):
+        try:
+            audio = load_clip_audio(audio_path)
+            speech, offsets, speech_samples = speech_only(audio, speech_regions(audio))
+            # Per clip: guests don't all speak the same language
+            language, language_prob = detect_language(speech) if speech_samples else (None, None)
+        except Exception as e:
+            print(f"[HEARSAY] Transcription error: {e}")
+            catalog.update_clip(clip_id, status="error", error=str(e))
+            statuses[index] = "error"
+            continue
+        clips.append({"index": index, "clipId": clip_id, "speech_audio": speech, "offsets": offsets,
+                      "audio": len(audio), "speech": speech_samples, "segments": [],
+                      "language": language, "languageProb": language_prob})
+
+    # One pipeline call per language, each forced to it
+    chunks = 0
+    for language in {clip["language"] for clip in clips if clip["language"]}:
+        chunks += transcribe_laid_out(pipeline, [clip for clip in clips if clip["language"] == language], language)
+
+    elapsed = time.perf_counter() - started
+    audio_samples = sum(clip["audio"] for clip in clips)
+    for clip in clips:
+        catalog.update_clip(
+            clip["clipId"],
+            status="transcribed",
+            transcript=" ".join(segment["text"] for segment in clip["segments"]),
+            segments=clip["segments"],
+            language=clip["language"],
+            languageProb=clip["languageProb"],
+            audioSeconds=round(clip["audio"] / SAMPLE_RATE, 2),
+            speechSeconds=round(clip["speech"] / SAMPLE_RATE, 2),
+            # The batch's compute, shared out by clip length
+            transcribeSeconds=round(elapsed * clip["audio"] / audio_samples, 2) if audio_samples else 0.0
+        )
+        statuses[clip["index"]] = "transcribed"
+
+    audio_seconds = audio_samples / SAMPLE_RATE
+    rtf = round(elapsed / audio_seconds, 3) if audio_seconds > 0 else None
+    print(f"[HEARSAY] Batch transcribed: {len(clips)} clip(s), {chunks} chunk(s), "
+          f"{audio_seconds:.1f}s audio in {elapsed:.1f}s (RTF {rtf})")
+    return {
+        "statuses": statuses,
+        "clips": len(items),
+        "chunks": chunks,
+        "audioSeconds": round(audio_seconds, 2),
+        "speechSeconds": round(sum(clip["speech"] for clip in clips) / SAMPLE_RATE, 2),
+        "seconds": round(elapsed, 2),
+        "rtf": rtf
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WORKER POOL
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TranscriptionPool:
+    """
+    Bounded queue of transcription jobs drained by `workers` asyncio tasks.
+    Each task runs one clip at a time in the executor, so at most `workers`
+    Whisper calls are in flight and at most `queue_size` clips are waiting.
+    With `batch_size`, each call is a batch of up to that many clips.
+    `on_finished(job)` is called on the event loop as each job ends, and
+    `on_started(job)` as a worker picks it up.
+    """
+
+    def __init__(
+        self,
+        workers: int = TRANSCRIBE_WORKERS,
+        queue_size: int = TRANSCRIBE_QUEUE_SIZE,
+        mode: str = TRANSCRIBE_EXECUTOR,
+        on_finished: Optional[Callable[[dict], None]] = None,
+        on_started: Optional[Callable[[dict], None]] = None,
+        batch_size: int = TRANSCRIBE_BATCH_SIZE,
+        batch_wait_ms: float = TRANSCRIBE_BATCH_WAIT_MS
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.mode = mode
+        self.on_finished = on_finished
+        self.on_started = on_started
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.batches: deque = deque(maxlen=BATCH_HISTORY)
+        self.jobs: Dict[str, dict] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._executor: Optional[Executor] = None
+        self._tasks: list = []
+
+    async def start(self):
+        """Create the executor and worker tasks (call on app startup)"""
+        if self._tasks:
+            return
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="whisper"
+            )
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        batching = f", batches of {self.batch_size}" if self.batch_size else ""
+        print(f"[HEARSAY] Transcription pool started: {self.workers} {self.mode} worker(s), queue {self.queue_size}{batching}")
+
+    async def stop(self):
+        """Cancel workers and shut the executor down (call on app shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run_blocking(self, fn, *args):
+        """
+        Run a blocking Whisper helper on the pool's executor. Used by live
+        transcription, which works on decoded audio rather than queued files.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def run_model(self, fn, *args):
+        """
+        Run a helper that needs the Whisper model. In-process that is just
+        the executor; the sidecar pool (sidecar.py) sends it to the process
+        holding the model.
+        """
+        return await self.run_blocking(fn, *args)
+
+    async def warm(self) -> dict:
+        """Warm the model in every executor worker (each process has its own)"""
+        copies = self.workers if self.mode == "process" else 1
+        results = await asyncio.gather(*(self.run_model(warm_whisper) for _ in range(copies)))
+        return results[0]
+
+    def is_full(self) -> bool:
+        return self._queue.full()
+
+    def _new_job(self, audio_path: str, clip_id: int, session_id: str, job_id: Optional[str] = None) -> dict:
+        return {
+            "jobId": job_id or str(uuid.uuid4()),
+            "sessionId": session_id,
+            "audioPath": audio_path,
+            "clipId": clip_id,
+            "status": "queued",
+            "queuedAt": datetime.utcnow().isoformat(),
+            "startedAt": None,
+            "finishedAt": None,
+            "error": None
+        }
+
+    def submit(self, audio_path: str, clip_id: int, session_id: str = "") -> dict:
+        """
+        Queue a clip for transcription. Never blocks.
+        Raises QueueFullError when the queue is at capacity.
+        """
+        job = self._new_job(audio_path, clip_id, session_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Transcription queue full ({self.queue_size} waiting)")
+
+        self.jobs[job["jobId"]] = job
+        return job
+
+    async def enqueue(self, audio_path: str, clip_id: int, session_id: str = "",
+                      job_id: Optional[str] = None) -> dict:
+        """
+        Queue a clip, waiting for room if the queue is full.
+        Used for work the server owes itself (restart recovery), not for uploads.
+        """
+        job = self._new_job(audio_path, clip_id, session_id, job_id)
+        self.jobs[job["jobId"]] = job
+        await self._queue.put(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        result = dict(job)
+        if job["status"] == "queued":
+            result["queuePosition"] = self._queue_position(job_id)
+        return result
+
+    def stats(self) -> dict:
+        running = sum(1 for j in self.jobs.values() if j["status"] == "running")
+        stats = {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "queueSize": self.queue_size,
+            "running": running,
+            "batchSize": self.batch_size
+        }
+        if self.batch_size:
+            rtfs = [b["rtf"] for b in self.batches if b["rtf"] is not None]
+            stats["batches"] = {
+                "recent": len(self.batches),
+                "clipsPerBatch": round(sum(b["clips"] for b in self.batches) / len(self.batches), 2) if self.batches else None,
+                "meanRtf": round(sum(rtfs) / len(rtfs), 3) if rtfs else None,
+                "last": self.batches[-1] if self.batches else None
+            }
+        return stats
+
+    def _queue_position(self, job_id: str) -> Optional[int]:
+        # asyncio.Queue keeps its items in a deque; peeking is safe on the loop
+        for position, job in enumerate(self._queue._queue):
+            if job["jobId"] == job_id:
+                return position + 1
+        return None
+
+    def _prune(self):
+        finished = [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] not in ("queued", "running")
+        ]
+        for job_id in finished[:-FINISHED_JOB_HISTORY]:
+            del self.jobs[job_id]
+
+    async def _next_batch(self) -> List[dict]:
+        """One job, or up to batch_size jobs gathered within batch_wait"""
+        batch = [await self._queue.get()]
+        if not self.batch_size:
+            return batch
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _transcribe(self, jobs: List[dict]):
+        loop = asyncio.get_running_loop()
+        if self.batch_size:
+            try:
+                result = await loop.run_in_executor(
+                    self._executor,
+                    transcribe_batch,
+                    [(job["audioPath"], job["clipId"]) for job in jobs]
+                )
+                self.batches.append({k: v for k, v in result.items() if k != "statuses"})
+                for job, status in zip(jobs, result["statuses"]):
+                    job["status"] = status
+                    job["batchRtf"] = result["rtf"]
+                return
+            except Exception as e:
+                # Fall back to one clip at a time
+                print(f"[HEARSAY] Batched transcription failed, retrying clips singly: {e}")
+
+        for job in jobs:
+            job["status"] = await loop.run_in_executor(
+                self._executor,
+                transcribe_audio_file,
+                job["audioPath"],
+                job["clipId"]
+            )
+
+    async def _worker(self, index: int):
+        while True:
+            jobs = await self._next_batch()
+            for job in jobs:
+                job["status"] = "running"
+                job["startedAt"] = datetime.utcnow().isoformat()
+                if self.on_started is not None:
+                    self.on_started(job)
+            try:
+                await self._transcribe(jobs)
+            except Exception as e:
+                print(f"[HEARSAY] Transcription worker {index} error: {e}")
+                for job in jobs:
+                    if job["status"] == "running":
+                        job["status"] = "error"
+                        job["error"] = str(e)
+            finally:
+                for job in jobs:
+                    job["finishedAt"] = datetime.utcnow().isoformat()
+                    self._queue.task_done()
+                self._prune()
+                if self.on_finished is not None:
+                    for job in jobs:
+                        try:
+                            self.on_finished(job)
+                        except Exception as e:
+                            print(f"[HEARSAY] Transcription callback error: {e}")
@@ -0,0 +1,213 @@
+"""
+HEARSAY Uploads - streaming and resumable audio uploads
+─────────────────────────────────────────────────────────────────────────────
+Audio never sits in memory as a whole file. One-shot uploads are copied from
+the multipart spool to disk in fixed-size chunks, and resumable uploads are
+appended chunk by chunk to a `.part` file.
+
+A resumable upload is identified by an uploadId. Its state lives next to the
+partial file in AUDIO_DIR/.uploads/, and the current offset is simply the size
+of the `.part` file, so an upload survives a server restart and a client can
+always ask where to resume.
+
+    POST /api/uploads                 → create, returns { uploadId, offset: 0 }
+    GET  /api/uploads/{upload_id}     → { offset, totalSize } (where to resume)
+    PUT  /api/uploads/{upload_id}     → append bytes at ?offset=N
+
+When the last byte arrives the clip is queued and the response is kept as
+a `<id>.done` record, so a client whose final response got lost gets the
+same clip back on retry instead of uploading it again. Partial uploads
+nobody has touched for UPLOAD_TTL_HOURS, and old completion records, are
+deleted.
+
+Environment Variables:
+    UPLOAD_CHUNK_SIZE - chunk size for disk copies and clients (default: 262144)
+    UPLOAD_TTL_HOURS  - drop abandoned partial uploads after this (default: 24)
+"""
+
+import os
+import json
+import time
+import shutil
+import uuid
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, Optional
+
+# Chunk size used for disk copies and suggested to clients
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 256 * 1024))
+UPLOAD_TTL_HOURS = float(os.getenv("UPLOAD_TTL_HOURS", 24))
+
+# How often creating an upload also sweeps out stale ones
+UPLOAD_EVICT_INTERVAL = 3600.0
+
+
+class UploadOffsetError(Exception):
+    """Raised when a chunk does not start at the current upload offset"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload offset mismatch, resume from byte {expected}")
+        self.expected = expected
+
+
+async def save_upload_file(source: BinaryIO, dest: Path) -> int:
+    """
+    Copy an uploaded file object to disk in chunks, off the event loop.
+    Returns the number of bytes written.
+    """
+    def _copy() -> int:
+        source.seek(0)
+        with open(dest, "wb") as f:
+            shutil.copyfileobj(source, f, UPLOAD_CHUNK_SIZE)
+            return f.tell()
+
+    return await asyncio.to_thread(_copy)
+
+
+class ResumableUploadStore:
+    """
+    Tracks in-progress resumable uploads on disk.
+    Each upload has a `<id>.json` state file and a `<id>.part` data file,
+    and a finished one a `<id>.done` record of its result.
+    """
+
+    def __init__(self, root: Path, ttl_hours: float = UPLOAD_TTL_HOURS):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_hours * 3600
+        # One lock per upload so two retries of the same chunk can't interleave
+        self._locks: dict = {}
+        self._evicted_at = float("-inf")
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.json"
+
+    def _done_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.done"
+
+    def part_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.part"
+
+    def create(self, total_size: int, fields: dict) -> dict:
+        if time.monotonic() - self._evicted_at > UPLOAD_EVICT_INTERVAL:
+            self.evict()
+        upload_id = uuid.uuid4().hex
+        state = {
+            "uploadId": upload_id,
+            "totalSize": total_size,
+            "fields": fields
+        }
+        with open(self._state_path(upload_id), "w") as f:
+            json.dump(state, f)
+        self.part_path(upload_id).touch()
+        return {**state, "offset": 0}
+
+    def get(self, upload_id: str) -> Optional[dict]:
+        # uploadIds are hex; refuse anything that could escape the directory
+        if not upload_id.isalnum():
+            return None
+        try:
+            with open(self._state_path(upload_id), "r") as f:
+                state = json.load(f)
+            state["offset"] = self.part_path(upload_id).stat().st_size
+        except FileNotFoundError:
+            return None
+        return state
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        """
+        Append a request body at `offset`. The body is written as it streams
+        in, so memory stays at one network chunk regardless of upload size.
+        Raises UploadOffsetError if `offset` is not where the file ends.
+        """
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            state = self.get(upload_id)
+            if state is None:
+                raise KeyError(upload_id)
+            if offset != state["offset"]:
+                raise UploadOffsetError(state["offset"])
+
+            f = await asyncio.to_thread(open, self.part_path(upload_id), "ab")
+            try:
+                written = offset
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if written + len(chunk) > state["totalSize"]:
+                        raise ValueError("Chunk extends past declared upload size")
+                    await asyncio.to_thread(f.write, chunk)
+                    written += len(chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+        state["offset"] = written
+        return state
+
+    def complete(self, upload_id: str, dest: Path):
+        """Move a finished upload's bytes into place"""
+        os.replace(self.part_path(upload_id), dest)
+
+    async def finalize(self, upload_id: str, consume: Callable[[dict], dict]) -> dict:
+        """
+        Turn a fully received upload into its result exactly once.
+        `consume(state)` (synchronous) takes the bytes and returns the
+        result, which is recorded with finish(). Runs under the upload's
+        lock, so concurrent final PUTs get the first one's result; if
+        `consume` raises, the upload is left as it was.
+        """
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            result = self.finished(upload_id)
+            if result is not None:
+                return result
+            state = self.get(upload_id)
+            if state is None:
+                raise KeyError(upload_id)
+            result = consume(state)
+            self.finish(upload_id, result)
+            return result
+
+    def finish(self, upload_id: str, result: dict):
+        """Record what the finished upload returned and forget its state"""
+        with open(self._done_path(upload_id), "w") as f:
+            json.dump(result, f)
+        self._state_path(upload_id).unlink(missing_ok=True)
+        self.part_path(upload_id).unlink(missing_ok=True)
+        self._locks.pop(upload_id, None)
+
+    def finished(self, upload_id: str) -> Optional[dict]:
+        """The result of a finished upload, or None"""
+        if not upload_id.isalnum():
+            return None
+        try:
+            with open(self._done_path(upload_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def evict(self) -> int:
+        """Delete uploads (partial or finished) idle for longer than the TTL"""
+        self._evicted_at = time.monotonic()
+        cutoff = time.time() - self.ttl_seconds
+        newest: dict = {}
+        for path in self.root.iterdir():
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            upload_id = path.name.split(".")[0]
+            newest[upload_id] = max(newest.get(upload_id, 0), mtime)
+
+        removed = 0
+        for upload_id, mtime in newest.items():
+            lock = self._locks.get(upload_id)
+            if mtime >= cutoff or (lock is not None and lock.locked()):
+                continue
+            for path in (self._state_path(upload_id), self.part_path(upload_id), self._done_path(upload_id)):
+                path.unlink(missing_ok=True)
+            self._locks.pop(upload_id, None)
+            removed += 1
+        if removed:
+            print(f"[HEARSAY] Removed {removed} stale resumable upload(s)")
+        return removed
@@ -0,0 +1,118 @@
+"""
+HEARSAY Warmup - ready means warm
+─────────────────────────────────────────────────────────────────────────────
+Startup only opens what requests can't work without (catalog, pools) and
+returns; everything slow happens in the background afterwards: loading the
+Whisper model and running one dummy inference, checking the Writing Engine
+prompt, opening the first upstream connections.
+
+/api/health answers as soon as the process is up (liveness). /api/ready
+answers 200 only once every required check has passed and 503 until then,
+so Railway's healthcheck - and any load balancer - sends guests only to
+warm instances.
+
+A check that fails is retried after WARMUP_RETRY_SECONDS. A check whose
+feature is switched off (faster-whisper not installed) counts as done.
+
+Environment Variables:
+    WARMUP_RETRY_SECONDS - wait before retrying a failed check, 0 = don't (default: 15)
+"""
+
+import os
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 15))
+
+# Retries per check before it stays failed
+WARMUP_MAX_ATTEMPTS = 5
+
+
+class WarmupUnavailable(Exception):
+    """The checked feature is switched off here - nothing to wait for"""
+
+
+class Check:
+    """One thing that has to be warm before we take traffic"""
+
+    def __init__(self, name: str, fn: Callable[[], Awaitable[Optional[dict]]], required: bool):
+        self.name = name
+        self.fn = fn
+        self.required = required
+        self.status = "pending"
+        self.attempts = 0
+        self.seconds: Optional[float] = None
+        self.detail: Optional[dict] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("ready", "unavailable")
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "attempts": self.attempts,
+            "seconds": self.seconds,
+            "detail": self.detail,
+            "error": self.error
+        }
+
+
+class Warmup:
+    """Background startup checks and the readiness they add up to"""
+
+    def __init__(self, retry_seconds: float = WARMUP_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self.checks: Dict[str, Check] = {}
+        self.started = time.monotonic()
+        self.ready_after: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], Awaitable[Optional[dict]]], required: bool = True):
+        """Register `fn` (an async callable returning detail or raising) under `name`"""
+        self.checks[name] = Check(name, fn, required)
+
+    async def run(self):
+        """Run every check concurrently (call in the background on startup)"""
+        await asyncio.gather(*(self._run_check(check) for check in self.checks.values()))
+
+    async def _run_check(self, check: Check):
+        while True:
+            check.status = "warming"
+            check.attempts += 1
+            started = time.perf_counter()
+            try:
+                check.detail = await check.fn()
+                check.status = "ready"
+                check.error = None
+            except WarmupUnavailable as e:
+                check.status = "unavailable"
+                check.error = str(e) or None
+            except Exception as e:
+                check.status = "failed"
+                check.error = f"{type(e).__name__}: {e}"
+            check.seconds = round(time.perf_counter() - started, 2)
+            print(f"[HEARSAY] Warmup {check.name}: {check.status} in {check.seconds}s"
+                  + (f" ({check.error})" if check.error else ""))
+
+            if check.status != "failed" or not self.retry_seconds or check.attempts >= WARMUP_MAX_ATTEMPTS:
+                break
+            await asyncio.sleep(self.retry_seconds)
+
+        if self.ready and self.ready_after is None:
+            self.ready_after = round(time.monotonic() - self.started, 2)
+            print(f"[HEARSAY] Ready after {self.ready_after}s")
+
+    @property
+    def ready(self) -> bool:
+        return all(check.done for check in self.checks.values() if check.required)
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "readyAfterSeconds": self.ready_after,
+            "uptimeSeconds": round(time.monotonic() - self.started, 1),
+            "checks": {name: check.report() for name, check in self.checks.items()}
+        }
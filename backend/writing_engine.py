@@ -0,0 +1,637 @@
+"""
+HEARSAY Writing Engine - prompts and Claude calls
+─────────────────────────────────────────────────────────────────────────────
+Builds the chapter prompts for both Writing Engine paths (client-supplied
+Simli transcripts, and Whisper transcripts gathered from audio) and talks to
+the Anthropic Messages API, either in one response or as a stream of text
+deltas.
+
+The system prompt and the previous-chapters continuity block carry
+Anthropic prompt-cache breakpoints, so back-to-back chapters only pay full
+input price for tonight's transcripts. Finished chapters can also be kept in
+a local ChapterCache (chapter_cache.py); identical requests are then answered
+without calling Claude, and concurrent identical requests share one call.
+
+Long sessions switch to map-reduce above WRITING_ENGINE_MAP_REDUCE_TOKENS
+(estimated prompt tokens): each conversation is first condensed into scene
+notes by its own call - run concurrently, up to WRITING_ENGINE_MAP_CONCURRENCY
+at a time - and the chapter is then written from the notes. Wall-clock time
+follows the longest conversation instead of the sum, and a long night no
+longer overflows the context window. Scene notes go through the same cache,
+so regenerating a chapter reuses them.
+
+Continuity across a reader's nights comes from a rolling "story so far"
+summary (continuity.py) plus the closing lines of the last chapter, instead
+of the last two chapters verbatim. Client-supplied previousChapters are
+only sent as-is until the reader has a summary.
+
+The HTTP endpoints live in server.py; everything here takes the pooled
+Anthropic client as an argument, and a Ticket from the Anthropic scheduler
+(anthropic_scheduler.py) that queues, rate-limits and retries the call.
+
+Environment Variables:
+    WRITING_ENGINE_MODEL             - Claude model for chapters (default: claude-opus-4-20250514)
+    WRITING_ENGINE_MAP_REDUCE_TOKENS - estimated prompt tokens above which map-reduce
+                                       is used, 0 = never (default: 40000)
+    WRITING_ENGINE_MAP_CONCURRENCY   - scene-note calls in flight at once (default: 4)
+"""
+
+import os
+import json
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+import httpx
+
+from chapter_cache import ChapterCache, cache_key
+from anthropic_scheduler import Ticket
+import metrics
+
+WRITING_ENGINE_MODEL = os.getenv("WRITING_ENGINE_MODEL", "claude-opus-4-20250514")
+MAX_TOKENS = 8192
+WRITING_ENGINE_MAP_REDUCE_TOKENS = int(os.getenv("WRITING_ENGINE_MAP_REDUCE_TOKENS", 40000))
+WRITING_ENGINE_MAP_CONCURRENCY = max(1, int(os.getenv("WRITING_ENGINE_MAP_CONCURRENCY", 4)))
+
+# Scene notes are a condensed working document, not prose
+SCENE_NOTES_MAX_TOKENS = 2048
+
+# Rough English ratio, good enough to decide when to map-reduce
+CHARS_PER_TOKEN = 4
+
+# Target word counts for REQUESTED LENGTH
+CHAPTER_WORDS = {"short": "1000", "medium": "2000", "long": "3500"}
+
+
+class WritingEngineError(Exception):
+    """Anthropic call failed; status_code is what the endpoint should return"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[str] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PROMPTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def format_transcripts(transcripts: list) -> str:
+    """Format client-supplied conversations (Simli transcripts) for the prompt"""
+    formatted_transcripts = []
+    for conv in transcripts:
+        formatted = f"\n--- Conversation with {conv.character}"
+        if conv.role:
+            formatted += f" ({conv.role})"
+        formatted += f" ---\nTime: {conv.timestamp}\n\n"
+
+        # Handle transcript format (could be list or string)
+        if isinstance(conv.transcript, list):
+            for entry in conv.transcript:
+                if isinstance(entry, dict):
+                    speaker = entry.get('speaker', 'unknown')
+                    text = entry.get('text', '')
+                else:
+                    speaker = entry.speaker
+                    text = entry.text
+                formatted += f"[{speaker}]: {text}\n"
+        else:
+            # Already a string
+            formatted += conv.transcript
+
+        formatted_transcripts.append(formatted)
+
+    return "\n".join(formatted_transcripts)
+
+
+def build_chapter_message(
+    session_id: str,
+    transcripts: list,
+    previous_chapters: List[str],
+    chapter_length: str,
+    scene_notes: Optional[List[str]] = None,
+    continuity: Optional[dict] = None
+) -> Union[str, List[dict]]:
+    """
+    User message for /api/writing-engine/generate. With continuity (a story
+    summary) or previous chapters this is two content blocks: the continuity
+    block (cache breakpoint, it repeats across a night's chapters) followed
+    by tonight's session. With scene_notes (map-reduce) the notes stand in
+    for the transcripts.
+    """
+    words = CHAPTER_WORDS.get(chapter_length, CHAPTER_WORDS["long"])
+    if scene_notes is None:
+        source = "conversation transcripts"
+        transcripts_text = format_transcripts(transcripts)
+        dialogue = "- Preserve actual dialogue (may polish for flow)"
+    else:
+        source = "scene notes (one per conversation)"
+        transcripts_text = format_scene_notes(transcript_scenes(transcripts), scene_notes)
+        dialogue = "- Preserve the dialogue quoted in the notes (may polish for flow)"
+
+    user_message = f"""Please write a chapter based on the following {source} from tonight's session.
+
+SESSION: {session_id}
+CONVERSATION COUNT: {len(transcripts)}
+REQUESTED LENGTH: {chapter_length} (~{words} words)
+
+{transcripts_text}
+
+---
+
+Write the chapter now. Remember:
+{dialogue}
+- Add setting, interiority, sensory detail
+- Weave multiple conversations into one coherent chapter
+- Ground us in Room 412, the peephole, the hallway
+- End with an image, not a cliffhanger or closure"""
+
+    return with_continuity(user_message, continuity_block(continuity, previous_chapters))
+
+
+def continuity_block(continuity: Optional[dict], previous_chapters: List[str] = ()) -> Optional[str]:
+    """
+    The text that keeps a chapter consistent with the reader's earlier
+    nights: the story summary and the last chapter's closing lines, or -
+    before the reader has a summary - the last two chapters verbatim.
+    """
+    if continuity:
+        return f"""THE STORY SO FAR (summary of {continuity['chapters']} earlier chapter(s), for continuity):
+
+{continuity['summary']}
+
+HOW THE LAST CHAPTER ENDED:
+
+{continuity['tail']}
+
+---
+
+NOW, for tonight's session:
+
+"""
+
+    if previous_chapters:
+        prev_chapters_text = "\n\n---\n\n".join(previous_chapters[-2:])  # Last 2 chapters
+        return f"""PREVIOUS CHAPTERS (for continuity):
+
+{prev_chapters_text}
+
+---
+
+NOW, for tonight's session:
+
+"""
+
+    return None
+
+
+def with_continuity(user_message: str, continuity: Optional[str]) -> Union[str, List[dict]]:
+    if continuity is None:
+        return user_message
+    return [
+        {"type": "text", "text": continuity, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": user_message}
+    ]
+
+
+def format_audio_conversations(conversations: list) -> str:
+    """Format Whisper transcripts (occupant's side only) for the prompt"""
+    formatted_transcripts = []
+    for conv in conversations:
+        formatted = f"\n--- Conversation with {conv['character']} ---\n"
+        formatted += f"Time: {conv['timestamp']}\n\n"
+
+        # Format as dialogue (user is speaking to character)
+        # Note: We only have user's speech from Whisper
+        formatted += f"Occupant of 412: {conv['transcript']}\n"
+        formatted += f"[{conv['character']} responds - content inferred from conversation flow]\n"
+
+        formatted_transcripts.append(formatted)
+
+    return "\n".join(formatted_transcripts)
+
+
+def build_audio_chapter_message(
+    session_id: str,
+    conversations: list,
+    scene_notes: Optional[List[str]] = None,
+    continuity: Optional[dict] = None
+) -> Union[str, List[dict]]:
+    """
+    User message for chapters generated from audio transcripts (or their
+    scene notes), after the continuity block when the reader has a story
+    summary.
+    """
+    if scene_notes is None:
+        source = "conversation transcripts"
+        transcripts_text = format_audio_conversations(conversations)
+    else:
+        source = "scene notes (one per conversation)"
+        transcripts_text = format_scene_notes(audio_scenes(conversations), scene_notes)
+
+    user_message = f"""Please write a chapter based on the following {source} from tonight's session.
+
+Note: These transcripts capture the occupant's side of the conversation (what they said aloud).
+The character's responses should be inferred from the flow and context of the occupant's words.
+
+SESSION: {session_id}
+CONVERSATION COUNT: {len(conversations)}
+
+{transcripts_text}
+
+---
+
+Write the chapter now. Remember:
+- The transcripts show what the occupant said; imagine what the characters said in response
+- Add setting, interiority, sensory detail
+- Weave multiple conversations into one coherent chapter
+- Ground us in Room 412, the peephole, the hallway
+- End with an image, not a cliffhanger or closure"""
+
+    return with_continuity(user_message, continuity_block(continuity))
+
+
+def build_summary_message(summary: Optional[str], chapters: List[str]) -> str:
+    """User message that folds new chapters into the rolling story summary"""
+    earlier = summary or "(None yet - these are the first chapters.)"
+    chapters_text = "\n\n---\n\n".join(chapters)
+    return f"""Keep the STORY SO FAR for one reader's nights at Room 412. Future chapters will be written from this summary instead of the full text, so it must carry everything they need to stay consistent.
+
+CURRENT SUMMARY:
+
+{earlier}
+
+NEW CHAPTER(S):
+
+{chapters_text}
+
+---
+
+Write the updated summary now, under these three headings:
+CHARACTERS MET - who the occupant has spoken to, what each revealed, how things were left
+OPEN THREADS - unanswered questions, promises, recurring images and motifs
+ROOM 412 - the state of the room, the hallway, and the occupant
+Keep every name and concrete detail a later chapter might call back to. No more than about 600 words. Return only the summary."""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MAP-REDUCE (long sessions)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def transcript_scenes(transcripts: list) -> List[dict]:
+    """One scene per client-supplied conversation: {heading, text, occupantOnly}"""
+    return [
+        {
+            "heading": f"{conv.character}{f' ({conv.role})' if conv.role else ''} - {conv.timestamp}",
+            "text": format_transcripts([conv]),
+            "occupantOnly": False
+        }
+        for conv in transcripts
+    ]
+
+
+def audio_scenes(conversations: list) -> List[dict]:
+    """One scene per Whisper-transcribed conversation"""
+    return [
+        {
+            "heading": f"{conv['character']} - {conv['timestamp']}",
+            "text": format_audio_conversations([conv]),
+            "occupantOnly": True
+        }
+        for conv in conversations
+    ]
+
+
+def format_scene_notes(scenes: List[dict], notes: List[str]) -> str:
+    return "\n".join(
+        f"\n--- Scene notes: conversation with {scene['heading']} ---\n\n{note}\n"
+        for scene, note in zip(scenes, notes)
+    )
+
+
+def build_scene_notes_message(session_id: str, scene: dict, index: int, total: int) -> str:
+    """Map-stage user message: condense one conversation into scene notes"""
+    occupant_note = (
+        "\nNote: The transcript captures only the occupant's side; infer what the character said.\n"
+        if scene["occupantOnly"] else ""
+    )
+    return f"""Tonight's session is too long to write from in one pass, so each conversation is first condensed into scene notes. The chapter will be written from all the notes together.
+
+SESSION: {session_id}
+CONVERSATION: {index + 1} of {total}
+{occupant_note}
+{scene["text"]}
+
+---
+
+Write the scene notes for this conversation now:
+- The beats of the conversation, in order
+- Lines of dialogue worth keeping, quoted verbatim
+- What the occupant revealed, and what the character wanted
+- Mood, sensory details, anything that should echo elsewhere in the chapter
+Notes, not prose. No more than about 600 words."""
+
+
+def estimate_tokens(content: Union[str, List[dict]]) -> int:
+    if isinstance(content, list):
+        content = "".join(block.get("text", "") for block in content)
+    return len(content) // CHARS_PER_TOKEN
+
+
+class ChapterPlan:
+    """
+    How a chapter's prompt gets made: directly, or - above the token
+    threshold - from scene notes drafted concurrently (map), then woven
+    into the chapter by the usual call (reduce).
+
+    `build(notes)` returns the chapter message; notes=None means the full
+    transcripts.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        system: str,
+        build: Callable[[Optional[List[str]]], "UserContent"],
+        scenes: List[dict]
+    ):
+        self.session_id = session_id
+        self.system = system
+        self.build = build
+        self.scenes = scenes
+        self.full_message = build(None)
+        self.estimated_tokens = estimate_tokens(system) + estimate_tokens(self.full_message)
+
+    @property
+    def map_reduce(self) -> bool:
+        return (
+            WRITING_ENGINE_MAP_REDUCE_TOKENS > 0
+            and self.estimated_tokens > WRITING_ENGINE_MAP_REDUCE_TOKENS
+            and bool(self.scenes)
+        )
+
+    async def message(
+        self,
+        client: httpx.AsyncClient,
+        timeout: float = None,
+        cache: Optional[ChapterCache] = None,
+        on_note: Optional[Callable[[int, int], None]] = None,
+        ticket: Optional[Ticket] = None
+    ) -> "UserContent":
+        """
+        The chapter message to send. In map-reduce mode this first drafts
+        every scene's notes; on_note(done, total) is called as each lands.
+        Raises WritingEngineError if a scene-notes call fails.
+        """
+        if not self.map_reduce:
+            return self.full_message
+
+        total = len(self.scenes)
+        print(f"[HEARSAY] Map-reduce chapter for {self.session_id}: ~{self.estimated_tokens} tokens, "
+              f"{total} scene(s), {WRITING_ENGINE_MAP_CONCURRENCY} at a time")
+        semaphore = asyncio.Semaphore(WRITING_ENGINE_MAP_CONCURRENCY)
+        done = 0
+
+        async def draft(index: int, scene: dict) -> str:
+            nonlocal done
+            async with semaphore:
+                result = await generate(
+                    client,
+                    self.system,
+                    build_scene_notes_message(self.session_id, scene, index, total),
+                    timeout=timeout,
+                    cache=cache,
+                    max_tokens=SCENE_NOTES_MAX_TOKENS,
+                    ticket=ticket
+                )
+            done += 1
+            if on_note is not None:
+                on_note(done, total)
+            return result["text"]
+
+        notes = await asyncio.gather(*(draft(i, scene) for i, scene in enumerate(self.scenes)))
+        reduced = self.build(list(notes))
+        print(f"[HEARSAY] Scene notes ready for {self.session_id}: "
+              f"~{estimate_tokens(reduced)} tokens (from ~{estimate_tokens(self.full_message)})")
+        return reduced
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ANTHROPIC CALLS
+# ─────────────────────────────────────────────────────────────────────────────
+
+UserContent = Union[str, List[dict]]
+
+# Identical generations already waiting on Claude, by cache key
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def messages_payload(system: str, user_message: UserContent, stream: bool = False,
+                     max_tokens: int = MAX_TOKENS) -> dict:
+    payload = {
+        "model": WRITING_ENGINE_MODEL,
+        "max_tokens": max_tokens,
+        # Cache breakpoint: the Writing Engine prompt is identical on every call
+        "system": [
+            {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+        ],
+        "messages": [
+            {"role": "user", "content": user_message}
+        ]
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def extract_text(data: dict) -> str:
+    """Concatenate the text blocks of a Messages API response"""
+    chapter_content = ""
+    if data.get("content"):
+        for block in data["content"]:
+            if block.get("type") == "text":
+                chapter_content += block.get("text", "")
+    return chapter_content
+
+
+def _cache_key(system: str, user_message: UserContent, max_tokens: int = MAX_TOKENS) -> str:
+    return cache_key(system, f"{WRITING_ENGINE_MODEL}:{max_tokens}", user_message)
+
+
+async def generate(
+    client: httpx.AsyncClient,
+    system: str,
+    user_message: UserContent,
+    timeout: float = None,
+    cache: Optional[ChapterCache] = None,
+    max_tokens: int = MAX_TOKENS,
+    ticket: Optional[Ticket] = None
+) -> dict:
+    """
+    One Messages API call. Returns {"text", "usage", "cached"}.
+    With a ChapterCache, a stored chapter is returned without calling Claude
+    and concurrent identical requests wait on the same call. With a Ticket
+    the call waits its turn in the scheduler and is retried on 429/5xx.
+    Raises WritingEngineError on an API error or an empty response.
+    """
+    if cache is None:
+        return {**await _scheduled(client, system, user_message, timeout, max_tokens, ticket), "cached": False}
+
+    key = _cache_key(system, user_message, max_tokens)
+    hit = cache.get(key)
+    if hit is not None:
+        print(f"[HEARSAY] Chapter cache hit ({key[:12]})")
+        return {**hit, "cached": True}
+
+    pending = _in_flight.get(key)
+    if pending is not None:
+        return {**await asyncio.shield(pending), "cached": True}
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        result = await _scheduled(client, system, user_message, timeout, max_tokens, ticket)
+        cache.put(key, result["text"], result["usage"])
+        future.set_result(result)
+        return {**result, "cached": False}
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved when nobody else was waiting
+        raise
+    finally:
+        _in_flight.pop(key, None)
+
+
+async def _scheduled(client: httpx.AsyncClient, system: str, user_message: UserContent,
+                     timeout: float, max_tokens: int, ticket: Optional[Ticket]) -> dict:
+    if ticket is None:
+        return await _generate(client, system, user_message, timeout, max_tokens)
+    tokens = estimate_tokens(system) + estimate_tokens(user_message)
+    return await ticket.call(
+        lambda: _generate(client, system, user_message, timeout, max_tokens, ticket), tokens
+    )
+
+
+async def _generate(client: httpx.AsyncClient, system: str, user_message: UserContent,
+                    timeout: float = None, max_tokens: int = MAX_TOKENS,
+                    ticket: Optional[Ticket] = None) -> dict:
+    kwargs = {"timeout": timeout} if timeout else {}
+    payload = messages_payload(system, user_message, max_tokens=max_tokens)
+    response = await client.post("/v1/messages", json=payload, **kwargs)
+    if ticket is not None:
+        ticket.scheduler.observe(response.headers)
+
+    if response.status_code != 200:
+        print(f"[HEARSAY] Anthropic API error: {response.status_code}")
+        print(f"[HEARSAY] Response: {response.text}")
+        raise WritingEngineError(response.status_code, f"Anthropic API error: {response.text}",
+                                 response.headers.get("retry-after"))
+
+    data = response.json()
+    metrics.record_usage(data.get("usage"))
+    text = extract_text(data)
+    if not text:
+        raise WritingEngineError(500, "No chapter content in Anthropic response")
+
+    return {"text": text, "usage": data.get("usage", {})}
+
+
+async def stream(
+    client: httpx.AsyncClient,
+    system: str,
+    user_message: UserContent,
+    usage: dict,
+    cache: Optional[ChapterCache] = None,
+    ticket: Optional[Ticket] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming Messages API call. Yields text deltas as Claude writes them
+    and fills `usage` (input/output tokens) as the counts arrive.
+    With a ChapterCache, a stored chapter is yielded in one piece and a
+    completed stream is stored. With a Ticket the stream holds a scheduler
+    slot and is retried - only until the first delta has been sent.
+    Raises WritingEngineError on an API error.
+    """
+    key = _cache_key(system, user_message) if cache is not None else None
+    if key is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            print(f"[HEARSAY] Chapter cache hit ({key[:12]})")
+            usage.update(hit["usage"])
+            usage["cached"] = True
+            yield hit["text"]
+            return
+
+    parts: List[str] = []
+    async for text in _scheduled_stream(client, system, user_message, usage, ticket):
+        parts.append(text)
+        yield text
+
+    if key is not None and parts:
+        cache.put(key, "".join(parts), usage)
+
+
+async def _scheduled_stream(client: httpx.AsyncClient, system: str, user_message: UserContent,
+                            usage: dict, ticket: Optional[Ticket]) -> AsyncIterator[str]:
+    if ticket is None:
+        async for text in _stream(client, system, user_message, usage):
+            yield text
+        return
+
+    tokens = estimate_tokens(system) + estimate_tokens(user_message)
+    attempt = 0
+    while True:
+        started = False
+        try:
+            async with ticket.slot(tokens):
+                async for text in _stream(client, system, user_message, usage, ticket):
+                    started = True
+                    yield text
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Text already shown to the reader can't be taken back
+            delay = None if started else ticket.retry_delay(e, attempt)
+            if delay is None:
+                raise
+            print(f"[HEARSAY] Anthropic stream failed ({getattr(e, 'status_code', type(e).__name__)}), "
+                  f"retry {attempt + 1} in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+async def _stream(client: httpx.AsyncClient, system: str, user_message: UserContent, usage: dict,
+                  ticket: Optional[Ticket] = None) -> AsyncIterator[str]:
+    payload = messages_payload(system, user_message, stream=True)
+    async with client.stream("POST", "/v1/messages", json=payload) as response:
+        if ticket is not None:
+            ticket.scheduler.observe(response.headers)
+        if response.status_code != 200:
+            body = (await response.aread()).decode(errors="replace")
+            print(f"[HEARSAY] Anthropic API error: {response.status_code}")
+            print(f"[HEARSAY] Response: {body}")
+            raise WritingEngineError(response.status_code, f"Anthropic API error: {body}",
+                                     response.headers.get("retry-after"))
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:].strip())
+            kind = event.get("type")
+
+            if kind == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                yield event["delta"]["text"]
+            elif kind == "message_start":
+                usage.update(event["message"].get("usage", {}))
+            elif kind == "message_delta":
+                usage.update(event.get("usage", {}))
+            elif kind == "error":
+                error = event.get("error", {})
+                raise WritingEngineError(529 if error.get("type") == "overloaded_error" else 500,
+                                         f"Anthropic stream error: {error.get('message', error)}")
+
+    metrics.record_usage(usage)
@@ -0,0 +1,123 @@
+/**
+ * HEARSAY Session Events
+ * ─────────────────────────────────────────────────────────────────────────────
+ * One EventSource per session on /api/events/{sessionId}. The server pushes
+ * transcription-complete, simli-transcript-ready, chapter-ready (and the
+ * matching failure events) as they happen, so nothing has to poll.
+ *
+ * EventSource reconnects on its own and sends Last-Event-ID, so events
+ * published while the connection was down are replayed.
+ */
+
+const EVENT_TYPES = [
+    'state',
+    'transcription-complete',
+    'simli-transcript-ready',
+    'simli-transcript-unavailable',
+    'chapter-ready',
+    'chapter-error'
+];
+
+export class SessionEvents {
+    constructor() {
+        this.source = null;
+        this.sessionId = null;
+        this.listeners = new Map();   // event type → Set of handlers
+        this.lastState = null;
+    }
+
+    /**
+     * Open (or switch) the event channel for a session
+     * @param {string} sessionId - Hearsay session ID
+     */
+    connect(sessionId) {
+        if (this.source && this.sessionId === sessionId) {
+            return;
+        }
+        this.close();
+
+        this.sessionId = sessionId;
+        this.source = new EventSource(`/api/events/${encodeURIComponent(sessionId)}`);
+
+        for (const type of EVENT_TYPES) {
+            this.source.addEventListener(type, (e) => {
+                const data = JSON.parse(e.data);
+                if (type === 'state') {
+                    this.lastState = data;
+                }
+                console.log(`[Events] ${type}`, data);
+                this.emit(type, data);
+            });
+        }
+
+        this.source.onerror = () => {
+            console.warn('[Events] Connection lost, browser will reconnect');
+        };
+    }
+
+    close() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+
+    /**
+     * Subscribe to an event type. Returns an unsubscribe function.
+     */
+    on(type, handler) {
+        if (!this.listeners.has(type)) {
+            this.listeners.set(type, new Set());
+        }
+        this.listeners.get(type).add(handler);
+        return () => this.listeners.get(type).delete(handler);
+    }
+
+    emit(type, data) {
+        for (const handler of this.listeners.get(type) || []) {
+            try {
+                handler(data);
+            } catch (error) {
+                console.error(`[Events] ${type} handler error:`, error);
+            }
+        }
+        window.dispatchEvent(new CustomEvent(`hearsay-${type}`, { detail: data }));
+    }
+
+    /**
+     * Resolve with the first event (of any of `types`) that matches
+     * `predicate`, or null after `timeoutMs`.
+     * @param {string[]} types - Event types to wait for
+     * @param {Function} predicate - (type, data) => boolean
+     * @param {number} timeoutMs - Give up after this long
+     */
+    waitFor(types, predicate = () => true, timeoutMs = 60000) {
+        return new Promise((resolve) => {
+            const unsubscribers = [];
+            const done = (result) => {
+                clearTimeout(timer);
+                unsubscribers.forEach(off => off());
+                resolve(result);
+            };
+            const timer = setTimeout(() => done(null), timeoutMs);
+
+            for (const type of types) {
+                unsubscribers.push(this.on(type, (data) => {
+                    if (predicate(type, data)) {
+                        done({ type, data });
+                    }
+                }));
+            }
+        });
+    }
+}
+
+// Singleton instance
+let sessionEventsInstance = null;
+
+export function getSessionEvents() {
+    if (!sessionEventsInstance) {
+        sessionEventsInstance = new SessionEvents();
+    }
+    return sessionEventsInstance;
+}
@@ -54,6 +54,20 @@ export class SessionManager {
         return this.sessionId;
     }
     
+    /**
+     * Get the story ID - one per browser, shared by every session's chapter.
+     * The Writing Engine keeps its "story so far" summary under this ID.
+     */
+    getStoryId() {
+        const key = 'hearsay_story_id';
+        let story = localStorage.getItem(key);
+        if (!story) {
+            story = crypto.randomUUID();
+            localStorage.setItem(key, story);
+        }
+        return story;
+    }
+    
     /**
      * Record that a conversation has started (before transcript is available)
      * This ensures the session knows conversations happened even if transcript fetch fails
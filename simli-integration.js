@@ -13,6 +13,7 @@
 import { BlackRemover } from './black-remover.js';
 import { getSessionManager } from './session-manager.js';
 import { getAudioRecorder } from './audio-recorder.js';
+import { getSessionEvents } from './session-events.js';
 
 export class SimliIntegration {
     constructor(stateMachine, config) {
@@ -28,6 +29,10 @@ export class SimliIntegration {
         // Audio recorder for Whisper transcription
         this.audioRecorder = getAudioRecorder();
         
+        // Server push channel (transcripts, chapters) for this session
+        this.sessionEvents = getSessionEvents();
+        this.sessionEvents.connect(this.sessionManager.getSessionId());
+        
         // Simli session tracking (per-conversation)
         this.currentSimliSessionId = null;
         this.currentCharacter = null;
@@ -167,14 +172,27 @@ export class SimliIntegration {
         console.log(`[Simli] 📜 Fetching transcript for session: ${sid}`);
         
         try {
-            const response = await fetch(`/api/simli-transcript/${sid}`);
+            const userSessionId = this.sessionManager.getSessionId();
+            const response = await fetch(
+                `/api/simli-transcript/${sid}?sessionId=${encodeURIComponent(userSessionId)}`
+            );
             const data = await response.json();
             
             if (data.status === 'pending') {
-                console.log('[Simli] Transcript not ready yet, retrying in 3s...');
-                // Retry after delay
-                await new Promise(resolve => setTimeout(resolve, 3000));
-                return this.fetchTranscript(sid);
+                // Let the server watch Simli and push the transcript to us
+                console.log('[Simli] Transcript not ready yet, waiting for server push...');
+                await this.watchTranscript(sid);
+                const pushed = await this.sessionEvents.waitFor(
+                    ['simli-transcript-ready', 'simli-transcript-unavailable'],
+                    (type, event) => event.simliSessionId === sid,
+                    150000
+                );
+                if (pushed?.type !== 'simli-transcript-ready') {
+                    console.warn('[Simli] Transcript never became available');
+                    return null;
+                }
+                data.status = 'complete';
+                data.transcript = pushed.data.transcript;
             }
             
             if (data.status === 'complete') {
@@ -201,6 +219,19 @@ export class SimliIntegration {
         }
     }
 
+    /**
+     * Ask the server to fetch a finished conversation's transcript from Simli
+     * (with backoff) and push it to this session's event channel
+     * @param {string} simliSessionId - Session ID from token creation
+     */
+    async watchTranscript(simliSessionId) {
+        const userSessionId = this.sessionManager.getSessionId();
+        await fetch(
+            `/api/simli-transcript/${simliSessionId}/watch?sessionId=${encodeURIComponent(userSessionId)}`,
+            { method: 'POST' }
+        );
+    }
+
     /**
      * Create and mount Simli widget
      * @param {Object} character - Character config
@@ -230,7 +261,9 @@ export class SimliIntegration {
             
             // Start audio recording for Whisper transcription
             // This captures user's microphone - the hotel hears everything
-            const recordingStarted = await this.audioRecorder.start(character.id, character.name);
+            const recordingStarted = await this.audioRecorder.start(
+                character.id, character.name, this.sessionManager.getSessionId()
+            );
             if (recordingStarted) {
                 console.log(`[Simli] 🎙️ Audio recording started for ${character.name}`);
             } else {
@@ -679,6 +712,13 @@ export class SimliIntegration {
         const simliSessionId = this.currentSimliSessionId;
         const character = this.currentCharacter;
         
+        // Conversation is over - the server starts fetching Simli's transcript now
+        if (simliSessionId) {
+            this.watchTranscript(simliSessionId).catch(error => {
+                console.warn('[Simli] Transcript watch request failed:', error);
+            });
+        }
+        
         try {
             // Call widget's cleanup method if available
             if (typeof this.widget.destroy === 'function') {
@@ -715,8 +755,8 @@ export class SimliIntegration {
             
             // FALLBACK: Try Simli's transcript API (often fails or returns empty)
             if (simliSessionId) {
-                console.log(`[Simli] 📜 Will fetch transcript from Simli API in 5s...`);
-                setTimeout(async () => {
+                console.log(`[Simli] 📜 Waiting for transcript from Simli API...`);
+                (async () => {
                     const transcript = await this.fetchTranscript(simliSessionId);
                     if (transcript?.transcript) {
                         console.log('[Simli] Simli API transcript saved:', transcript);
@@ -730,7 +770,7 @@ export class SimliIntegration {
                             { messages: [], source: 'none', note: 'Transcript not captured' }
                         );
                     }
-                }, 5000);
+                })();
             } else {
                 console.warn('[Simli] ⚠️ No sessionId available - cannot fetch Simli transcript');
                 // Still store that a conversation happened